@@ -0,0 +1,115 @@
+"""Benchmark of the schema-driven CSV ingestion against the per-row try/except loader"""
+import os
+import csv
+import gc
+import sys
+import time
+import random
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ingestion import read_csv, LEGACY_DELL_SCHEMA
+
+ROWS = int(os.environ.get("BENCH_ROWS", "1000000"))
+
+
+def write_legacy_file(path: str, rows: int):
+    """Write a dell_laptops.csv style file with French formatted prices"""
+    random.seed(42)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["page", "nom", "modele", "taille_ecran", "note", "nombre_avis", "prix", "lien", "caracteristiques"])
+        for i in range(rows):
+            euros = random.randint(300, 3000)
+            price = f"{euros // 1000} {euros % 1000:03d},{random.randint(0, 99):02d} €" if euros >= 1000 else f"{euros},{random.randint(0, 99):02d} €"
+            writer.writerow([
+                i // 12 + 1, f"Ordinateur portable Dell {i}", f"PC{i:06d}", '14"',
+                random.choice(["4.3", "4.0", "N/A"]), random.choice(["35", "12", "N/A"]),
+                price, f"https://www.dell.com/fr-fr/p/{i}", "Windows 11 | Intel Core Ultra"
+            ])
+
+
+def load_per_row(path: str) -> list:
+    """The loader as it was written before the ingestion pipeline"""
+    laptops = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            price_str = row.get('prix', '0')
+            price_str = price_str.replace('€', '').replace(' ', '').replace('\u00a0', '').replace('\u202f', '').strip()
+            price_str = price_str.replace(',', '.')
+            if price_str.count('.') > 1:
+                parts = price_str.rsplit('.', 1)
+                price_str = parts[0].replace('.', '') + '.' + parts[1]
+            try:
+                price = float(price_str) if price_str else 0
+            except:
+                price = 0
+            if price <= 0:
+                continue
+
+            rating_str = row.get('note', 'N/A')
+            try:
+                rating = float(rating_str) if rating_str and rating_str != 'N/A' else None
+            except:
+                rating = None
+
+            reviews_str = row.get('nombre_avis', 'N/A')
+            try:
+                reviews = int(reviews_str) if reviews_str and reviews_str != 'N/A' else None
+            except:
+                reviews = None
+
+            laptops.append({
+                "model": row.get('modele', ''),
+                "name": row.get('nom', ''),
+                "screen_size": row.get('taille_ecran', ''),
+                "rating": rating,
+                "reviews_count": reviews,
+                "price": price,
+                "link": row.get('lien', ''),
+                "features": row.get('caracteristiques', '')
+            })
+    return laptops
+
+
+def tokenize_only(path: str) -> list:
+    """csv.reader alone: the floor any stdlib-csv loader pays"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return list(csv.reader(f))
+
+
+def timed(label: str, fn, *args, repeat: int = 3) -> float:
+    """Best of `repeat` runs; results are dropped so no run pays GC passes over the previous ones"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<24} {best:8.3f} s")
+    return best
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "dell_laptops.csv")
+    print(f"Writing {ROWS} rows to {path}...")
+    write_legacy_file(path, ROWS)
+
+    floor_time = timed("csv.reader only", tokenize_only, path)
+    old_time = timed("per-row try/except", load_per_row, path)
+    new_time = timed("schema ingestion", read_csv, path, LEGACY_DELL_SCHEMA)
+
+    old_rows = load_per_row(path)
+    new_rows, report = read_csv(path, LEGACY_DELL_SCHEMA)
+    assert len(old_rows) == len(new_rows), (len(old_rows), len(new_rows))
+    assert all(a["price"] == b["price"] for a, b in zip(old_rows, new_rows))
+    print(f"rows: {len(new_rows)}, reported errors: {report.error_count}")
+    print(f"speedup: {old_time / new_time:.1f}x (at most {old_time / floor_time:.1f}x with csv.reader)")
+
+
+if __name__ == "__main__":
+    main()
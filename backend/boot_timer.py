@@ -0,0 +1,57 @@
+"""Per-phase timing of application startup"""
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BootTimer:
+    """Records how long each startup phase (imports, catalog loads, lazy subsystems...) takes"""
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.ready_at: Optional[float] = None
+        self.phases: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as a named phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name: str, start: float, end: float):
+        with self._lock:
+            self.phases.append({
+                "phase": name,
+                "started_ms": round((start - self.started_at) * 1000, 2),
+                "duration_ms": round((end - start) * 1000, 2),
+                # Phases that run after the app is ready (lazy loads) do not count toward cold start
+                "deferred": self.ready_at is not None
+            })
+
+    def mark_ready(self):
+        """Mark the end of the cold start (the app accepts requests)"""
+        self.ready_at = time.perf_counter()
+        logger.info(f"Startup completed in {self.cold_start_ms():.1f} ms: " + ", ".join(
+            f"{p['phase']}={p['duration_ms']:.1f}ms" for p in self.phases
+        ))
+
+    def cold_start_ms(self) -> Optional[float]:
+        if self.ready_at is None:
+            return None
+        return round((self.ready_at - self.started_at) * 1000, 2)
+
+    def report(self) -> Dict:
+        with self._lock:
+            phases = list(self.phases)
+        return {
+            "cold_start_ms": self.cold_start_ms(),
+            "phases": phases
+        }
@@ -0,0 +1,299 @@
+"""Vendor-sharded catalog of scraped products"""
+import os
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, List, Dict, Optional, Iterable, Tuple
+
+from ingestion import IngestReport, read_csv, SCRAPED_PRODUCT_SCHEMA, LEGACY_DELL_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SUFFIX = "_catalog.csv"
+
+# Pre-scraper Dell export (French column names), only used when the scraper has not run yet
+LEGACY_DELL_CSV = "dell_laptops.csv"
+
+# Display names for vendors whose CSV rows carry no vendor column
+VENDOR_NAMES = {
+    "dell": "Dell",
+    "hp": "HP"
+}
+
+
+def clean_dell_url(url: str) -> str:
+    """Clean Dell URL to remove double domain"""
+    if not url:
+        return url
+    # Fix double domain pattern: https://www.dell.com//www.dell.com/...
+    # Look for the pattern where we have //www.dell.com/ after https://www.dell.com
+    if 'https://www.dell.com//www.dell.com/' in url:
+        # Replace the double domain with single domain
+        url = url.replace('https://www.dell.com//www.dell.com/', 'https://www.dell.com/', 1)
+    return url
+
+
+def vendor_display_name(vendor: str) -> str:
+    return VENDOR_NAMES.get(vendor.lower(), vendor.title())
+
+
+class VendorShard:
+    """Products of a single vendor, loaded from its `{vendor}_catalog.csv`"""
+
+    def __init__(self, vendor: str, path: str):
+        self.vendor = vendor
+        self.path = path
+        self.products: List[Dict] = []
+        self.by_id: Dict[str, Dict] = {}
+        self.loaded = False
+        self.version = 0
+        self.loaded_at: Optional[datetime] = None
+        self.report: Optional[IngestReport] = None
+        self.lock = threading.Lock()
+
+    def status(self) -> Dict:
+        return {
+            "vendor": self.vendor,
+            "name": vendor_display_name(self.vendor),
+            "loaded": self.loaded,
+            "product_count": len(self.products),
+            "version": self.version,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None
+        }
+
+
+class VendorCatalogStore:
+    """
+    Catalog of scraped products, one shard per vendor
+
+    Shards are discovered from the `{vendor}_catalog.csv` files in the data
+    directory (listed again only when its modification time changes, or on a
+    reload), loaded on first access (several at once in parallel) and can be
+    reloaded one at a time without touching the other vendors. `on_change` is
+    called whenever a vendor is discovered or a shard is (re)loaded, so caches
+    keyed on the catalog version are invalidated.
+    """
+
+    def __init__(self, data_dir: str, max_workers: int = 4, on_change: Optional[Callable[[], None]] = None):
+        self.data_dir = data_dir
+        self.max_workers = max_workers
+        self.on_change = on_change
+        self._shards: Dict[str, VendorShard] = {}
+        self._listed_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def discover(self, force: bool = False) -> List[str]:
+        """
+        Register a shard for every vendor catalog file and return the known vendors
+
+        Creating, renaming or deleting a file changes the directory's modification
+        time: while it stays the same, the previous listing is still valid.
+        """
+        try:
+            mtime = os.stat(self.data_dir).st_mtime_ns
+        except OSError:
+            mtime = None
+        if not force and mtime is not None and mtime == self._listed_mtime:
+            with self._lock:
+                return sorted(self._shards)
+
+        vendors = set()
+        if mtime is not None and os.path.isdir(self.data_dir):
+            for name in os.listdir(self.data_dir):
+                if name.endswith(CATALOG_SUFFIX) and name != "equipment_catalog.csv":
+                    vendors.add(name[:-len(CATALOG_SUFFIX)].lower())
+            if os.path.exists(os.path.join(self.data_dir, LEGACY_DELL_CSV)):
+                vendors.add("dell")
+
+        with self._lock:
+            added = False
+            for vendor in vendors:
+                if vendor not in self._shards:
+                    path = os.path.join(self.data_dir, f"{vendor}{CATALOG_SUFFIX}")
+                    self._shards[vendor] = VendorShard(vendor, path)
+                    added = True
+            known = sorted(self._shards)
+            # A file created within the filesystem's timestamp granularity of the
+            # listing may leave the mtime unchanged: recent mtimes are not trusted
+            self._listed_mtime = mtime if mtime is not None and time.time_ns() - mtime > 1_000_000_000 else None
+        if added:
+            self._changed()
+        return known
+
+    def vendors(self) -> List[str]:
+        return self.discover()
+
+    def get(self, vendor: str) -> List[Dict]:
+        """Get the products of one vendor, loading its shard if needed"""
+        shard = self._shard(vendor)
+        if shard is None:
+            return []
+        if not shard.loaded:
+            self._load(shard)
+        return shard.products
+
+    def get_product(self, vendor: str, product_id: str) -> Optional[Dict]:
+        shard = self._shard(vendor)
+        if shard is None:
+            return None
+        if not shard.loaded:
+            self._load(shard)
+        return shard.by_id.get(product_id)
+
+    def get_all(self, vendors: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Get the products of several vendors (all by default), loading missing shards in parallel"""
+        known = self.discover()
+        wanted = [v.lower() for v in vendors] if vendors else known
+        shards = [self._shards[v] for v in wanted if v in self._shards]
+        self._load_parallel([s for s in shards if not s.loaded])
+
+        products = []
+        for shard in shards:
+            products.extend(shard.products)
+        return products
+
+    def reload(self, vendor: str) -> int:
+        """Reload a single vendor shard from disk and return its product count"""
+        self.discover(force=True)
+        shard = self._shard(vendor)
+        if shard is None:
+            return 0
+        self._load(shard, force=True)
+        return len(shard.products)
+
+    def vendor_counts(self) -> Dict[str, int]:
+        """Product count per vendor display name, for the `vendor` facet (known shards only)"""
+        with self._lock:
+            shards = list(self._shards.values())
+        self._load_parallel([s for s in shards if not s.loaded])
+        return {vendor_display_name(s.vendor): len(s.products) for s in shards}
+
+    def status(self) -> List[Dict]:
+        self.discover()
+        return [self._shards[v].status() for v in sorted(self._shards)]
+
+    def ingest_reports(self) -> List[Dict]:
+        """Ingestion reports of the loaded shards"""
+        return [s.report.to_dict() for s in self._shards.values() if s.report is not None]
+
+    # ----------------------------------------
+    # Loading
+    # ----------------------------------------
+
+    def _shard(self, vendor: str) -> Optional[VendorShard]:
+        shard = self._shards.get(vendor.lower())
+        if shard is None:
+            self.discover()
+            shard = self._shards.get(vendor.lower())
+        return shard
+
+    def _load_parallel(self, shards: List[VendorShard]):
+        if len(shards) <= 1:
+            for shard in shards:
+                self._load(shard)
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(shards))) as pool:
+            list(pool.map(self._load, shards))
+
+    def _load(self, shard: VendorShard, force: bool = False):
+        with shard.lock:
+            if shard.loaded and not force:
+                return
+            products, report = load_vendor_csv(shard.path, shard.vendor)
+            if not products and shard.vendor == "dell":
+                products, report = load_legacy_dell_csv(os.path.join(self.data_dir, LEGACY_DELL_CSV))
+
+            # Swap in fully built structures so readers never see a half-loaded shard
+            shard.by_id = {p["id"]: p for p in products}
+            shard.products = products
+            shard.report = report
+            shard.version += 1
+            shard.loaded_at = datetime.now()
+            shard.loaded = True
+        logger.info(f"Loaded {len(products)} {vendor_display_name(shard.vendor)} products from catalog")
+        self._changed()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+
+def load_vendor_csv(csv_path: str, vendor: str) -> Tuple[List[Dict], Optional[IngestReport]]:
+    """
+    Load products from a scraper-format `{vendor}_catalog.csv`
+
+    The scraper appends every run to the same file, so a product id can appear
+    several times: the most recent row wins.
+    """
+    if not os.path.exists(csv_path):
+        return [], None
+
+    try:
+        rows, report = read_csv(csv_path, SCRAPED_PRODUCT_SCHEMA)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading {vendor} catalog from {csv_path}: {e}")
+        return [], None
+
+    default_vendor = vendor_display_name(vendor)
+    is_dell = vendor.lower() == "dell"
+    by_id: Dict[str, Dict] = {}
+    for row in rows:
+        by_id.pop(row["id"], None)
+        by_id[row["id"]] = {
+            "id": row["id"],
+            "vendor": row["vendor"] or default_vendor,
+            "name": row["name"],
+            "model": row["model"],
+            "screen_size": row["screen_size"],
+            "rating": row["rating"],
+            "reviews_count": row["reviews_count"],
+            "price": row["price"],
+            "link": clean_dell_url(row["link"]) if is_dell else row["link"],
+            "features": row["features"]
+        }
+    _log_report(report)
+    return list(by_id.values()), report
+
+
+def load_legacy_dell_csv(csv_path: str) -> Tuple[List[Dict], Optional[IngestReport]]:
+    """Load Dell laptops from the original export (French column names)"""
+    if not os.path.exists(csv_path):
+        return [], None
+
+    try:
+        rows, report = read_csv(csv_path, LEGACY_DELL_SCHEMA)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading Dell catalog from old CSV: {e}")
+        return [], None
+
+    dell_laptops = []
+    seen_ids = set()
+    for row in rows:
+        product_id = f"dell-{row['model']}"
+        if product_id in seen_ids:
+            continue
+        seen_ids.add(product_id)
+        dell_laptops.append({
+            "id": product_id,
+            "vendor": "Dell",
+            "name": row["name"],
+            "model": row["model"],
+            "screen_size": row["screen_size"],
+            "rating": row["rating"],
+            "reviews_count": row["reviews_count"],
+            "price": row["price"],
+            "link": clean_dell_url(row["link"]),
+            "features": row["features"]
+        })
+    _log_report(report)
+    return dell_laptops, report
+
+
+def _log_report(report: IngestReport):
+    if report.error_count:
+        logger.warning(
+            f"{report.source}: {report.rows_rejected} rows rejected, "
+            f"{report.error_count} errors (see /api/ingestion/reports)"
+        )
@@ -0,0 +1,207 @@
+"""Single-writer mutation queue for the catalog CSV files, with group commits"""
+import os
+import io
+import csv
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# When to fsync a group commit: "always" (durable once acknowledged), "never" (left to the OS)
+FSYNC_POLICIES = ("always", "never")
+
+# A prepare callback runs on the writer thread. It receives the keys already claimed
+# by earlier mutations of the same batch on the same file and returns the rows to
+# write and the value the caller's future resolves to. It may raise to reject.
+Prepare = Callable[[Set[str]], Tuple[List[Dict], Any]]
+
+
+class CatalogMutation:
+    """One queued write: rows for a CSV file and the callbacks around its commit"""
+
+    __slots__ = ("path", "fieldnames", "prepare", "on_commit", "future", "rows", "result")
+
+    def __init__(self, path: str, fieldnames: List[str], prepare: Prepare,
+                 on_commit: Optional[Callable[[List[Dict]], None]] = None):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.prepare = prepare
+        self.on_commit = on_commit
+        self.future: Future = Future()
+        self.rows: List[Dict] = []
+        self.result: Any = None
+
+
+class CatalogWriter:
+    """
+    Serializes every catalog write through one thread
+
+    Callers (request threads, the scraper) submit mutations and wait on a future.
+    The writer thread takes everything queued at that moment as one batch: each
+    mutation is prepared (validated, deduplicated) in order, the accepted rows of
+    each file are appended with a single write and at most one fsync, then the
+    in-memory indexes are updated and the futures resolved. Concurrent writers
+    therefore share one disk sync, and checks like "does this id exist" cannot
+    race with the write that makes it exist.
+
+    A mutation succeeds once its rows are on disk. If updating memory fails
+    afterwards, the error is logged and `on_apply_error` is called with the
+    file, so its in-memory copy can be reloaded from disk.
+    """
+
+    def __init__(self, fsync: str = "always", max_batch: int = 1000, commit_delay: float = 0.0,
+                 on_apply_error: Optional[Callable[[str], None]] = None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got '{fsync}'")
+        self.fsync = fsync
+        self.max_batch = max_batch
+        # Extra time to wait for more mutations before committing a batch
+        self.commit_delay = commit_delay
+        self.on_apply_error = on_apply_error
+        self._queue: "queue.Queue[Optional[CatalogMutation]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.stats = {"batches": 0, "mutations": 0, "rows_written": 0, "fsyncs": 0, "rejected": 0, "apply_errors": 0}
+
+    def submit(self, path: str, fieldnames: List[str], prepare: Prepare,
+               on_commit: Optional[Callable[[List[Dict]], None]] = None) -> Future:
+        """
+        Queue a mutation of a CSV file
+
+        Args:
+            path: CSV file to append to (the header is written if it does not exist)
+            fieldnames: CSV columns
+            prepare: builds the rows to write, on the writer thread (see Prepare)
+            on_commit: called with the written rows once they are on disk, to update memory
+
+        Returns:
+            Future resolved with the value returned by prepare, or its exception
+        """
+        mutation = CatalogMutation(path, fieldnames, prepare, on_commit)
+        self._ensure_started()
+        self._queue.put(mutation)
+        return mutation.future
+
+    def append(self, path: str, fieldnames: List[str], rows: List[Dict]) -> Future:
+        """Queue a plain append of rows (no validation, no in-memory index)"""
+        return self.submit(path, fieldnames, lambda claimed: (rows, len(rows)))
+
+    def close(self, timeout: Optional[float] = None):
+        """Commit what is queued and stop the writer thread"""
+        with self._start_lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def status(self) -> Dict:
+        return {
+            "running": self._thread is not None,
+            "fsync": self.fsync,
+            "queued": self._queue.qsize(),
+            **self.stats
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="catalog-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stop = self._collect(batch)
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Never let the writer thread die: fail the batch instead
+                logger.error(f"Catalog writer batch failed: {e}")
+                for mutation in batch:
+                    if not mutation.future.done():
+                        mutation.future.set_exception(e)
+            if stop:
+                return
+
+    def _collect(self, batch: List[CatalogMutation]) -> bool:
+        """Add everything already queued (and what arrives within commit_delay) to the batch"""
+        while len(batch) < self.max_batch:
+            try:
+                if self.commit_delay:
+                    mutation = self._queue.get(timeout=self.commit_delay)
+                else:
+                    mutation = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if mutation is None:
+                return True
+            batch.append(mutation)
+        return False
+
+    def _commit(self, batch: List[CatalogMutation]):
+        self.stats["batches"] += 1
+        self.stats["mutations"] += len(batch)
+
+        # Prepare in submission order, files are committed in first-seen order
+        accepted: Dict[str, List[CatalogMutation]] = {}
+        claimed: Dict[str, Set[str]] = {}
+        for mutation in batch:
+            try:
+                mutation.rows, mutation.result = mutation.prepare(claimed.setdefault(mutation.path, set()))
+            except Exception as e:
+                self.stats["rejected"] += 1
+                mutation.future.set_exception(e)
+                continue
+            accepted.setdefault(mutation.path, []).append(mutation)
+
+        for path, mutations in accepted.items():
+            try:
+                self._write(path, mutations[0].fieldnames, [row for m in mutations for row in m.rows])
+            except OSError as e:
+                logger.error(f"Error writing {path}: {e}")
+                for mutation in mutations:
+                    mutation.future.set_exception(e)
+                continue
+
+            # The rows are on disk: the mutations succeeded whatever happens to memory
+            apply_failed = False
+            for mutation in mutations:
+                try:
+                    if mutation.on_commit and mutation.rows:
+                        mutation.on_commit(mutation.rows)
+                except Exception as e:
+                    self.stats["apply_errors"] += 1
+                    logger.error(f"Error applying committed rows of {path} in memory: {e}")
+                    apply_failed = True
+                mutation.future.set_result(mutation.result)
+            if apply_failed and self.on_apply_error is not None:
+                try:
+                    self.on_apply_error(path)
+                except Exception as e:
+                    logger.error(f"Error reloading {path} after a failed in-memory update: {e}")
+
+    def _write(self, path: str, fieldnames: List[str], rows: List[Dict]):
+        if not rows:
+            return
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            writer.writeheader()
+        writer.writerows(rows)
+
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            f.write(buffer.getvalue())
+            f.flush()
+            if self.fsync == "always":
+                os.fsync(f.fileno())
+                self.stats["fsyncs"] += 1
+        self.stats["rows_written"] += len(rows)
@@ -0,0 +1,167 @@
+"""CO2 certificates rendered as SVG, cached by a hash of their inputs"""
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key: bump it when the template changes so certificates are re-rendered
+TEMPLATE_VERSION = 1
+# Below this many certificates to render, a process pool costs more than it saves
+MIN_POOL_BATCH = 64
+
+# Equivalences shown on the certificate (same factors as CO2Certificate.jsx)
+KG_CO2_PER_CAR_KM = 0.21
+KG_CO2_PER_TREE_YEAR = 25
+KG_CO2_PER_PARIS_NYC_FLIGHT = 255
+
+
+def certificate_key(certificate: Dict) -> str:
+    """Content address of a certificate: sha256 of its inputs and the template version"""
+    payload = json.dumps({"template": TEMPLATE_VERSION, **certificate}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_certificate_svg(certificate: Dict) -> str:
+    """
+    Render a certificate as a standalone SVG document
+
+    Args:
+        certificate: name, department, period, co2_kg, money_eur and items
+    """
+    co2 = certificate["co2_kg"]
+    equivalences = [
+        (f"{round(co2 / KG_CO2_PER_CAR_KM):,}".replace(",", " "), "km en voiture"),
+        (f"{round(co2 / KG_CO2_PER_TREE_YEAR)}", "arbres pendant 1 an"),
+        (f"{co2 / KG_CO2_PER_PARIS_NYC_FLIGHT:.1f}", "vols Paris-NYC")
+    ]
+    equivalence_svg = "".join(
+        f'<text x="{200 + i * 200}" y="520" class="value">{escape(value)}</text>'
+        f'<text x="{200 + i * 200}" y="545" class="label">{escape(label)}</text>'
+        for i, (value, label) in enumerate(equivalences)
+    )
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="800" height="640" viewBox="0 0 800 640">'
+        '<style>'
+        'text{font-family:Georgia,serif;text-anchor:middle;fill:#1a1a1a}'
+        '.small{font-family:Helvetica,Arial,sans-serif;font-size:14px;fill:#666}'
+        '.value{font-size:24px;font-weight:bold;fill:#b8860b}'
+        '.label{font-family:Helvetica,Arial,sans-serif;font-size:12px;fill:#666}'
+        '</style>'
+        '<rect width="800" height="640" fill="#faf9f7"/>'
+        '<rect x="20" y="20" width="760" height="600" fill="none" stroke="#b8860b" stroke-width="3"/>'
+        '<text x="400" y="90" font-size="40" letter-spacing="8">LVMH</text>'
+        '<text x="400" y="120" class="small" letter-spacing="3">GREEN IT INITIATIVE</text>'
+        '<text x="400" y="180" font-size="26">Certificat d\'Impact Environnemental</text>'
+        f'<text x="400" y="240" font-size="32" font-style="italic">{escape(certificate["name"])}</text>'
+        f'<text x="400" y="268" class="small">{escape(certificate["department"])}</text>'
+        f'<text x="400" y="310" class="small">Bilan {escape(str(certificate["period"]))} : le réemploi de '
+        f'{certificate["items"]} équipement{"s" if certificate["items"] > 1 else ""} a réduit l\'empreinte carbone de LVMH.</text>'
+        f'<text x="400" y="400" font-size="64" font-weight="bold" fill="#2e7d32">{co2:,.0f} kg</text>'
+        '<text x="400" y="435" class="small">CO₂ ÉVITÉS</text>'
+        f'<text x="400" y="465" class="small">{certificate["money_eur"]:,.0f} € économisés</text>'
+        f'{equivalence_svg}'
+        '<line x1="520" y1="585" x2="720" y2="585" stroke="#1a1a1a"/>'
+        '<text x="620" y="605" class="label">Direction Green IT LVMH</text>'
+        '</svg>'
+    )
+
+
+class CertificateCache:
+    """Rendered certificates stored as files named by their content address"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.svg")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self.path(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, svg: str):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside then renamed: a reader never sees a partial certificate
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(svg)
+        os.replace(tmp_path, path)
+
+
+class CertificateRenderer:
+    """
+    Renders certificates that are not in the cache yet, in a process pool
+
+    The pool is created by start() (the app's startup hook) and shut down by
+    close(). Its workers are started with `start_method` ("spawn" or
+    "forkserver"), never forked from the server: a fork would copy the locks
+    held by its other threads and its open files. Until start() is called,
+    batches are rendered in the calling process.
+    """
+
+    def __init__(self, cache: CertificateCache, workers: Optional[int] = None, start_method: str = "spawn"):
+        self.cache = cache
+        self.workers = workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        """Create the process pool (its workers are started on the first large batch)"""
+        if self._pool is None and self.workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(self.start_method)
+            )
+
+    def render(self, certificate: Dict) -> str:
+        """One certificate, from the cache when possible"""
+        key = certificate_key(certificate)
+        svg = self.cache.get(key)
+        if svg is None:
+            svg = render_certificate_svg(certificate)
+            self.cache.put(key, svg)
+        return svg
+
+    def render_batch(self, certificates: List[Dict]) -> Dict:
+        """
+        Make sure every certificate is in the cache
+
+        Returns:
+            Dictionary with the rendered and cached counts and the key of each certificate
+        """
+        keys = [certificate_key(certificate) for certificate in certificates]
+        missing = {}
+        for key, certificate in zip(keys, certificates):
+            if key not in missing and key not in self.cache:
+                missing[key] = certificate
+
+        pool = self._pool
+        if len(missing) >= MIN_POOL_BATCH and pool is not None:
+            chunksize = max(1, len(missing) // (self.workers * 4))
+            rendered = pool.map(render_certificate_svg, missing.values(), chunksize=chunksize)
+        else:
+            rendered = map(render_certificate_svg, missing.values())
+        for key, svg in zip(missing, rendered):
+            self.cache.put(key, svg)
+
+        logger.info(f"Certificates: {len(missing)} rendered, {len(certificates) - len(missing)} already cached")
+        return {"rendered": len(missing), "cached": len(certificates) - len(missing), "keys": keys}
+
+    def close(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,139 @@
+"""Change feed of marketplace events, broadcast to Server-Sent Events subscribers"""
+import json
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeFeed:
+    """
+    Sequenced events kept in a ring buffer and pushed to asyncio subscribers
+
+    Events are published from any thread (store listeners run in the request
+    threadpool). Each event is numbered and formatted as an SSE frame once,
+    then every subscriber reads the same frames from the shared buffer: a
+    publish costs O(1) whatever the number of connections, and waking them all
+    is a single asyncio.Event. A subscriber resumes from the last sequence
+    number it saw as long as it is still in the buffer; otherwise it gets a
+    "reset" event telling it to refetch.
+    """
+
+    def __init__(self, buffer_size: int = 10000, heartbeat_seconds: float = 15.0):
+        self.heartbeat_seconds = heartbeat_seconds
+        self.buffer_size = buffer_size
+        self.seq = 0
+        # Ring buffer: event `seq` is (frame, (type, data as JSON)) at slot seq % (buffer_size + 1).
+        # The spare slot is the one being written while readers copy the others without the lock
+        self._slots: List[Optional[Tuple[str, Tuple[str, str]]]] = [None] * (buffer_size + 1)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.subscribers = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the feed to the server's event loop (at startup)"""
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+
+    def publish(self, event_type: str, data: Dict) -> int:
+        """
+        Record an event and wake the subscribers (thread-safe)
+
+        `data` is serialized here: later changes to the objects it holds (e.g.
+        live store records) do not alter the buffered event.
+        """
+        payload = json.dumps(data, default=str)
+        with self._lock:
+            seq = self.seq + 1
+            frame = f"id: {seq}\nevent: {event_type}\ndata: {payload}\n\n"
+            # The slot is filled before the seq moves: readers never see an unwritten slot
+            self._slots[seq % len(self._slots)] = (frame, (event_type, payload))
+            self.seq = seq
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake)
+        return seq
+
+    def events_since(self, since: int, limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """Buffered events after a sequence number, or None if some were already dropped"""
+        upto = self.seq
+        if limit is not None:
+            upto = min(upto, since + limit)
+        events = self._read(since, upto, 1)
+        if events is None:
+            return None
+        return [
+            {"seq": seq, "type": event_type, "data": json.loads(payload)}
+            for seq, (event_type, payload) in enumerate(events, since + 1)
+        ]
+
+    async def stream(self, since: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        SSE frames for one subscriber, starting after `since` (or from now)
+
+        Each wakeup only copies the frames published since the subscriber's
+        last one, so a publish costs every subscriber O(new events), whatever
+        the buffer size. Yields a comment line every heartbeat_seconds without
+        events so that proxies keep the connection open.
+        """
+        last = self.seq if since is None else since
+        self.subscribers += 1
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                upto = self.seq
+                # Read before waiting: _wake runs on this loop, so no wakeup is missed in between
+                wakeup = self._wakeup
+                if upto != last:
+                    frames = self._read(last, upto, 0)
+                    last = upto
+                    yield "".join(frames) if frames is not None else self._reset_frame(upto)
+                    continue
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.subscribers -= 1
+
+    def status(self) -> Dict:
+        seq = self.seq
+        buffered = min(seq, self.buffer_size)
+        return {
+            "seq": seq,
+            "oldest_buffered_seq": seq - buffered + 1 if buffered else None,
+            "buffered": buffered,
+            "subscribers": self.subscribers
+        }
+
+    def _read(self, since: int, upto: int, field: int) -> Optional[List]:
+        """
+        Frames (field 0) or events (field 1) of the sequence numbers in (since, upto]
+
+        Copied without the lock, then validated: None when some of them were
+        dropped from the buffer, before or during the copy, or when `since`
+        comes from before a restart.
+        """
+        if not self._covers(since):
+            return None
+        slots = self._slots
+        size = len(slots)
+        copied = [slots[seq % size][field] for seq in range(since + 1, upto + 1)]
+        return copied if self._covers(since) else None
+
+    def _covers(self, since: int) -> bool:
+        """Whether every event after `since` is still in the buffer"""
+        seq = self.seq
+        # A sequence number above seq comes from before a restart
+        return since <= seq and seq - since <= self.buffer_size
+
+    def _reset_frame(self, seq: int) -> str:
+        return f"id: {seq}\nevent: reset\ndata: {json.dumps({'seq': seq})}\n\n"
+
+    def _wake(self):
+        # Runs on the event loop: release every waiting subscriber, later waits use a new Event
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
@@ -0,0 +1,173 @@
+"""Precomputed facet indexes (bitmap posting lists) over catalog lists"""
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# A facet extractor maps a catalog row to its facet value (None = not indexed)
+FacetExtractor = Callable[[Dict], Optional[str]]
+
+
+class FacetIndex:
+    """
+    Bitmap index over a list of catalog rows
+
+    Every (facet, value) pair owns a bitmap, stored as a Python int, whose bit i
+    is set when row i has that value. Filtering is a handful of bitwise AND/OR
+    operations and facet counts are popcounts of intersections, so a query
+    never rescans the rows.
+    """
+
+    def __init__(self, rows: List[Dict], facets: Dict[str, FacetExtractor]):
+        self.rows = rows
+        self.facets = facets
+        self.all_rows = (1 << len(rows)) - 1
+        self.bitmaps: Dict[str, Dict[str, int]] = {}
+
+        for facet, extract in facets.items():
+            positions: Dict[str, List[int]] = {}
+            for i, row in enumerate(rows):
+                value = extract(row)
+                if value is not None:
+                    positions.setdefault(value, []).append(i)
+            self.bitmaps[facet] = {
+                value: _bitmap_from_positions(indexes, len(rows))
+                for value, indexes in positions.items()
+            }
+
+    def facet_mask(self, facet: str, values: Iterable[str]) -> int:
+        """Rows matching any of the values of a facet (OR)"""
+        bitmaps = self.bitmaps.get(facet, {})
+        mask = 0
+        for value in values:
+            mask |= bitmaps.get(value, 0)
+        return mask
+
+    def search(self, filters: Dict[str, List[str]], operator: str = "and",
+               offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Filter rows and count facet values
+
+        Args:
+            filters: facet name -> accepted values (values of one facet are OR-ed)
+            operator: "and" to intersect the facets, "or" to unite them
+            offset: number of matching rows to skip
+            limit: maximum number of rows to return
+
+        Returns:
+            Dictionary with matching rows, total and per-facet value counts
+        """
+        masks = {
+            facet: self.facet_mask(facet, values)
+            for facet, values in filters.items()
+            if facet in self.bitmaps and values
+        }
+        mask = _combine(masks.values(), operator, self.all_rows)
+
+        counts = {}
+        for facet, bitmaps in self.bitmaps.items():
+            # Multi-select faceting: a facet's counts ignore its own filter under AND
+            if operator == "and":
+                others = _combine((m for f, m in masks.items() if f != facet), operator, self.all_rows)
+            else:
+                others = mask
+            counts[facet] = {
+                value: bin(bitmap & others).count('1')
+                for value, bitmap in sorted(bitmaps.items())
+            }
+
+        positions = _positions(mask)
+        total = len(positions)
+        end = None if limit is None else offset + limit
+        return {
+            "items": [self.rows[i] for i in positions[offset:end]],
+            "total": total,
+            "facets": counts
+        }
+
+
+def _combine(masks: Iterable[int], operator: str, all_rows: int) -> int:
+    masks = list(masks)
+    if not masks:
+        return all_rows
+    result = masks[0]
+    for mask in masks[1:]:
+        result = result | mask if operator == "or" else result & mask
+    return result
+
+
+def _bitmap_from_positions(positions: List[int], size: int) -> int:
+    # Setting bits in a bytearray is linear; OR-ing 1 << i into an int would be quadratic
+    buffer = bytearray((size + 7) // 8)
+    for i in positions:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _positions(mask: int) -> List[int]:
+    bits = bin(mask)[:1:-1]
+    positions = []
+    i = bits.find('1')
+    while i >= 0:
+        positions.append(i)
+        i = bits.find('1', i + 1)
+    return positions
+
+
+# ============================================
+# BUCKETING HELPERS
+# ============================================
+
+def range_bucket(bounds: List[float], unit: str = "") -> Callable[[Optional[float]], Optional[str]]:
+    """Build a function mapping a number to a "low-high" label between consecutive bounds"""
+    labels = []
+    for i, low in enumerate(bounds):
+        if i + 1 < len(bounds):
+            labels.append(f"{_fmt(low)}-{_fmt(bounds[i + 1])}{unit}")
+        else:
+            labels.append(f"{_fmt(low)}+{unit}")
+
+    def bucket(value: Optional[float]) -> Optional[str]:
+        if value is None:
+            return None
+        label = None
+        for low, candidate in zip(bounds, labels):
+            if value >= low:
+                label = candidate
+            else:
+                break
+        return label
+
+    return bucket
+
+
+def screen_size_value(screen_size: str) -> Optional[str]:
+    """Normalize '16"', '16 pouces' or '15.6' to a plain number string"""
+    match = re.search(r'(\d+(?:[.,]\d+)?)', screen_size or "")
+    if not match:
+        return None
+    return _fmt(float(match.group(1).replace(',', '.')))
+
+
+def _fmt(value: float) -> str:
+    return f"{value:g}"
+
+
+price_bucket = range_bucket([0, 500, 1000, 1500, 2000])
+rating_bucket = range_bucket([0, 3, 4, 4.5])
+reviews_bucket = range_bucket([0, 1, 10, 50, 100])
+power_bucket = range_bucket([0, 0.01, 0.05, 0.1, 0.2], unit=" kW")
+
+LAPTOP_FACETS: Dict[str, FacetExtractor] = {
+    "vendor": lambda row: row.get("vendor") or None,
+    "screen_size": lambda row: screen_size_value(row.get("screen_size", "")),
+    "rating": lambda row: rating_bucket(row.get("rating")),
+    "reviews_count": lambda row: reviews_bucket(row.get("reviews_count")),
+    "price": lambda row: price_bucket(row.get("price"))
+}
+
+EQUIPMENT_FACETS: Dict[str, FacetExtractor] = {
+    "type": lambda row: row.get("type") or None,
+    "brand": lambda row: row.get("brand") or None,
+    "price": lambda row: price_bucket(row.get("price_new")),
+    "power_on": lambda row: power_bucket(row.get("power_on")),
+    "source_co2": lambda row: row.get("source_co2") or None
+}
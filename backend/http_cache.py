@@ -0,0 +1,124 @@
+"""Versioned response caching and conditional GET helpers"""
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+class CatalogVersion:
+    """Monotonic version of the catalog data, bumped on every reload or mutation"""
+
+    def __init__(self):
+        # Versions restart at 1 on every boot, the boot id keeps ETags unique across restarts
+        self._boot_id = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self.version = 1
+        self.last_modified = _now()
+
+    def bump(self) -> int:
+        """Mark the catalog as changed and return the new version"""
+        with self._lock:
+            self.version += 1
+            # Keep Last-Modified strictly increasing so If-Modified-Since never masks a change
+            self.last_modified = max(_now(), self.last_modified + timedelta(seconds=1))
+            return self.version
+
+    def snapshot(self) -> Tuple[int, str, datetime]:
+        """Return (version, etag, last_modified) for the current version"""
+        with self._lock:
+            return self.version, f'"{self._boot_id}-{self.version}"', self.last_modified
+
+
+class ResponseCache:
+    """Serialized response bodies keyed by request URL, valid for a single catalog version"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str], version: int) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Tuple[str, str], version: int, body: bytes):
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def conditional_json(request: Request, version: CatalogVersion, cache: ResponseCache,
+                     build: Callable[[], Any]) -> Response:
+    """
+    Answer a GET from the versioned cache
+
+    Returns the cached body for this URL and version, building and serializing it
+    only on a miss, or 304 when the client already holds it. The body is resolved
+    first, so a `build` raising HTTPException (e.g. 404) is never masked by a 304.
+    """
+    current_version, etag, last_modified = version.snapshot()
+    headers = _validator_headers(etag, last_modified)
+
+    key = (request.url.path, request.url.query)
+    body = cache.get(key, current_version)
+    if body is None:
+        body = json.dumps(
+            jsonable_encoder(build()),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+        cache.put(key, current_version, body)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _validator_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        # Let browsers keep the body but always revalidate it
+        "Cache-Control": "no-cache"
+    }
+
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
+
+
+def _now() -> datetime:
+    # HTTP dates have a one second resolution
+    return datetime.now(timezone.utc).replace(microsecond=0)
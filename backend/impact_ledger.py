@@ -0,0 +1,143 @@
+"""Sustainability impact (CO2 avoided, money saved) credited to users and departments"""
+import threading
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Optional, Tuple
+
+METRICS = ("co2_kg", "money_eur")
+
+# What an approved reservation credits: metric -> amount
+Credit = Dict[str, float]
+
+
+class RankedTotals:
+    """Totals per key, plus a sorted list ranking them (updates and ranks in O(log n) searches)"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        # (-total, key): the biggest total first, ties by key
+        self._ranking: List[Tuple[float, str]] = []
+
+    def add(self, key: str, amount: float):
+        previous = self.totals.get(key)
+        if previous is not None:
+            i = bisect_left(self._ranking, (-previous, key))
+            del self._ranking[i]
+        total = round((previous or 0) + amount, 6)
+        self.totals[key] = total
+        insort(self._ranking, (-total, key))
+
+    def discard(self, key: str):
+        """Remove a key from the totals and the ranking"""
+        total = self.totals.pop(key, None)
+        if total is not None:
+            del self._ranking[bisect_left(self._ranking, (-total, key))]
+
+    def rank(self, key: str) -> Optional[int]:
+        """1-based rank of a key, None if it has no total"""
+        if key not in self.totals:
+            return None
+        return bisect_left(self._ranking, (-self.totals[key], key)) + 1
+
+    def top(self, limit: int) -> List[Tuple[str, float]]:
+        return [(key, -negative) for negative, key in self._ranking[:limit]]
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+
+class ImpactLedger:
+    """
+    Impact credited to requesters and their departments by approved reservations
+
+    Each approved reservation credits a fixed amount of every metric, computed
+    once by `credit_of` (from the reservation's stored impact, or from the
+    item's catalog data). A reservation store listener adds the credit when a
+    reservation becomes approved and takes it back if it leaves that status,
+    so totals and rankings are never recomputed from the reservations. A user
+    or department left without approved items is dropped from the rankings.
+    """
+
+    def __init__(self, credit_of: Callable[[Dict], Optional[Credit]]):
+        self.credit_of = credit_of
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # reservation id -> (user email, department, credit)
+        self._credits: Dict[str, Tuple[str, str, Credit]] = {}
+        self.users = {metric: RankedTotals() for metric in METRICS}
+        self.departments = {metric: RankedTotals() for metric in METRICS}
+        self.items_by_user: Dict[str, int] = {}
+        self.items_by_department: Dict[str, int] = {}
+
+    def rebuild(self, reservations):
+        with self._lock:
+            self.reset()
+            for reservation in reservations:
+                self._update(reservation, removed=False)
+
+    def on_reservation_change(self, event: str, reservation: Dict, previous: Optional[Dict]):
+        """Reservation store listener"""
+        if previous is not None and previous["status"] == reservation["status"]:
+            return
+        with self._lock:
+            self._update(reservation, removed=event == "remove")
+
+    def user(self, user_email: str) -> Dict:
+        with self._lock:
+            return self._summary(self.users, self.items_by_user, user_email)
+
+    def department(self, department: str) -> Dict:
+        with self._lock:
+            return self._summary(self.departments, self.items_by_department, department)
+
+    def credited_users(self) -> List[str]:
+        """Users credited by at least one approved reservation"""
+        with self._lock:
+            return list(self.items_by_user)
+
+    def leaderboard(self, by: str = "department", metric: str = "co2_kg", limit: int = 10) -> List[Dict]:
+        """Biggest totals of a metric, per department or per user"""
+        with self._lock:
+            ranked = (self.departments if by == "department" else self.users)[metric]
+            counts = self.items_by_department if by == "department" else self.items_by_user
+            return [
+                {"rank": i + 1, by: key, metric: round(total, 2), "items": counts.get(key, 0)}
+                for i, (key, total) in enumerate(ranked.top(limit))
+            ]
+
+    def _summary(self, rankings: Dict[str, RankedTotals], counts: Dict[str, int], key: str) -> Dict:
+        summary = {"items": counts.get(key, 0)}
+        for metric, ranked in rankings.items():
+            summary[metric] = round(ranked.totals.get(key, 0.0), 2)
+            summary[f"{metric}_rank"] = ranked.rank(key)
+        summary["ranked"] = len(rankings[METRICS[0]])
+        return summary
+
+    def _update(self, reservation: Dict, removed: bool):
+        previous = self._credits.pop(reservation["id"], None)
+        if previous is not None:
+            self._apply(*previous, sign=-1)
+        if not removed and reservation["status"] == "approved":
+            credit = self.credit_of(reservation)
+            if credit is not None:
+                entry = (reservation["user_email"], reservation["user_department"], credit)
+                self._credits[reservation["id"]] = entry
+                self._apply(*entry, sign=1)
+
+    def _apply(self, user_email: str, department: str, credit: Credit, sign: int):
+        for metric in METRICS:
+            self.users[metric].add(user_email, sign * credit.get(metric, 0.0))
+            self.departments[metric].add(department, sign * credit.get(metric, 0.0))
+        _count(self.items_by_user, self.users, user_email, sign)
+        _count(self.items_by_department, self.departments, department, sign)
+
+
+def _count(counts: Dict[str, int], rankings: Dict[str, RankedTotals], key: str, sign: int):
+    count = counts.get(key, 0) + sign
+    if count:
+        counts[key] = count
+    else:
+        del counts[key]
+        for ranked in rankings.values():
+            ranked.discard(key)
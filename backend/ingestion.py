@@ -0,0 +1,408 @@
+"""Schema-driven CSV ingestion shared by every data file loader"""
+import csv
+import re
+import logging
+from collections import deque
+from itertools import compress, islice, repeat
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows are converted column by column in chunks of this size
+CHUNK_SIZE = 65536
+
+# Reports keep at most this many row errors (the counters stay exact)
+MAX_REPORTED_ERRORS = 500
+
+NULL_VALUES = frozenset({"", "N/A", "n/a", "NA", "null", "None", "-"})
+
+# Row key of the CSV columns no schema column reads
+_SKIP = object()
+
+
+# ============================================
+# NUMBER PARSING
+# ============================================
+
+# Currency symbols and the spaces used as thousands separators
+_STRIP_CHARS = "€$£ \u00a0\u202f"
+_NUMBER_TABLES = {
+    # "1 495,78 €" -> "1495.78"
+    "fr": str.maketrans({**{c: None for c in _STRIP_CHARS}, ",": "."}),
+    # "$1,495.78" -> "1495.78"
+    "en": str.maketrans({**{c: None for c in _STRIP_CHARS}, ",": None}),
+}
+_NUMBER_TABLES["auto"] = _NUMBER_TABLES["fr"]
+
+# Same cleanup as (old, new) replacements: a chain of C-level str.replace over a
+# whole column is faster than str.translate with a mapping table
+_NUMBER_REPLACEMENTS = {
+    "fr": [(c, "") for c in _STRIP_CHARS] + [(",", ".")],
+    "en": [(c, "") for c in _STRIP_CHARS] + [(",", "")],
+}
+_NUMBER_REPLACEMENTS["auto"] = _NUMBER_REPLACEMENTS["fr"]
+_NUMBER_CHARS = re.compile(r'[^0-9.,+-]')
+# "1,495" or "1.495 €": a lone separator followed by exactly three digits groups thousands
+_LONE_THOUSANDS = re.compile(r'[^0-9.,]*[+-]?[1-9][0-9]{0,2}[.,][0-9]{3}[^0-9.,]*')
+
+
+def parse_number(text: str, locale: str = "auto") -> Optional[float]:
+    """
+    Parse a human formatted number or price
+
+    Handles currency symbols, space / non-breaking space thousands separators
+    and both decimal conventions: "1 495,78 €", "1.495,78", "1,495.78", "941.40".
+    With locale "auto", the rightmost of ',' and '.' is the decimal separator,
+    except that a lone separator followed by exactly three digits separates
+    thousands ("1,495" and "1.495" are 1495); any other lone ',' is a decimal
+    separator (European prices).
+
+    Returns:
+        The number, or None when the text is not a number
+    """
+    if text is None:
+        return None
+    if locale == "auto" and _LONE_THOUSANDS.fullmatch(text):
+        return float(_NUMBER_CHARS.sub('', text).replace(',', '').replace('.', ''))
+    try:
+        return float(text)
+    except ValueError:
+        pass
+
+    cleaned = text.translate(_NUMBER_TABLES.get(locale, _NUMBER_TABLES["auto"]))
+    try:
+        return float(cleaned)
+    except ValueError:
+        pass
+
+    cleaned = _NUMBER_CHARS.sub('', text)
+    if not cleaned:
+        return None
+    comma, dot = cleaned.rfind(','), cleaned.rfind('.')
+    if locale == "en" or (locale == "auto" and dot > comma and comma >= 0):
+        cleaned = cleaned.replace(',', '')
+    else:
+        # Comma is the decimal separator, dots are thousands separators
+        cleaned = cleaned.replace('.', '').replace(',', '.')
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+# ============================================
+# SCHEMA
+# ============================================
+
+class Column:
+    """
+    A typed column of a data file
+
+    Args:
+        name: key of the value in the loaded rows
+        kind: "str", "int", "float" or "number" (locale-aware, currency allowed)
+        source: header names to read the column from (defaults to `name`)
+        required: reject rows where the value is missing
+        default: value used when an optional value is missing
+        positive: reject rows where the number is <= 0
+        locale: number locale for kind "number" ("auto", "fr" or "en")
+    """
+
+    def __init__(self, name: str, kind: str = "str", source: Optional[List[str]] = None,
+                 required: bool = False, default: Any = None, positive: bool = False,
+                 locale: str = "auto"):
+        self.name = name
+        self.kind = kind
+        self.source = source or [name]
+        self.required = required
+        self.default = default
+        self.positive = positive
+        self.locale = locale
+
+
+class Schema:
+    """Columns of a data file"""
+
+    def __init__(self, name: str, columns: List[Column]):
+        self.name = name
+        self.columns = columns
+
+    def resolve(self, header: List[str]) -> List[Tuple[Column, Optional[int]]]:
+        """Map every column to its position in the header (None when absent)"""
+        positions = {name.strip(): i for i, name in enumerate(header)}
+        resolved = []
+        for column in self.columns:
+            index = next((positions[s] for s in column.source if s in positions), None)
+            if index is None and column.required:
+                raise ValueError(f"{self.name}: missing required column '{column.name}'")
+            resolved.append((column, index))
+        return resolved
+
+
+# ============================================
+# REPORTS
+# ============================================
+
+class IngestReport:
+    """Outcome of loading one file: counters and per-row errors"""
+
+    def __init__(self, source: str, schema: str, max_errors: Optional[int] = MAX_REPORTED_ERRORS):
+        self.source = source
+        self.schema = schema
+        self.max_errors = max_errors
+        self.rows_read = 0
+        self.rows_loaded = 0
+        self.rows_rejected = 0
+        self.error_count = 0
+        self.errors: List[Dict] = []
+
+    def add_error(self, row: int, column: Optional[str], value: Any, message: str, rejected: bool):
+        self.error_count += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append({
+                "row": row,
+                "column": column,
+                "value": value,
+                "message": message,
+                "action": "rejected" if rejected else "set to null"
+            })
+
+    def to_dict(self) -> Dict:
+        return {
+            "source": self.source,
+            "schema": self.schema,
+            "rows_read": self.rows_read,
+            "rows_loaded": self.rows_loaded,
+            "rows_rejected": self.rows_rejected,
+            "error_count": self.error_count,
+            "errors": self.errors
+        }
+
+
+# ============================================
+# READER
+# ============================================
+
+def read_csv(path: str, schema: Schema, encoding: str = 'utf-8-sig') -> Tuple[List[Dict], IngestReport]:
+    """Load a whole CSV file with a schema"""
+    report = IngestReport(path, schema.name)
+    rows = []
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        for chunk in stream_chunks(f, schema, report):
+            rows.extend(chunk)
+    return rows, report
+
+
+def stream_rows(lines, schema: Schema, report: IngestReport) -> Iterator[Dict]:
+    """Stream typed rows from CSV text lines (a file object or any iterable of lines)"""
+    for chunk in stream_chunks(lines, schema, report):
+        yield from chunk
+
+
+def stream_chunks(lines, schema: Schema, report: IngestReport) -> Iterator[List[Dict]]:
+    """
+    Stream typed rows from CSV text lines, CHUNK_SIZE rows at a time
+
+    Row dicts are built straight from the parsed lines, then each typed column
+    is converted with C-level map() fast paths and written back into the rows;
+    per-value parsing only runs on the columns the fast path rejects, once per
+    distinct value, and each failure is recorded in the report.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    resolved = schema.resolve(header)
+    # Key of every header position in the row dicts (unused columns are dropped)
+    keys = [_SKIP] * len(header)
+    for column, index in resolved:
+        if index is not None:
+            keys[index] = column.name
+    width = max((index for _, index in resolved if index is not None), default=-1) + 1
+
+    first_row = 1
+    while True:
+        lines_read = list(islice(reader, CHUNK_SIZE))
+        if not lines_read:
+            break
+        # Blank lines are skipped, as csv.DictReader does
+        chunk = list(filter(None, lines_read))
+        if chunk:
+            yield _convert_chunk(chunk, first_row, resolved, keys, width, report)
+        first_row += len(chunk)
+
+
+def _convert_chunk(chunk: List[List[str]], first_row: int, resolved, keys: List[Any],
+                   width: int, report: IngestReport) -> List[Dict]:
+    size = len(chunk)
+    report.rows_read += size
+    rejected = set()
+
+    # Short rows (truncated lines) would leave columns out of their row
+    if width and min(map(len, chunk)) < width:
+        for i, row in enumerate(chunk):
+            if len(row) < width:
+                report.add_error(first_row + i, None, None, f"row has {len(row)} fields, expected {width}", False)
+                chunk[i] = row + [""] * (width - len(row))
+
+    records = list(map(dict, map(zip, repeat(keys), chunk)))
+    if _SKIP in keys:
+        _consume(map(dict.pop, records, repeat(_SKIP), repeat(None)))
+
+    for column, index in resolved:
+        if index is None:
+            values = repeat(column.default, size)
+        elif column.kind == "str":
+            # Already in the rows as read, only a required value needs checking
+            if column.required:
+                _convert_column(column, list(map(itemgetter(index), chunk)), first_row, rejected, report)
+            continue
+        else:
+            values = _convert_column(column, list(map(itemgetter(index), chunk)), first_row, rejected, report)
+        _consume(map(dict.__setitem__, records, repeat(column.name), values))
+
+    report.rows_loaded += size - len(rejected)
+    if not rejected:
+        return records
+    report.rows_rejected += len(rejected)
+    keep = [True] * size
+    for i in rejected:
+        keep[i] = False
+    return list(compress(records, keep))
+
+
+def _consume(iterator: Iterator):
+    deque(iterator, maxlen=0)
+
+
+def _convert_column(column: Column, values: List[str], first_row: int,
+                    rejected: set, report: IngestReport) -> List[Any]:
+    if column.kind == "str":
+        if column.required and "" in values:
+            for i, value in enumerate(values):
+                if not value:
+                    rejected.add(i)
+                    report.add_error(first_row + i, column.name, value, "missing value", True)
+        return list(values)
+
+    # Fast path: the whole column converts at C speed
+    converted = None
+    try:
+        if column.kind == "int":
+            converted = list(map(int, values))
+        elif column.kind == "float":
+            converted = list(map(float, values))
+        elif column.locale == "auto" and any(map(_LONE_THOUSANDS.fullmatch, values)):
+            # "1,495" would convert to 1.495
+            converted = None
+        else:
+            cleaned = values
+            for old, new in _NUMBER_REPLACEMENTS.get(column.locale, _NUMBER_REPLACEMENTS["auto"]):
+                cleaned = map(str.replace, cleaned, repeat(old), repeat(new))
+            converted = list(map(float, cleaned))
+    except ValueError:
+        converted = None
+
+    if converted is None:
+        converted = _convert_slow(column, values, first_row, rejected, report)
+
+    if column.positive and converted and (None in converted or min(converted) <= 0):
+        for i, value in enumerate(converted):
+            if value is not None and value <= 0 and i not in rejected:
+                rejected.add(i)
+                report.add_error(first_row + i, column.name, value, "must be positive", True)
+    return converted
+
+
+def _convert_slow(column: Column, values: List[str], first_row: int,
+                  rejected: set, report: IngestReport) -> List[Any]:
+    # Parse each distinct value once: ratings, counts or flags repeat a lot
+    parsed = {}
+    invalid = {}
+    for value in set(values):
+        stripped = value.strip()
+        if stripped in NULL_VALUES:
+            parsed[value] = column.default
+            if column.required:
+                invalid[value] = "missing value"
+            continue
+        number = _parse_value(column, stripped)
+        if number is None:
+            parsed[value] = column.default
+            invalid[value] = f"not a valid {column.kind}"
+        else:
+            parsed[value] = number
+
+    converted = list(map(parsed.__getitem__, values))
+    if invalid:
+        for i, value in enumerate(values):
+            if value in invalid:
+                report.add_error(first_row + i, column.name, value, invalid[value], column.required)
+                if column.required:
+                    rejected.add(i)
+    return converted
+
+
+def _parse_value(column: Column, value: str) -> Optional[float]:
+    if column.kind == "int":
+        try:
+            return int(value)
+        except ValueError:
+            number = parse_number(value, "en")
+            return int(number) if number is not None and number == int(number) else None
+    if column.kind == "float":
+        try:
+            return float(value)
+        except ValueError:
+            return parse_number(value, "en")
+    return parse_number(value, column.locale)
+
+
+# ============================================
+# SCHEMAS OF THE DATA FILES
+# ============================================
+
+# {vendor}_catalog.csv written by ScraperService
+SCRAPED_PRODUCT_SCHEMA = Schema("scraped_product", [
+    Column("id", required=True),
+    Column("vendor", default=""),
+    Column("name", default=""),
+    Column("model", default=""),
+    Column("screen_size", default=""),
+    Column("rating", "float"),
+    Column("reviews_count", "int"),
+    Column("price", "number", required=True, positive=True),
+    Column("link", default=""),
+    Column("features", default=""),
+    Column("scraped_at", default=""),
+])
+
+# dell_laptops.csv, the original Dell export with French column names
+LEGACY_DELL_SCHEMA = Schema("legacy_dell", [
+    Column("model", source=["modele"], required=True),
+    Column("name", source=["nom"], default=""),
+    Column("screen_size", source=["taille_ecran"], default=""),
+    Column("rating", "float", source=["note"]),
+    Column("reviews_count", "int", source=["nombre_avis"]),
+    Column("price", "number", source=["prix"], required=True, positive=True, locale="fr"),
+    Column("link", source=["lien"], default=""),
+    Column("features", source=["caracteristiques"], default=""),
+])
+
+# equipment_catalog.csv
+EQUIPMENT_SCHEMA = Schema("equipment", [
+    Column("type", required=True),
+    Column("brand", default=""),
+    Column("model", default=""),
+    Column("name", default=""),
+    Column("price_new", "number", required=True),
+    Column("price_refurb", "number"),
+    Column("co2_new", "float", required=True),
+    Column("co2_refurb", "float"),
+    Column("lifespan_new", "int", default=60),
+    Column("lifespan_refurb", "int"),
+    Column("power_on", "float", default=0.05),
+    Column("power_standby", "float", default=0.005),
+    Column("source_co2", default="ADEME"),
+])
@@ -0,0 +1,109 @@
+"""Concurrent load test of the reservation endpoints (no double reservations)"""
+import sys
+import os
+import time
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Throwaway marketplace state, written with the default fsync setting (group commits)
+os.environ["MARKETPLACE_STATE_DIR"] = tempfile.mkdtemp(prefix="marketplace-load-")
+
+from fastapi import HTTPException
+
+import main
+from main import (
+    CreateEquipmentRequest, LoginRequest, ReservationRequest, ReservationStatus,
+    UpdateReservationRequest, MARKETPLACE_STORE, RESERVATION_STORE, MARKETPLACE_STATS
+)
+
+ITEMS = 20
+USERS = 500
+REQUESTS = 20000
+WORKERS = 64
+
+
+def run_request(rng: random.Random, item_ids, users):
+    """One random collaborator or admin action, the ones contending for the same items"""
+    item_id = rng.choice(item_ids)
+    action = rng.random()
+    try:
+        if action < 0.6:
+            main.create_reservation(ReservationRequest(equipment_id=item_id, user_email=rng.choice(users)))
+        else:
+            pending = RESERVATION_STORE.find(equipment_id=item_id, status="pending")
+            if not pending:
+                return "idle"
+            reservation = pending[0]
+            if action < 0.8:
+                main.cancel_reservation(reservation["id"], reservation["user_email"])
+            else:
+                # Mostly rejections, so that items keep coming back to the marketplace
+                status = ReservationStatus.approved if rng.random() < 0.05 else ReservationStatus.rejected
+                main.update_reservation(reservation["id"], UpdateReservationRequest(status=status))
+        return "ok"
+    except HTTPException as e:
+        return f"refused {e.status_code}"
+
+
+def check_invariants(item_ids):
+    """Every item has at most one live reservation, and its status agrees with it"""
+    errors = []
+    for item_id in item_ids:
+        reservations = RESERVATION_STORE.find(equipment_id=item_id)
+        pending = [r for r in reservations if r["status"] == "pending"]
+        approved = [r for r in reservations if r["status"] == "approved"]
+        status = MARKETPLACE_STORE.get(item_id)["status"]
+        if len(pending) + len(approved) > 1:
+            errors.append(f"{item_id}: {len(pending)} pending and {len(approved)} approved reservations")
+        elif pending and status != "reserved":
+            errors.append(f"{item_id}: pending reservation but status {status}")
+        elif approved and status != "sold":
+            errors.append(f"{item_id}: approved reservation but status {status}")
+        elif not pending and not approved and status != "available":
+            errors.append(f"{item_id}: no reservation but status {status}")
+    return errors
+
+
+def test_reservations_under_load():
+    """Hammer a few items with concurrent reservations, cancellations and decisions"""
+    print(f"Creating {ITEMS} items and {USERS} collaborators...")
+    item_ids = [
+        main.create_marketplace_item(CreateEquipmentRequest(
+            type="laptop", brand="Dell", model=f"Load Test {i}", condition="good", age_months=12
+        )).id
+        for i in range(ITEMS)
+    ]
+    users = [main.login(LoginRequest(email=f"load.user{i}@lvmh.com")).email for i in range(USERS)]
+
+    print(f"\nRunning {REQUESTS} requests on {WORKERS} threads...")
+    outcomes = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        seeds = range(REQUESTS)
+        for outcome in pool.map(lambda seed: run_request(random.Random(seed), item_ids, users), seeds):
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    elapsed = time.perf_counter() - start
+    print(f"  {REQUESTS / elapsed:.0f} requests/s ({elapsed:.2f}s): {outcomes}")
+
+    errors = check_invariants(item_ids)
+    if errors:
+        print(f"✗ {len(errors)} inconsistent items:")
+        for error in errors[:10]:
+            print(f"  {error}")
+    else:
+        print("✓ No double reservation, every item status matches its reservations")
+
+    stats = MARKETPLACE_STATS.verify(MARKETPLACE_STORE, RESERVATION_STORE)
+    print(f"{'✓' if stats['consistent'] else '✗'} Marketplace stats consistent: {stats['differences'] or 'yes'}")
+
+    main.MARKETPLACE_LOG.close()
+    print("\nTest completed!")
+    return not errors and stats["consistent"]
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_reservations_under_load() else 1)
@@ -1,20 +1,55 @@
-from fastapi import FastAPI, HTTPException, Depends
+import time
+_BOOT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Optional, List, Tuple
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
+import json
+import base64
 import csv
+import io
 import os
 import re
 import logging
-from scraper_service import ScraperService
+import threading
+import asyncio
+from price_history import PriceHistoryStore
+from http_cache import CatalogVersion, ResponseCache, conditional_json
+from catalog_store import VendorCatalogStore
+from facet_index import FacetIndex, LAPTOP_FACETS, EQUIPMENT_FACETS
+from boot_timer import BootTimer
+from product_matching import match_scraped_products
+from catalog_writer import CatalogWriter
+from marketplace_store import MarketplaceStore, ReservationStore, StripedLock, effective_price
+from marketplace_stats import MarketplaceStats
+from order_stats import OrderStats, freeze_item_fields
+from order_rollups import DIMENSIONS, GRANULARITIES, ORDER_EVENTS
+from reservation_expiry import ExpiryHeap
+from impact_ledger import METRICS as IMPACT_METRICS, ImpactLedger
+from certificates import CertificateCache, CertificateRenderer
+from persistence import DurableLog
+from change_feed import ChangeFeed
+from saved_searches import NotificationQueue, SavedSearchIndex
+from repricing import build_model_price_index, model_key, reprice_listings, suggested_price
+from exports import EXPORT_FORMATS, export_response
+from ingestion import IngestReport, read_csv, stream_rows, EQUIPMENT_SCHEMA
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BOOT_TIMER = BootTimer(started_at=_BOOT_STARTED)
+BOOT_TIMER.record("imports", _BOOT_STARTED, time.perf_counter())
+
+# Scraper scheduler configuration (the scraper subsystem is only loaded when needed)
+SCRAPER_SCHEDULER_ENABLED = os.environ.get("SCRAPER_SCHEDULER_ENABLED", "").lower() in ("1", "true", "yes")
+SCRAPER_SCHEDULE_HOURS = int(os.environ.get("SCRAPER_SCHEDULE_HOURS", "24"))
+
 app = FastAPI(
     title="Green IT ROI Platform",
     description="LVMH Green IT ROI Calculator & Marketplace",
@@ -186,211 +221,141 @@ LEASING_RATES = {
 
 
 # ============================================
-# DELL CATALOG
+# VENDOR CATALOG (Dell, HP, ...)
 # ============================================
 
-def clean_dell_url(url: str) -> str:
-    """Clean Dell URL to remove double domain"""
-    if not url:
-        return url
-    # Fix double domain pattern: https://www.dell.com//www.dell.com/...
-    # Look for the pattern where we have //www.dell.com/ after https://www.dell.com
-    if 'https://www.dell.com//www.dell.com/' in url:
-        # Replace the double domain with single domain
-        url = url.replace('https://www.dell.com//www.dell.com/', 'https://www.dell.com/', 1)
-    return url
-
-
-def load_dell_catalog():
-    """Load Dell laptops from CSV files (both old format and new scraper format)"""
-    dell_laptops = []
-    data_dir = os.path.join(os.path.dirname(__file__), "data")
-    
-    # Try to load from new scraper format first (most recent)
-    scraper_csv_path = os.path.join(data_dir, "dell_catalog.csv")
-    if os.path.exists(scraper_csv_path):
-        try:
-            with open(scraper_csv_path, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # New scraper format
-                    try:
-                        price = float(row.get('price', 0))
-                        if price <= 0:
-                            continue
-                        
-                        rating = None
-                        if row.get('rating'):
-                            try:
-                                rating = float(row.get('rating'))
-                            except:
-                                pass
-                        
-                        reviews = None
-                        if row.get('reviews_count'):
-                            try:
-                                reviews = int(row.get('reviews_count'))
-                            except:
-                                pass
-                        
-                        # Clean the URL
-                        link = clean_dell_url(row.get('link', ''))
-                        
-                        dell_laptops.append({
-                            "id": row.get('id', ''),
-                            "name": row.get('name', ''),
-                            "model": row.get('model', ''),
-                            "screen_size": row.get('screen_size', ''),
-                            "rating": rating,
-                            "reviews_count": reviews,
-                            "price": price,
-                            "link": link,
-                            "features": row.get('features', '')
-                        })
-                    except Exception as e:
-                        logger.warning(f"Error parsing row in scraper CSV: {e}")
-                        continue
-        except Exception as e:
-            logger.error(f"Error loading Dell catalog from scraper CSV: {e}")
-    
-    # Also load from old format if exists (fallback)
-    old_csv_path = os.path.join(data_dir, "dell_laptops.csv")
-    if os.path.exists(old_csv_path) and not dell_laptops:
-        try:
-            with open(old_csv_path, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Parse price (format: "941,40 €" or "1 495,78 €" -> 941.40 or 1495.78)
-                    price_str = row.get('prix', '0')
-                    # Remove € symbol and all spaces (including non-breaking spaces)
-                    price_str = price_str.replace('€', '').replace(' ', '').replace('\u00a0', '').replace('\u202f', '').strip()
-                    # Replace comma with dot for decimal
-                    price_str = price_str.replace(',', '.')
-                    # Remove any remaining dots except the last one (thousands separator)
-                    if price_str.count('.') > 1:
-                        parts = price_str.rsplit('.', 1)
-                        price_str = parts[0].replace('.', '') + '.' + parts[1]
-                    
-                    try:
-                        price = float(price_str) if price_str else 0
-                    except:
-                        price = 0
-                    
-                    # Skip items with no valid price
-                    if price <= 0:
-                        continue
-                    
-                    # Parse rating
-                    rating_str = row.get('note', 'N/A')
-                    try:
-                        rating = float(rating_str) if rating_str and rating_str != 'N/A' else None
-                    except:
-                        rating = None
-                    
-                    # Parse reviews count
-                    reviews_str = row.get('nombre_avis', 'N/A')
-                    try:
-                        reviews = int(reviews_str) if reviews_str and reviews_str != 'N/A' else None
-                    except:
-                        reviews = None
-                    
-                    # Clean the URL
-                    link = clean_dell_url(row.get('lien', ''))
-                    
-                    dell_laptops.append({
-                        "id": f"dell-{row.get('modele', '')}",
-                        "name": row.get('nom', ''),
-                        "model": row.get('modele', ''),
-                        "screen_size": row.get('taille_ecran', ''),
-                        "rating": rating,
-                        "reviews_count": reviews,
-                        "price": price,
-                        "link": link,
-                        "features": row.get('caracteristiques', '')
-                    })
-        except Exception as e:
-            logger.error(f"Error loading Dell catalog from old CSV: {e}")
-    
-    # Remove duplicates based on ID
-    seen_ids = set()
-    unique_laptops = []
-    for laptop in dell_laptops:
-        if laptop.get('id') and laptop['id'] not in seen_ids:
-            seen_ids.add(laptop['id'])
-            unique_laptops.append(laptop)
-    
-    logger.info(f"Loaded {len(unique_laptops)} Dell laptops from catalog")
-    return unique_laptops
+# Version of the catalog data (scraped + equipment), used for ETags and the response cache
+CATALOG_VERSION = CatalogVersion()
+CATALOG_RESPONSE_CACHE = ResponseCache()
+
+# Scraped products, one lazily loaded shard per `{vendor}_catalog.csv`; discovering
+# or (re)loading a shard bumps the catalog version
+CATALOG_STORE = VendorCatalogStore(
+    data_dir=os.path.join(os.path.dirname(__file__), "data"),
+    on_change=CATALOG_VERSION.bump
+)
+
 
-# Load Dell catalog on startup
-DELL_CATALOG = load_dell_catalog()
+def get_dell_catalog() -> List[dict]:
+    """Get the Dell laptops (the Dell shard of the vendor catalog)"""
+    return CATALOG_STORE.get("dell")
 
-# Initialize scraper service
-SCRAPER_SERVICE = ScraperService(data_dir=os.path.join(os.path.dirname(__file__), "data"))
+
+def reload_vendor_catalog(vendor: str) -> int:
+    """Reload one vendor shard from its CSV file, leaving the other vendors untouched"""
+    return CATALOG_STORE.reload(vendor)
 
 
 def reload_dell_catalog():
     """Reload Dell catalog from CSV files"""
-    global DELL_CATALOG
-    DELL_CATALOG = load_dell_catalog()
-    return len(DELL_CATALOG)
+    return reload_vendor_catalog("dell")
+
+
+# ============================================
+# PRICE HISTORY
+# ============================================
+
+# Every scraped price, not only the latest one kept in the vendor catalog.
+# Filled on the first price query, each query then only reads newly appended rows.
+PRICE_HISTORY = PriceHistoryStore(data_dir=os.path.join(os.path.dirname(__file__), "data"))
 
 
 # ============================================
 # EQUIPMENT CATALOG (All types)
 # ============================================
 
+EQUIPMENT_CSV_PATH = os.path.join(os.path.dirname(__file__), "data", "equipment_catalog.csv")
+EQUIPMENT_CSV_FIELDS = [
+    "type", "brand", "model", "name", "price_new", "price_refurb",
+    "co2_new", "co2_refurb", "lifespan_new", "lifespan_refurb",
+    "power_on", "power_standby", "source_co2"
+]
+
+# Every write to the catalog CSV files goes through this single writer thread.
+# CATALOG_FSYNC=never trades durability of the last acknowledged writes for throughput.
+# If committed rows cannot be applied in memory, the file is reloaded from disk.
+CATALOG_WRITER = CatalogWriter(
+    fsync=os.environ.get("CATALOG_FSYNC", "always"),
+    on_apply_error=lambda path: resync_catalog_file(path)
+)
+
+
+def equipment_item_id(equipment_type: str, brand: str, model: str) -> str:
+    return f"{equipment_type}-{brand}-{model}".lower().replace(' ', '-')
+
+
 def load_equipment_catalog():
     """Load all equipment from CSV file"""
+    global EQUIPMENT_INGEST_REPORT
     catalog = []
-    csv_path = os.path.join(os.path.dirname(__file__), "data", "equipment_catalog.csv")
+    csv_path = EQUIPMENT_CSV_PATH
     
     if not os.path.exists(csv_path):
         return catalog
     
     try:
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Parse price_refurb (may be empty for refurbished items)
-                price_refurb = None
-                if row.get('price_refurb') and row.get('price_refurb').strip():
-                    try:
-                        price_refurb = float(row.get('price_refurb'))
-                    except:
-                        price_refurb = None
-                
-                # Parse lifespan_refurb (may be empty)
-                lifespan_refurb = None
-                if row.get('lifespan_refurb') and row.get('lifespan_refurb').strip():
-                    try:
-                        lifespan_refurb = int(row.get('lifespan_refurb'))
-                    except:
-                        lifespan_refurb = None
-                
-                catalog.append({
-                    "id": f"{row.get('type', '')}-{row.get('brand', '')}-{row.get('model', '')}".lower().replace(' ', '-'),
-                    "type": row.get('type', ''),
-                    "brand": row.get('brand', ''),
-                    "model": row.get('model', ''),
-                    "name": row.get('name', ''),
-                    "price_new": float(row.get('price_new', 0)),
-                    "price_refurb": price_refurb,
-                    "co2_new": float(row.get('co2_new', 0)),
-                    "co2_refurb": float(row.get('co2_refurb', 0)) if row.get('co2_refurb') else None,
-                    "lifespan_new": int(row.get('lifespan_new', 60)),
-                    "lifespan_refurb": lifespan_refurb,
-                    "power_on": float(row.get('power_on', 0.05)),
-                    "power_standby": float(row.get('power_standby', 0.005)),
-                    "source_co2": row.get('source_co2', 'ADEME')
-                })
-    except Exception as e:
-        print(f"Error loading equipment catalog: {e}")
+        rows, EQUIPMENT_INGEST_REPORT = read_csv(csv_path, EQUIPMENT_SCHEMA)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading equipment catalog: {e}")
+        return catalog
+    
+    if EQUIPMENT_INGEST_REPORT.error_count:
+        logger.warning(
+            f"Equipment catalog: {EQUIPMENT_INGEST_REPORT.rows_rejected} rows rejected, "
+            f"{EQUIPMENT_INGEST_REPORT.error_count} errors (see /api/ingestion/reports)"
+        )
+    
+    for row in rows:
+        item_id = equipment_item_id(row["type"], row["brand"], row["model"])
+        catalog.append({"id": item_id, **row})
     
     return catalog
 
+# Ingestion report of the last equipment catalog load
+EQUIPMENT_INGEST_REPORT = None
+
 # Load equipment catalog on startup
-EQUIPMENT_CATALOG = load_equipment_catalog()
+with BOOT_TIMER.phase("equipment_catalog"):
+    EQUIPMENT_CATALOG = load_equipment_catalog()
+
+# Catalog items by id (duplicate checks and lookups)
+EQUIPMENT_INDEX = {item["id"]: item for item in EQUIPMENT_CATALOG}
+
+
+def resync_catalog_file(path: str):
+    """Reload the in-memory copy of a catalog file from disk (runs on the writer thread)"""
+    if path == EQUIPMENT_CSV_PATH:
+        EQUIPMENT_CATALOG[:] = load_equipment_catalog()
+        EQUIPMENT_INDEX.clear()
+        EQUIPMENT_INDEX.update((item["id"], item) for item in EQUIPMENT_CATALOG)
+        logger.warning(f"Equipment catalog reloaded from {path}: {len(EQUIPMENT_CATALOG)} items")
+    CATALOG_VERSION.bump()
+
+
+# ============================================
+# FACET INDEXES
+# ============================================
+
+# catalog name -> (catalog version, index); rebuilt lazily after a catalog change
+FACET_INDEXES = {}
+
+
+def get_facet_index(catalog: str) -> FacetIndex:
+    """Get the facet index of a catalog ("laptops" or "equipment") for the current catalog version"""
+    version = CATALOG_VERSION.version
+    cached = FACET_INDEXES.get(catalog)
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    if catalog == "laptops":
+        rows = sorted(CATALOG_STORE.get_all(), key=lambda x: x["price"])
+        index = FacetIndex(rows, LAPTOP_FACETS)
+    else:
+        rows = sorted(EQUIPMENT_CATALOG, key=lambda x: x["price_new"])
+        index = FacetIndex(rows, EQUIPMENT_FACETS)
+    
+    FACET_INDEXES[catalog] = (version, index)
+    return index
 
 
 # ============================================
@@ -591,14 +556,14 @@ def root():
 
 
 @app.get("/api/equipment")
-def get_equipment_list():
+def get_equipment_list(request: Request):
     """Get list of all available equipment types"""
-    return {
+    return conditional_json(request, CATALOG_VERSION, CATALOG_RESPONSE_CACHE, lambda: {
         "equipment": [
             {"id": k, "name": v["name"], "has_refurb": v["price_refurb"] is not None}
             for k, v in EQUIPMENT_DATA.items()
         ]
-    }
+    })
 
 
 @app.get("/api/equipment/{equipment_type}")
@@ -610,9 +575,17 @@ def get_equipment_details(equipment_type: EquipmentType):
 
 
 @app.get("/api/dell/laptops")
-def get_dell_laptops(min_price: Optional[float] = None, max_price: Optional[float] = None):
+def get_dell_laptops(request: Request, min_price: Optional[float] = None, max_price: Optional[float] = None):
     """Get Dell laptop catalog with optional price filter"""
-    laptops = DELL_CATALOG.copy()
+    return conditional_json(
+        request, CATALOG_VERSION, CATALOG_RESPONSE_CACHE,
+        lambda: build_dell_laptops(min_price, max_price)
+    )
+
+
+def build_dell_laptops(min_price: Optional[float], max_price: Optional[float]) -> dict:
+    """Build the Dell laptop list response (called on response cache misses)"""
+    laptops = get_dell_catalog().copy()
     
     if min_price is not None:
         laptops = [l for l in laptops if l["price"] >= min_price]
@@ -625,47 +598,179 @@ def get_dell_laptops(min_price: Optional[float] = None, max_price: Optional[floa
     return {"laptops": laptops, "total": len(laptops)}
 
 
+@app.get("/api/laptops")
+def get_laptops(
+    request: Request,
+    vendor: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None
+):
+    """Get scraped laptops from every vendor, with optional vendor and price filters"""
+    return conditional_json(
+        request, CATALOG_VERSION, CATALOG_RESPONSE_CACHE,
+        lambda: build_laptops(vendor, min_price, max_price)
+    )
+
+
+def build_laptops(vendor: Optional[str], min_price: Optional[float], max_price: Optional[float]) -> dict:
+    """Build the multi-vendor laptop list response (called on response cache misses)"""
+    laptops = CATALOG_STORE.get_all([vendor] if vendor else None)
+    
+    if min_price is not None:
+        laptops = [l for l in laptops if l["price"] >= min_price]
+    if max_price is not None:
+        laptops = [l for l in laptops if l["price"] <= max_price]
+    
+    laptops = sorted(laptops, key=lambda x: x["price"])
+    
+    return {
+        "laptops": laptops,
+        "total": len(laptops),
+        "facets": {"vendor": CATALOG_STORE.vendor_counts()}
+    }
+
+
 @app.get("/api/dell/laptops/{model_id}")
 def get_dell_laptop(model_id: str):
     """Get a specific Dell laptop by model ID"""
-    laptop = next((l for l in DELL_CATALOG if l["id"] == model_id), None)
+    laptop = CATALOG_STORE.get_product("dell", model_id)
     if not laptop:
         raise HTTPException(status_code=404, detail="Dell laptop not found")
     return laptop
 
 
 @app.get("/api/scraped-products")
-def get_scraped_products(vendor: Optional[str] = None):
+def get_scraped_products(request: Request, vendor: Optional[str] = None):
     """Get all scraped products (for admin to add to catalog)"""
-    products = []
-    
-    # Get Dell products
-    if not vendor or vendor.lower() == "dell":
-        for laptop in DELL_CATALOG:
-            products.append({
-                "id": laptop["id"],
-                "vendor": "Dell",
-                "name": laptop["name"],
-                "model": laptop["model"],
-                "price": laptop["price"],
-                "screen_size": laptop.get("screen_size", ""),
-                "link": laptop.get("link", ""),
-                "features": laptop.get("features", ""),
-                "rating": laptop.get("rating"),
-                "reviews_count": laptop.get("reviews_count")
-            })
-    
-    # Can add HP and other vendors here
+    return conditional_json(
+        request, CATALOG_VERSION, CATALOG_RESPONSE_CACHE,
+        lambda: build_scraped_products(vendor)
+    )
+
+
+def build_scraped_products(vendor: Optional[str]) -> dict:
+    """Build the scraped products response (called on response cache misses)"""
+    vendors = [vendor] if vendor else None
+    products = [
+        {
+            "id": product["id"],
+            "vendor": product["vendor"],
+            "name": product["name"],
+            "model": product["model"],
+            "price": product["price"],
+            "screen_size": product.get("screen_size", ""),
+            "link": product.get("link", ""),
+            "features": product.get("features", ""),
+            "rating": product.get("rating"),
+            "reviews_count": product.get("reviews_count")
+        }
+        for product in CATALOG_STORE.get_all(vendors)
+    ]
     
     return {
         "products": products,
-        "total": len(products)
+        "total": len(products),
+        "facets": {"vendor": CATALOG_STORE.vendor_counts()}
     }
 
 
+@app.get("/api/scraped-products/matches")
+def get_scraped_product_matches(request: Request, vendor: Optional[str] = None, min_confidence: float = 0.0):
+    """
+    Link scraped products to existing catalog items and to each other
+    
+    Each scraped product gets its best catalog match, a confidence (0-1) and a
+    suggested action: "link" (already in the catalog), "review" or "add".
+    """
+    def build():
+        scraped = CATALOG_STORE.get_all([vendor] if vendor else None)
+        return match_scraped_products(scraped, EQUIPMENT_CATALOG, min_confidence=min_confidence)
+    
+    return conditional_json(request, CATALOG_VERSION, CATALOG_RESPONSE_CACHE, build)
+
+
+@app.get("/api/vendors")
+def get_catalog_vendors():
+    """Get the vendor shards of the scraped catalog and their load status"""
+    return {"vendors": CATALOG_STORE.status()}
+
+
+@app.get("/api/prices/drops")
+def get_price_drops(min_drop_percent: float = 10, vendor: Optional[str] = None, limit: int = 100):
+    """Get products whose price dropped more than `min_drop_percent` since the previous scrape"""
+    PRICE_HISTORY.refresh()
+    drops = PRICE_HISTORY.get_price_drops(min_drop_percent, vendor=vendor, limit=limit)
+    return {"products": drops, "total": len(drops)}
+
+
+@app.get("/api/prices/{product_id}/history")
+def get_price_history(
+    product_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = Query(500, ge=2)
+):
+    """Get the price history of a scraped product (downsampled for long ranges)"""
+    PRICE_HISTORY.refresh()
+    history = PRICE_HISTORY.get_history(product_id, start=start, end=end, max_points=max_points)
+    if history is None:
+        raise HTTPException(status_code=404, detail="No price history for this product")
+    return history
+
+
+@app.get("/api/prices/{product_id}/stats")
+def get_price_stats(product_id: str, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Get min / max / median price of a scraped product over a time window"""
+    PRICE_HISTORY.refresh()
+    stats = PRICE_HISTORY.get_stats(product_id, start=start, end=end)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No price history for this product")
+    return stats
+
+
+@app.get("/api/facets/{catalog}")
+def search_facets(
+    request: Request,
+    catalog: str,
+    operator: str = "and",
+    offset: int = 0,
+    limit: Optional[int] = None
+):
+    """
+    Filter a catalog with facets and get live counts per facet value
+    
+    Args:
+        catalog: "laptops" (all scraped vendors) or "equipment"
+        operator: "and" to combine facets with AND, "or" with OR (values of one facet are always OR-ed)
+        Any other query parameter named after a facet is a filter, e.g. ?vendor=Dell&vendor=HP&price=500-1000
+    """
+    if catalog not in ("laptops", "equipment"):
+        raise HTTPException(status_code=404, detail="Catalog not found")
+    if operator not in ("and", "or"):
+        raise HTTPException(status_code=400, detail="Operator must be 'and' or 'or'")
+    
+    def build():
+        index = get_facet_index(catalog)
+        filters = {}
+        for key, value in request.query_params.multi_items():
+            if key in index.facets:
+                filters.setdefault(key, []).append(value)
+        return index.search(filters, operator=operator, offset=offset, limit=limit)
+    
+    return conditional_json(request, CATALOG_VERSION, CATALOG_RESPONSE_CACHE, build)
+
+
 @app.get("/api/catalog/{equipment_type}")
-def get_equipment_catalog(equipment_type: str):
+def get_equipment_catalog(request: Request, equipment_type: str, vendor: Optional[str] = None):
     """Get equipment catalog by type (screen, smartphone, tablet, switch_router, phone, refurbished_*, meeting_room_screen)"""
+    return conditional_json(
+        request, CATALOG_VERSION, CATALOG_RESPONSE_CACHE,
+        lambda: build_equipment_catalog(equipment_type, vendor)
+    )
+
+
+def build_equipment_catalog(equipment_type: str, vendor: Optional[str] = None) -> dict:
+    """Build the equipment catalog response (called on response cache misses)"""
     # Map equipment type to catalog type
     type_mapping = {
         "screen": "screen",
@@ -681,20 +786,30 @@ def get_equipment_catalog(equipment_type: str):
     
     catalog_type = type_mapping.get(equipment_type, equipment_type)
     items = [item for item in EQUIPMENT_CATALOG if item["type"] == catalog_type]
+    if not items and catalog_type not in type_mapping.values():
+        raise HTTPException(status_code=404, detail="Catalog not found")
+    
+    # Vendor facet: item count per brand for this type, before the vendor filter
+    vendor_counts = {}
+    for item in items:
+        vendor_counts[item["brand"]] = vendor_counts.get(item["brand"], 0) + 1
+    
+    if vendor:
+        items = [item for item in items if item["brand"].lower() == vendor.lower()]
     
     if not items:
-        return {"items": [], "total": 0}
+        return {"items": [], "total": 0, "facets": {"vendor": vendor_counts}}
     
     # Sort by price
     items.sort(key=lambda x: x["price_new"])
     
-    return {"items": items, "total": len(items)}
+    return {"items": items, "total": len(items), "facets": {"vendor": vendor_counts}}
 
 
 @app.get("/api/catalog/item/{item_id}")
 def get_catalog_item(item_id: str):
     """Get a specific item from the catalog"""
-    item = next((i for i in EQUIPMENT_CATALOG if i["id"] == item_id), None)
+    item = EQUIPMENT_INDEX.get(item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
@@ -717,20 +832,10 @@ class AddScrapedProductRequest(BaseModel):
     source_co2: str = "ADEME"
 
 
-@app.post("/api/catalog/add-scraped")
-def add_scraped_product_to_catalog(request: AddScrapedProductRequest):
-    """Add a scraped product to the equipment catalog"""
-    # Generate ID
-    item_id = f"{request.type}-{request.brand}-{request.model}".lower().replace(' ', '-')
-    
-    # Check if already exists
-    existing = next((i for i in EQUIPMENT_CATALOG if i["id"] == item_id), None)
-    if existing:
-        raise HTTPException(status_code=400, detail="Product already exists in catalog")
-    
-    # Create new catalog item
-    new_item = {
-        "id": item_id,
+def build_catalog_item(request: AddScrapedProductRequest) -> dict:
+    """Build an equipment catalog item from an add request"""
+    return {
+        "id": equipment_item_id(request.type, request.brand, request.model),
         "type": request.type,
         "brand": request.brand,
         "model": request.model,
@@ -745,41 +850,29 @@ def add_scraped_product_to_catalog(request: AddScrapedProductRequest):
         "power_standby": request.power_standby,
         "source_co2": request.source_co2
     }
+
+
+def commit_catalog_items(items: List[dict]):
+    """Add items written by the catalog writer to the in-memory catalog (runs on the writer thread)"""
+    for item in items:
+        EQUIPMENT_CATALOG.append(item)
+        EQUIPMENT_INDEX[item["id"]] = item
+    CATALOG_VERSION.bump()
+
+
+@app.post("/api/catalog/add-scraped")
+def add_scraped_product_to_catalog(request: AddScrapedProductRequest):
+    """Add a scraped product to the equipment catalog"""
+    new_item = build_catalog_item(request)
     
-    # Add to in-memory catalog
-    EQUIPMENT_CATALOG.append(new_item)
-    
-    # Save to CSV file
-    csv_path = os.path.join(os.path.dirname(__file__), "data", "equipment_catalog.csv")
-    file_exists = os.path.exists(csv_path)
-    
-    fieldnames = [
-        "type", "brand", "model", "name", "price_new", "price_refurb",
-        "co2_new", "co2_refurb", "lifespan_new", "lifespan_refurb",
-        "power_on", "power_standby", "source_co2"
-    ]
+    def prepare(claimed: set):
+        # Checked on the writer thread, so two concurrent adds of one product cannot both pass
+        if new_item["id"] in EQUIPMENT_INDEX or new_item["id"] in claimed:
+            raise HTTPException(status_code=400, detail="Product already exists in catalog")
+        claimed.add(new_item["id"])
+        return [new_item], new_item
     
-    with open(csv_path, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        if not file_exists:
-            writer.writeheader()
-        
-        row = {
-            "type": request.type,
-            "brand": request.brand,
-            "model": request.model,
-            "name": request.name,
-            "price_new": request.price_new,
-            "price_refurb": request.price_refurb or "",
-            "co2_new": request.co2_new,
-            "co2_refurb": request.co2_refurb or "",
-            "lifespan_new": request.lifespan_new,
-            "lifespan_refurb": request.lifespan_refurb or "",
-            "power_on": request.power_on,
-            "power_standby": request.power_standby,
-            "source_co2": request.source_co2
-        }
-        writer.writerow(row)
+    CATALOG_WRITER.submit(EQUIPMENT_CSV_PATH, EQUIPMENT_CSV_FIELDS, prepare, commit_catalog_items).result()
     
     return {
         "success": True,
@@ -788,6 +881,105 @@ def add_scraped_product_to_catalog(request: AddScrapedProductRequest):
     }
 
 
+def import_catalog_rows(rows: List[dict], atomic: bool, outcomes: Optional[List[dict]] = None) -> dict:
+    """
+    Validate, deduplicate and add many catalog rows in one group commit
+    
+    Args:
+        rows: raw product rows (AddScrapedProductRequest fields)
+        atomic: write nothing if any row is invalid or a duplicate
+        outcomes: outcomes already known for rows rejected upstream (e.g. CSV parse errors)
+    
+    Returns:
+        Dictionary with per-row outcomes and counters
+    """
+    outcomes = list(outcomes or [])
+    valid = []
+    
+    for position, row in rows:
+        try:
+            valid.append((position, build_catalog_item(AddScrapedProductRequest(**row))))
+        except ValidationError as e:
+            outcomes.append({
+                "row": position,
+                "status": "invalid",
+                "errors": [f"{'.'.join(str(l) for l in err['loc'])}: {err['msg']}" for err in e.errors()]
+            })
+    
+    def prepare(claimed: set):
+        # Deduplicated on the writer thread, against the catalog and the batch being committed
+        results = list(outcomes)
+        accepted = []
+        batch_ids = set()
+        for position, item in valid:
+            if item["id"] in EQUIPMENT_INDEX or item["id"] in claimed or item["id"] in batch_ids:
+                results.append({"row": position, "id": item["id"], "status": "duplicate"})
+                continue
+            batch_ids.add(item["id"])
+            accepted.append((position, item))
+        
+        rejected = len(results)
+        if atomic and rejected:
+            for position, item in accepted:
+                results.append({"row": position, "id": item["id"], "status": "skipped"})
+            accepted = []
+        
+        for position, item in accepted:
+            claimed.add(item["id"])
+            results.append({"row": position, "id": item["id"], "status": "created"})
+        
+        results.sort(key=lambda o: o["row"])
+        return [item for _, item in accepted], {
+            "success": not (atomic and rejected),
+            "created": len(accepted),
+            "rejected": rejected,
+            "outcomes": results
+        }
+    
+    return CATALOG_WRITER.submit(EQUIPMENT_CSV_PATH, EQUIPMENT_CSV_FIELDS, prepare, commit_catalog_items).result()
+
+
+@app.post("/api/catalog/bulk-import")
+def bulk_import_catalog(products: List[dict], atomic: bool = False):
+    """
+    Add many scraped products to the equipment catalog at once
+    
+    Args:
+        products: JSON array of products (same fields as /api/catalog/add-scraped)
+        atomic: if true, nothing is added unless every row is valid and new
+    """
+    return import_catalog_rows(list(enumerate(products, start=1)), atomic)
+
+
+@app.post("/api/catalog/bulk-import/csv")
+async def bulk_import_catalog_csv(file: UploadFile = File(...), atomic: bool = False):
+    """
+    Add many products to the equipment catalog from an uploaded CSV
+    (same columns as equipment_catalog.csv)
+    """
+    content = (await file.read()).decode("utf-8-sig")
+    # Every error is kept: each one becomes the outcome of its row
+    report = IngestReport(file.filename or "upload.csv", EQUIPMENT_SCHEMA.name, max_errors=None)
+    try:
+        parsed = list(stream_rows(io.StringIO(content, newline=""), EQUIPMENT_SCHEMA, report))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Rows rejected by the typed parser are reported as invalid, the others are validated as usual
+    invalid_rows = {}
+    for error in report.errors:
+        if error["action"] == "rejected":
+            invalid_rows.setdefault(error["row"], []).append(f"{error['column']}: {error['message']}")
+    outcomes = [{"row": row, "status": "invalid", "errors": errors} for row, errors in invalid_rows.items()]
+    
+    valid_positions = [p for p in range(1, report.rows_read + 1) if p not in invalid_rows]
+    rows = [
+        (position, {k: v for k, v in row.items() if v is not None})
+        for position, row in zip(valid_positions, parsed)
+    ]
+    return import_catalog_rows(rows, atomic, outcomes)
+
+
 @app.post("/api/calculate", response_model=ROIResponse)
 def calculate_roi(request: ROIRequest):
     """
@@ -818,7 +1010,7 @@ def calculate_roi(request: ROIRequest):
     
     # Check for catalog item selection (for non-laptop equipment)
     if request.catalog_item_id:
-        catalog_item = next((i for i in EQUIPMENT_CATALOG if i["id"] == request.catalog_item_id), None)
+        catalog_item = EQUIPMENT_INDEX.get(request.catalog_item_id)
         if catalog_item:
             price_new = catalog_item["price_new"]
             price_refurb = catalog_item["price_refurb"]
@@ -831,7 +1023,7 @@ def calculate_roi(request: ROIRequest):
     # Override price if Dell model specified (for laptops)
     if request.equipment_type == EquipmentType.laptop:
         if request.dell_model_id:
-            dell_laptop = next((l for l in DELL_CATALOG if l["id"] == request.dell_model_id), None)
+            dell_laptop = CATALOG_STORE.get_product("dell", request.dell_model_id)
             if dell_laptop:
                 price_new = dell_laptop["price"]
                 # Calculate refurbished price as 50% of Dell price
@@ -979,14 +1171,35 @@ def calculate_roi(request: ROIRequest):
 
 @app.get("/api/health")
 def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "catalog_writer": CATALOG_WRITER.status(),
+        "marketplace_log": MARKETPLACE_LOG.status(),
+        "change_feed": CHANGE_FEED.status()
+    }
+
+
+@app.get("/api/ingestion/reports")
+def get_ingestion_reports():
+    """Get the per-row error reports of the last load of every data file"""
+    reports = CATALOG_STORE.ingest_reports()
+    if EQUIPMENT_INGEST_REPORT is not None:
+        reports.append(EQUIPMENT_INGEST_REPORT.to_dict())
+    return {"reports": reports}
+
+
+@app.get("/api/startup-report")
+def get_startup_report():
+    """Get the startup time broken down per phase (deferred phases ran after the app was ready)"""
+    return BOOT_TIMER.report()
 
 
 # ============================================
 # MARKETPLACE - DATABASE (In-Memory for MVP)
 # ============================================
 
-# Simulated database
+# Seed data, loaded on the very first start. After that the data is recovered
+# from the write-ahead log and snapshots (see MARKETPLACE - PERSISTENCE).
 USERS_DB = {
     "admin@lvmh.com": {
         "id": "user-001",
@@ -1011,7 +1224,7 @@ USERS_DB = {
     }
 }
 
-MARKETPLACE_DB = [
+SEED_MARKETPLACE_ITEMS = [
     {
         "id": "equip-001",
         "type": "laptop",
@@ -1089,7 +1302,7 @@ MARKETPLACE_DB = [
     }
 ]
 
-RESERVATIONS_DB = [
+SEED_RESERVATIONS = [
     {
         "id": "res-001",
         "equipment_id": "equip-004",
@@ -1104,6 +1317,178 @@ RESERVATIONS_DB = [
 ]
 
 
+# ============================================
+# MARKETPLACE - PERSISTENCE
+# ============================================
+
+# Every mutation of users, marketplace items and reservations is appended to a
+# write-ahead log; snapshots bound the replay on restart
+MARKETPLACE_LOG = DurableLog(
+    os.environ.get("MARKETPLACE_STATE_DIR", os.path.join(os.path.dirname(__file__), "data", "marketplace_state")),
+    snapshot_every=int(os.environ.get("MARKETPLACE_SNAPSHOT_EVERY", "10000")),
+    fsync=os.environ.get("MARKETPLACE_FSYNC", "1") != "0"
+)
+
+with BOOT_TIMER.phase("marketplace_recovery"):
+    _recovered_state = MARKETPLACE_LOG.recover()
+
+if _recovered_state is None:
+    _recovered_state = {
+        "users": USERS_DB,
+        "marketplace": {item["id"]: item for item in SEED_MARKETPLACE_ITEMS},
+        "reservations": {reservation["id"]: reservation for reservation in SEED_RESERVATIONS}
+    }
+    MARKETPLACE_LOG.put_all(_recovered_state)
+else:
+    USERS_DB = _recovered_state.get("users", {})
+    logger.info(
+        f"Marketplace recovered: {MARKETPLACE_LOG.recovery['snapshot_records']} records from the snapshot, "
+        f"{MARKETPLACE_LOG.recovery['replayed_records']} replayed from the log"
+    )
+
+MARKETPLACE_STORE = MarketplaceStore(_recovered_state.get("marketplace", {}).values())
+RESERVATION_STORE = ReservationStore(_recovered_state.get("reservations", {}).values())
+# Percolator of the collaborators' saved searches (see MARKETPLACE - SAVED SEARCHES)
+SAVED_SEARCHES = SavedSearchIndex(_recovered_state.get("saved_searches", {}).values())
+del _recovered_state
+
+# Per-item locks (striped by equipment id): a reservation's checks and writes
+# on an item happen atomically, while different items are reserved in parallel
+ITEM_LOCKS = StripedLock(int(os.getenv("ITEM_LOCK_STRIPES", "256")))
+
+
+def persist_changes(collection: str):
+    """
+    Store listener appending every change of a store to the marketplace log
+
+    It runs under the store lock, in the order changes are applied, but only
+    appends to the log buffer: the fsync is waited for by the store committer,
+    once the store lock is released (callers still hold the item locks), and
+    is shared with the other writers waiting at the same time.
+    """
+    def listener(event: str, record: dict, previous: Optional[dict]):
+        if event == "remove":
+            MARKETPLACE_LOG.delete(collection, record["id"], sync=False)
+        else:
+            MARKETPLACE_LOG.put(collection, record["id"], record, sync=False)
+    return listener
+
+
+MARKETPLACE_STORE.listeners.append(persist_changes("marketplace"))
+RESERVATION_STORE.listeners.append(persist_changes("reservations"))
+MARKETPLACE_STORE.committers.append(MARKETPLACE_LOG.sync)
+RESERVATION_STORE.committers.append(MARKETPLACE_LOG.sync)
+
+# Stats counters, kept up to date by the store listeners
+MARKETPLACE_STATS = MarketplaceStats()
+MARKETPLACE_STATS.rebuild(MARKETPLACE_STORE, RESERVATION_STORE)
+MARKETPLACE_STORE.listeners.append(MARKETPLACE_STATS.on_item_change)
+RESERVATION_STORE.listeners.append(MARKETPLACE_STATS.on_reservation_change)
+
+# Reservations from before orders recorded their item's type and decision price
+# get them from the item, when it still exists
+with MARKETPLACE_LOG.batch():
+    RESERVATION_STORE.update_many([
+        (_reservation["id"], _changes)
+        for _reservation in RESERVATION_STORE
+        for _changes in [freeze_item_fields(_reservation, MARKETPLACE_STORE.get(_reservation["equipment_id"]))]
+        if _changes
+    ])
+
+# Statistics of the admin orders view, from the item fields frozen on the reservations
+ORDER_STATS = OrderStats(RESERVATION_STORE)
+ORDER_STATS.rebuild()
+RESERVATION_STORE.listeners.append(ORDER_STATS.on_reservation_change)
+
+# Pending reservations expire after RESERVATION_TTL_HOURS (0 disables expiry)
+RESERVATION_TTL_HOURS = float(os.environ.get("RESERVATION_TTL_HOURS", "72"))
+RESERVATION_EXPIRY = ExpiryHeap(timedelta(hours=RESERVATION_TTL_HOURS))
+if RESERVATION_TTL_HOURS > 0:
+    # Pending reservations from before expiry existed get the whole TTL from now,
+    # instead of expiring on the first tick because they were created long ago
+    _expires_at = (datetime.now() + RESERVATION_EXPIRY.ttl).isoformat()
+    with MARKETPLACE_LOG.batch():
+        RESERVATION_STORE.update_many([
+            (_reservation["id"], {"expires_at": _expires_at})
+            for _reservation in RESERVATION_STORE.find(status="pending")
+            if not _reservation.get("expires_at")
+        ])
+    for _reservation in RESERVATION_STORE.find(status="pending"):
+        RESERVATION_EXPIRY.on_reservation_change("add", _reservation, None)
+    RESERVATION_STORE.listeners.append(RESERVATION_EXPIRY.on_reservation_change)
+
+# Live changes pushed to the frontends (see MARKETPLACE - CHANGE FEED ENDPOINTS)
+CHANGE_FEED = ChangeFeed(buffer_size=int(os.environ.get("CHANGE_FEED_BUFFER", "10000")))
+CHANGE_EVENT_NAMES = {"add": "created", "update": "updated", "remove": "deleted"}
+_PUBLISHED_STATS = MARKETPLACE_STATS.snapshot()
+_PUBLISHED_STATS_LOCK = threading.Lock()
+# Set by bulk jobs on their thread: they publish one summary event instead of one per record
+_CHANGE_FEED_MUTED = threading.local()
+
+
+def publish_stats_delta():
+    """Publish the stats counters that changed since the last stats event"""
+    global _PUBLISHED_STATS
+    with _PUBLISHED_STATS_LOCK:
+        stats = MARKETPLACE_STATS.snapshot()
+        delta = {name: value for name, value in stats.items() if _PUBLISHED_STATS.get(name) != value}
+        _PUBLISHED_STATS = stats
+        if delta:
+            CHANGE_FEED.publish("stats", delta)
+
+
+def publish_item_change(event: str, item: dict, previous: Optional[dict]):
+    if getattr(_CHANGE_FEED_MUTED, "value", False):
+        return
+    data = {"id": item["id"], "status": item["status"]}
+    if event != "remove":
+        data["item"] = item
+    if previous is not None:
+        data["previous_status"] = previous["status"]
+    CHANGE_FEED.publish(f"item.{CHANGE_EVENT_NAMES[event]}", data)
+    publish_stats_delta()
+
+
+def publish_reservation_change(event: str, reservation: dict, previous: Optional[dict]):
+    if getattr(_CHANGE_FEED_MUTED, "value", False):
+        return
+    data = {
+        "id": reservation["id"],
+        "equipment_id": reservation["equipment_id"],
+        "user_email": reservation["user_email"],
+        "status": reservation["status"]
+    }
+    if event != "remove":
+        data["reservation"] = reservation
+    if previous is not None:
+        data["previous_status"] = previous["status"]
+    CHANGE_FEED.publish(f"reservation.{CHANGE_EVENT_NAMES[event]}", data)
+    publish_stats_delta()
+
+
+# Registered after the stats listeners, so stats deltas see the change
+MARKETPLACE_STORE.listeners.append(publish_item_change)
+RESERVATION_STORE.listeners.append(publish_reservation_change)
+
+# Saved-search matches waiting to be read, per user
+NOTIFICATIONS = NotificationQueue()
+
+
+def percolate_listing(event: str, item: dict, previous: Optional[dict]):
+    """Queue a notification for every saved search a new, repriced or released listing now matches"""
+    if event == "remove" or item["status"] != "available":
+        return
+    price = effective_price(item)
+    if previous is not None and previous["status"] == "available" and effective_price(previous) == price \
+            and previous["type"] == item["type"] and previous["condition"] == item["condition"]:
+        return
+    for search in SAVED_SEARCHES.match(item["type"], item["condition"], price):
+        NOTIFICATIONS.push(search, item, price)
+
+
+MARKETPLACE_STORE.listeners.append(percolate_listing)
+
+
 # ============================================
 # MARKETPLACE - MODELS
 # ============================================
@@ -1129,6 +1514,11 @@ class ReservationStatus(str, Enum):
     pending = "pending"
     approved = "approved"
     rejected = "rejected"
+    # Set by the expiry job only, never by a decision
+    expired = "expired"
+
+
+DECISION_STATUSES = (ReservationStatus.approved, ReservationStatus.rejected)
 
 
 class LoginRequest(BaseModel):
@@ -1198,38 +1588,108 @@ class ReservationResponse(BaseModel):
     message: Optional[str]
     status: str
     created_at: str
+    decided_at: Optional[str] = None
+    expires_at: Optional[str] = None
+    impact: Optional[dict] = None
 
 
 class UpdateReservationRequest(BaseModel):
     status: ReservationStatus
 
 
+class ReservationDecision(BaseModel):
+    reservation_id: str
+    status: ReservationStatus
+
+
+class BulkReservationDecisionRequest(BaseModel):
+    # Either explicit decisions...
+    decisions: Optional[List[ReservationDecision]] = None
+    # ...or one status for every pending reservation matching the filters
+    status: Optional[ReservationStatus] = None
+    user_department: Optional[str] = None
+    user_email: Optional[str] = None
+
+
 # ============================================
 # MARKETPLACE - HELPER FUNCTIONS
 # ============================================
 
-def calculate_suggested_price(equipment_type: str, age_months: int, condition: str) -> float:
-    """
-    Suggested_Price = Price_New × (1 - (Age_months / Lifespan_months)) × Condition_Factor
+# (catalog version, index) of model-level new prices, rebuilt after a catalog change
+_MODEL_PRICE_INDEX = (None, {})
+
+
+def get_model_price_index() -> dict:
+    """Model-level new prices by (brand, model), from the equipment and vendor catalogs"""
+    global _MODEL_PRICE_INDEX
+    version = CATALOG_VERSION.version
+    if _MODEL_PRICE_INDEX[0] != version:
+        _MODEL_PRICE_INDEX = (version, build_model_price_index(EQUIPMENT_CATALOG, CATALOG_STORE.get_all()))
+    return _MODEL_PRICE_INDEX[1]
+
+
+_CATALOG_MODEL_INDEX = (None, {})
+
+
+def get_catalog_model_index() -> dict:
+    """Equipment catalog items by (brand, model)"""
+    global _CATALOG_MODEL_INDEX
+    version = CATALOG_VERSION.version
+    if _CATALOG_MODEL_INDEX[0] != version:
+        _CATALOG_MODEL_INDEX = (version, {
+            model_key(item.get("brand", ""), item["model"]): item for item in EQUIPMENT_CATALOG if item.get("model")
+        })
+    return _CATALOG_MODEL_INDEX[1]
+
+
+def calculate_reuse_impact(equipment: dict) -> Optional[dict]:
     """
-    equipment = EQUIPMENT_DATA.get(equipment_type)
-    if not equipment:
-        return 0
+    Impact of reusing a marketplace item instead of buying a new one
     
-    price_new = equipment["price_new"]
-    lifespan = equipment["lifespan_new"]
+    CO2_avoided = CO2_New - CO2_Refurb, from the catalog entry of the item's
+    brand and model when there is one, else from its type defaults.
+    Money_saved = Price_New - price paid for the item (never negative).
     
-    condition_factors = {
-        "excellent": 0.9,
-        "good": 0.7,
-        "fair": 0.5
+    Returns:
+        Dictionary with co2_kg and money_eur, or None for an unknown type
+    """
+    data = get_catalog_model_index().get(model_key(equipment.get("brand", ""), equipment.get("model", "")))
+    data = data or EQUIPMENT_DATA.get(equipment["type"])
+    if data is None:
+        return None
+    co2_new = data["co2_new"]
+    if data.get("co2_refurb") is not None:
+        co2_avoided = calculate_carbon_avoided(co2_new, data["co2_refurb"])
+    else:
+        # Already-refurbished figures: a new equivalent emits about 10 times more (as in /api/calculate)
+        co2_avoided = calculate_carbon_avoided(co2_new * 10, co2_new)
+    model_price = get_model_price_index().get(model_key(equipment.get("brand", ""), equipment.get("model", "")))
+    price_new = model_price[0] if model_price is not None else data["price_new"]
+    return {
+        "co2_kg": co2_avoided,
+        "money_eur": round(max(price_new - effective_price(equipment), 0), 2)
     }
-    condition_factor = condition_factors.get(condition, 0.7)
+
+
+def calculate_suggested_price(equipment_type: str, age_months: int, condition: str,
+                              brand: Optional[str] = None, model: Optional[str] = None) -> float:
+    """
+    Suggested_Price = Price_New × (1 - (Age_months / Lifespan_months)) × Condition_Factor
     
-    depreciation = min(age_months / lifespan, 0.8)  # Max 80% depreciation
-    suggested = price_new * (1 - depreciation) * condition_factor
+    Price_New is the model-level price when the brand and model are in a catalog,
+    else the type default.
+    """
+    equipment = EQUIPMENT_DATA.get(equipment_type)
+    model_price = get_model_price_index().get(model_key(brand, model)) if brand and model else None
+    if model_price is not None:
+        price_new, lifespan = model_price
+        lifespan = lifespan or (equipment["lifespan_new"] if equipment else None)
+        if lifespan:
+            return suggested_price(price_new, lifespan, age_months, condition)
     
-    return round(suggested, 2)
+    if not equipment:
+        return 0
+    return suggested_price(equipment["price_new"], equipment["lifespan_new"], age_months, condition)
 
 
 def get_equipment_display_name(equipment_type: str) -> str:
@@ -1256,6 +1716,7 @@ def login(request: LoginRequest):
                 "department": "Unknown"
             }
             USERS_DB[request.email.lower()] = new_user
+            MARKETPLACE_LOG.put("users", new_user["email"], new_user)
             return UserResponse(**new_user)
         raise HTTPException(status_code=401, detail="Email must be @lvmh.com")
     return UserResponse(**user)
@@ -1280,30 +1741,46 @@ def get_marketplace_items(
     max_price: Optional[float] = None
 ):
     """Get all marketplace items with optional filters"""
-    items = MARKETPLACE_DB.copy()
-    
-    if type:
-        items = [i for i in items if i["type"] == type]
-    if condition:
-        items = [i for i in items if i["condition"] == condition]
-    if status:
-        items = [i for i in items if i["status"] == status]
-    else:
+    items = MARKETPLACE_STORE.query(
+        type=type or None,
+        condition=condition or None,
         # By default, show only available items to collaborateurs
-        items = [i for i in items if i["status"] in ["available", "reserved"]]
-    
-    if min_price is not None:
-        items = [i for i in items if (i["price_manual"] or i["price_suggested"]) >= min_price]
-    if max_price is not None:
-        items = [i for i in items if (i["price_manual"] or i["price_suggested"]) <= max_price]
+        statuses=[status] if status else ["available", "reserved"],
+        min_price=min_price,
+        max_price=max_price
+    )
     
     return [MarketplaceItem(**item) for item in items]
 
 
+# ============================================
+# MARKETPLACE - STATS ENDPOINT
+# ============================================
+
+# Declared before /api/marketplace/{item_id}, which would otherwise capture "stats" as an item id
+@app.get("/api/marketplace/stats")
+def get_marketplace_stats():
+    """Get marketplace statistics (counters maintained on every change)"""
+    return MARKETPLACE_STATS.snapshot()
+
+
+@app.post("/api/marketplace/stats/verify")
+def verify_marketplace_stats(repair: bool = True, admin_email: str = "admin@lvmh.com"):
+    """Check the stats counters against a full recomputation, and rebuild them if they drifted (IT Admin only)"""
+    user = USERS_DB.get(admin_email)
+    if not user or user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    result = MARKETPLACE_STATS.verify(MARKETPLACE_STORE, RESERVATION_STORE, repair=repair)
+    if not result["consistent"]:
+        logger.warning(f"Marketplace stats drifted: {result['differences']}")
+    return result
+
+
 @app.get("/api/marketplace/{item_id}", response_model=MarketplaceItem)
 def get_marketplace_item(item_id: str):
     """Get a single marketplace item"""
-    item = next((i for i in MARKETPLACE_DB if i["id"] == item_id), None)
+    item = MARKETPLACE_STORE.get(item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Equipment not found")
     return MarketplaceItem(**item)
@@ -1318,10 +1795,12 @@ def create_marketplace_item(request: CreateEquipmentRequest, admin_email: str =
         raise HTTPException(status_code=403, detail="Admin access required")
     
     # Calculate suggested price
-    suggested_price = calculate_suggested_price(
+    suggested = calculate_suggested_price(
         request.type,
         request.age_months,
-        request.condition.value
+        request.condition.value,
+        request.brand,
+        request.model
     )
     
     new_item = {
@@ -1331,7 +1810,7 @@ def create_marketplace_item(request: CreateEquipmentRequest, admin_email: str =
         "model": request.model,
         "condition": request.condition.value,
         "age_months": request.age_months,
-        "price_suggested": suggested_price,
+        "price_suggested": suggested,
         "price_manual": request.price_manual,
         "photo_url": request.photo_url or "https://images.unsplash.com/photo-1496181133206-80ce9b88a853?w=400",
         "status": "available",
@@ -1340,7 +1819,7 @@ def create_marketplace_item(request: CreateEquipmentRequest, admin_email: str =
         "created_by": user["id"]
     }
     
-    MARKETPLACE_DB.append(new_item)
+    MARKETPLACE_STORE.add(new_item)
     return MarketplaceItem(**new_item)
 
 
@@ -1352,11 +1831,18 @@ def update_marketplace_item(item_id: str, request: UpdateEquipmentRequest, admin
     if not user or user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    item_index = next((i for i, item in enumerate(MARKETPLACE_DB) if item["id"] == item_id), None)
-    if item_index is None:
+    with ITEM_LOCKS.for_key(item_id):
+        return MarketplaceItem(**apply_item_update(item_id, request))
+
+
+def apply_item_update(item_id: str, request: UpdateEquipmentRequest) -> dict:
+    """Apply an item update (called under the item's lock, so reservations see it whole)"""
+    current = MARKETPLACE_STORE.get(item_id)
+    if current is None:
         raise HTTPException(status_code=404, detail="Equipment not found")
     
-    item = MARKETPLACE_DB[item_index]
+    # Changes are applied to a copy, then to the store which re-indexes the item
+    item = dict(current)
     
     # Update fields
     if request.type is not None:
@@ -1371,15 +1857,21 @@ def update_marketplace_item(item_id: str, request: UpdateEquipmentRequest, admin
         item["price_suggested"] = calculate_suggested_price(
             item["type"],
             item["age_months"],
-            request.condition.value
+            request.condition.value,
+            item["brand"],
+            item["model"]
         )
     if request.age_months is not None:
         item["age_months"] = request.age_months
+        # The repricing job ages the listing from now on
+        item["age_updated_at"] = datetime.now().isoformat()
         # Recalculate suggested price
         item["price_suggested"] = calculate_suggested_price(
             item["type"],
             request.age_months,
-            item["condition"]
+            item["condition"],
+            item["brand"],
+            item["model"]
         )
     if request.price_manual is not None:
         item["price_manual"] = request.price_manual
@@ -1390,8 +1882,7 @@ def update_marketplace_item(item_id: str, request: UpdateEquipmentRequest, admin
     if request.status is not None:
         item["status"] = request.status.value
     
-    MARKETPLACE_DB[item_index] = item
-    return MarketplaceItem(**item)
+    return MARKETPLACE_STORE.update(item_id, item)
 
 
 @app.delete("/api/marketplace/{item_id}")
@@ -1402,14 +1893,120 @@ def delete_marketplace_item(item_id: str, admin_email: str = "admin@lvmh.com"):
     if not user or user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    item_index = next((i for i, item in enumerate(MARKETPLACE_DB) if item["id"] == item_id), None)
-    if item_index is None:
-        raise HTTPException(status_code=404, detail="Equipment not found")
+    with ITEM_LOCKS.for_key(item_id):
+        if MARKETPLACE_STORE.remove(item_id) is None:
+            raise HTTPException(status_code=404, detail="Equipment not found")
     
-    MARKETPLACE_DB.pop(item_index)
     return {"message": "Equipment deleted successfully"}
 
 
+# ============================================
+# MARKETPLACE - REPRICING
+# ============================================
+
+# Hours between two automatic repricing runs (0 disables them)
+MARKETPLACE_REPRICE_HOURS = float(os.environ.get("MARKETPLACE_REPRICE_HOURS", "24"))
+REPRICE_LOCK = threading.Lock()
+LAST_REPRICE_REPORT = None
+
+
+# Fields a suggested price is computed from, plus the status that makes a listing repriceable
+REPRICE_INPUT_FIELDS = ("status", "type", "brand", "model", "condition", "age_months",
+                        "age_updated_at", "created_at", "price_suggested")
+
+
+def _changed_since_priced(snapshot: dict) -> bool:
+    """Whether a listing is gone, no longer available or edited since `snapshot` (called under its lock)"""
+    item = MARKETPLACE_STORE.get(snapshot["id"])
+    if item is None or item["status"] != "available":
+        return True
+    return any(item.get(field) != snapshot.get(field) for field in REPRICE_INPUT_FIELDS)
+
+
+def reprice_marketplace(dry_run: bool = False) -> dict:
+    """
+    Age every available listing and recompute its suggested price in one pass
+    
+    Args:
+        dry_run: compute and report the changes without applying them
+    
+    Returns:
+        Dictionary with the changed listings and counters
+    """
+    global LAST_REPRICE_REPORT
+    with REPRICE_LOCK:
+        started = time.perf_counter()
+        # Priced from copies: the stored records may change while the run computes
+        listings = [dict(item) for item in MARKETPLACE_STORE.query(statuses=["available"])]
+        changes = reprice_listings(listings, EQUIPMENT_DATA, get_model_price_index())
+        skipped = 0
+        
+        if not dry_run and changes:
+            snapshots = {item["id"]: item for item in listings}
+            # Held until the batch is written, like reservation decisions
+            with ITEM_LOCKS.hold(*(change["id"] for change in changes)):
+                # A listing reserved, sold, deleted or edited since it was priced keeps its state
+                current = [change for change in changes if not _changed_since_priced(snapshots[change["id"]])]
+                skipped = len(changes) - len(current)
+                changes = current
+                if changes:
+                    # One fsync of the marketplace log and one change feed event for the whole run
+                    _CHANGE_FEED_MUTED.value = True
+                    try:
+                        with MARKETPLACE_LOG.batch():
+                            MARKETPLACE_STORE.update_many([(change["id"], change["changes"]) for change in changes])
+                    finally:
+                        _CHANGE_FEED_MUTED.value = False
+        
+        if not dry_run and changes:
+            CHANGE_FEED.publish("items.repriced", {
+                "changed": len(changes),
+                # Past this many, subscribers should refetch the listings
+                "ids": [c["id"] for c in changes] if len(changes) <= 1000 else None
+            })
+            publish_stats_delta()
+        
+        report = {
+            "dry_run": dry_run,
+            "ran_at": datetime.now().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "listings": len(listings),
+            "changed": len(changes),
+            "skipped": skipped,
+            "model_priced": sum(1 for c in changes if c["price_source"] == "model"),
+            "changes": [{k: v for k, v in c.items() if k != "changes"} for c in changes]
+        }
+        if not dry_run:
+            LAST_REPRICE_REPORT = report
+            logger.info(f"Repriced {len(changes)} of {len(listings)} listings in {report['duration_ms']} ms")
+        return report
+
+
+@app.post("/api/marketplace/reprice")
+def reprice_marketplace_items(dry_run: bool = False, admin_email: str = "admin@lvmh.com"):
+    """Reprice all available listings now (IT Admin only)"""
+    user = USERS_DB.get(admin_email)
+    if not user or user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return reprice_marketplace(dry_run=dry_run)
+
+
+@app.get("/api/marketplace/reprice/last")
+def get_last_reprice_report():
+    """Get the report of the last applied repricing run"""
+    return {"interval_hours": MARKETPLACE_REPRICE_HOURS, "report": LAST_REPRICE_REPORT}
+
+
+async def run_repricing_schedule():
+    """Background task repricing the marketplace every MARKETPLACE_REPRICE_HOURS"""
+    while True:
+        await asyncio.sleep(MARKETPLACE_REPRICE_HOURS * 3600)
+        try:
+            await asyncio.to_thread(reprice_marketplace)
+        except Exception as e:
+            logger.error(f"Scheduled repricing failed: {e}")
+
+
 # ============================================
 # MARKETPLACE - RESERVATION ENDPOINTS
 # ============================================
@@ -1417,12 +2014,7 @@ def delete_marketplace_item(item_id: str, admin_email: str = "admin@lvmh.com"):
 @app.get("/api/reservations", response_model=List[ReservationResponse])
 def get_reservations(user_email: Optional[str] = None, status: Optional[str] = None):
     """Get reservations (filtered by user or status)"""
-    reservations = RESERVATIONS_DB.copy()
-    
-    if user_email:
-        reservations = [r for r in reservations if r["user_email"] == user_email]
-    if status:
-        reservations = [r for r in reservations if r["status"] == status]
+    reservations = RESERVATION_STORE.find(user_email=user_email or None, status=status or None)
     
     return [ReservationResponse(**r) for r in reservations]
 
@@ -1435,38 +2027,45 @@ def create_reservation(request: ReservationRequest):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Check equipment exists and is available
-    item = next((i for i in MARKETPLACE_DB if i["id"] == request.equipment_id), None)
-    if not item:
-        raise HTTPException(status_code=404, detail="Equipment not found")
-    if item["status"] != "available":
-        raise HTTPException(status_code=400, detail="Equipment is not available")
-    
-    # Check for existing pending reservation
-    existing = next((r for r in RESERVATIONS_DB 
-                     if r["equipment_id"] == request.equipment_id 
-                     and r["user_email"] == request.user_email
-                     and r["status"] == "pending"), None)
-    if existing:
-        raise HTTPException(status_code=400, detail="You already have a pending reservation for this item")
-    
-    new_reservation = {
-        "id": f"res-{str(uuid.uuid4())[:8]}",
-        "equipment_id": request.equipment_id,
-        "user_id": user["id"],
-        "user_name": user["name"],
-        "user_email": user["email"],
-        "user_department": user["department"],
-        "message": request.message,
-        "status": "pending",
-        "created_at": datetime.now().isoformat()
-    }
-    
-    RESERVATIONS_DB.append(new_reservation)
-    
-    # Update equipment status to reserved
-    item_index = next(i for i, x in enumerate(MARKETPLACE_DB) if x["id"] == request.equipment_id)
-    MARKETPLACE_DB[item_index]["status"] = "reserved"
+    # Checks and writes are atomic per item: two users cannot both reserve it
+    with ITEM_LOCKS.for_key(request.equipment_id):
+        # Check equipment exists and is available
+        item = MARKETPLACE_STORE.get(request.equipment_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Equipment not found")
+        if item["status"] != "available":
+            raise HTTPException(status_code=400, detail="Equipment is not available")
+        
+        # Check for existing pending reservation
+        existing = RESERVATION_STORE.find(
+            equipment_id=request.equipment_id,
+            user_email=request.user_email,
+            status="pending"
+        )
+        if existing:
+            raise HTTPException(status_code=400, detail="You already have a pending reservation for this item")
+        
+        now = datetime.now()
+        new_reservation = {
+            "id": f"res-{str(uuid.uuid4())[:8]}",
+            "equipment_id": request.equipment_id,
+            "user_id": user["id"],
+            "user_name": user["name"],
+            "user_email": user["email"],
+            "user_department": user["department"],
+            "equipment_type": item["type"],
+            "message": request.message,
+            "status": "pending",
+            "created_at": now.isoformat(),
+            "expires_at": (now + RESERVATION_EXPIRY.ttl).isoformat() if RESERVATION_TTL_HOURS > 0 else None
+        }
+        
+        # One log record: a crash cannot keep the reservation without the reserved item
+        with MARKETPLACE_LOG.batch():
+            RESERVATION_STORE.add(new_reservation)
+            
+            # Update equipment status to reserved
+            MARKETPLACE_STORE.update(request.equipment_id, {"status": "reserved"})
     
     return ReservationResponse(**new_reservation)
 
@@ -1478,162 +2077,692 @@ def update_reservation(reservation_id: str, request: UpdateReservationRequest, a
     user = USERS_DB.get(admin_email)
     if not user or user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
+    if request.status not in DECISION_STATUSES:
+        raise HTTPException(status_code=400, detail="Decisions must approve or reject")
     
-    res_index = next((i for i, r in enumerate(RESERVATIONS_DB) if r["id"] == reservation_id), None)
-    if res_index is None:
+    reservation = RESERVATION_STORE.get(reservation_id)
+    if reservation is None:
         raise HTTPException(status_code=404, detail="Reservation not found")
     
-    reservation = RESERVATIONS_DB[res_index]
-    reservation["status"] = request.status.value
-    
-    # Update equipment status based on reservation
-    item_index = next((i for i, x in enumerate(MARKETPLACE_DB) if x["id"] == reservation["equipment_id"]), None)
-    if item_index is not None:
+    with ITEM_LOCKS.for_key(reservation["equipment_id"]):
+        # It may have been cancelled or decided while waiting for the lock
+        reservation = RESERVATION_STORE.get(reservation_id)
+        if reservation is None:
+            raise HTTPException(status_code=404, detail="Reservation not found")
+        if reservation["status"] != "pending":
+            raise HTTPException(status_code=400, detail=f"Reservation is already {reservation['status']}")
+        
+        item = MARKETPLACE_STORE.get(reservation["equipment_id"])
+        changes = {
+            "status": request.status.value,
+            "decided_at": datetime.now().isoformat(),
+            "price": effective_price(item) if item else None
+        }
         if request.status == ReservationStatus.approved:
-            MARKETPLACE_DB[item_index]["status"] = "sold"
-        elif request.status == ReservationStatus.rejected:
-            MARKETPLACE_DB[item_index]["status"] = "available"
+            # Credited to the requester's impact, frozen at approval time
+            changes["impact"] = calculate_reuse_impact(item) if item else None
+        with MARKETPLACE_LOG.batch():
+            reservation = RESERVATION_STORE.update(reservation_id, changes)
+            
+            # Update equipment status based on reservation
+            if request.status == ReservationStatus.approved:
+                MARKETPLACE_STORE.update(reservation["equipment_id"], {"status": "sold"})
+            elif request.status == ReservationStatus.rejected:
+                MARKETPLACE_STORE.update(reservation["equipment_id"], {"status": "available"})
     
-    RESERVATIONS_DB[res_index] = reservation
     return ReservationResponse(**reservation)
 
 
+@app.post("/api/reservations/decisions")
+def decide_reservations(request: BulkReservationDecisionRequest, admin_email: str = "admin@lvmh.com"):
+    """Approve or reject many reservations at once (IT Admin only)"""
+    # Check admin
+    user = USERS_DB.get(admin_email)
+    if not user or user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if request.decisions is not None:
+        decisions = [(d.reservation_id, d.status.value) for d in request.decisions]
+    elif request.status is not None:
+        matching = RESERVATION_STORE.find(
+            status="pending",
+            user_department=request.user_department,
+            user_email=request.user_email.lower() if request.user_email else None
+        )
+        decisions = [(reservation["id"], request.status.value) for reservation in matching]
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide decisions, or a status for the pending reservations matching the filters"
+        )
+    if any(status not in DECISION_STATUSES for _, status in decisions):
+        raise HTTPException(status_code=400, detail="Decisions must approve or reject")
+    
+    results = apply_reservation_decisions(decisions)
+    counts = {}
+    for result in results:
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    return {
+        "requested": len(decisions),
+        "approved": counts.get("approved", 0),
+        "rejected": counts.get("rejected", 0),
+        "skipped": len(decisions) - counts.get("approved", 0) - counts.get("rejected", 0),
+        "results": results
+    }
+
+
+def apply_reservation_decisions(decisions: List[Tuple[str, str]]) -> List[dict]:
+    """
+    Apply (reservation id, status) decisions and the item transitions they cause
+    
+    The locks of every involved item are held for the whole batch, so each
+    decision is checked and applied like PUT /api/reservations/{id}, but the
+    stores are updated in one pass, with one marketplace log fsync and one
+    change feed event.
+    
+    Returns:
+        One outcome per decision, in order: "approved", "rejected", "not_found",
+        "duplicate" (already decided earlier in the batch) or "not_pending" (with
+        the reservation's current status)
+    """
+    equipment_ids = {
+        RESERVATION_STORE.get(reservation_id)["equipment_id"]
+        for reservation_id, _ in decisions
+        if reservation_id in RESERVATION_STORE
+    }
+    results = []
+    reservation_updates = []
+    item_statuses = {}
+    decided_at = datetime.now().isoformat()
+    with ITEM_LOCKS.hold(*equipment_ids):
+        decided = set()
+        for reservation_id, status in decisions:
+            reservation = RESERVATION_STORE.get(reservation_id)
+            if reservation is None or reservation["equipment_id"] not in equipment_ids:
+                # Unknown, or created after the locks were chosen
+                results.append({"reservation_id": reservation_id, "outcome": "not_found"})
+                continue
+            if reservation_id in decided:
+                results.append({"reservation_id": reservation_id, "outcome": "duplicate"})
+                continue
+            if reservation["status"] != "pending":
+                results.append({"reservation_id": reservation_id, "outcome": "not_pending", "status": reservation["status"]})
+                continue
+            decided.add(reservation_id)
+            equipment_id = reservation["equipment_id"]
+            item = MARKETPLACE_STORE.get(equipment_id)
+            changes = {"status": status, "decided_at": decided_at, "price": effective_price(item) if item else None}
+            reservation_updates.append((reservation_id, changes))
+            # An approval sells the item even if another reservation of it is rejected in the batch
+            if status == ReservationStatus.approved.value:
+                changes["impact"] = calculate_reuse_impact(item) if item else None
+                item_statuses[equipment_id] = "sold"
+            else:
+                item_statuses.setdefault(equipment_id, "available")
+            results.append({"reservation_id": reservation_id, "outcome": status})
+        
+        if reservation_updates:
+            _CHANGE_FEED_MUTED.value = True
+            try:
+                with MARKETPLACE_LOG.batch():
+                    RESERVATION_STORE.update_many(reservation_updates)
+                    MARKETPLACE_STORE.update_many([
+                        (equipment_id, {"status": status}) for equipment_id, status in item_statuses.items()
+                    ])
+            finally:
+                _CHANGE_FEED_MUTED.value = False
+    
+    if reservation_updates:
+        CHANGE_FEED.publish("reservations.decided", {
+            "decided": len(reservation_updates),
+            # Past this many, subscribers should refetch the reservations
+            "ids": [reservation_id for reservation_id, _ in reservation_updates] if len(reservation_updates) <= 1000 else None,
+            "equipment_ids": list(item_statuses) if len(item_statuses) <= 1000 else None
+        })
+        publish_stats_delta()
+    return results
+
+
 @app.delete("/api/reservations/{reservation_id}")
 def cancel_reservation(reservation_id: str, user_email: str):
     """Cancel a reservation (by the user who made it)"""
-    res_index = next((i for i, r in enumerate(RESERVATIONS_DB) if r["id"] == reservation_id), None)
-    if res_index is None:
+    reservation = RESERVATION_STORE.get(reservation_id)
+    if reservation is None:
         raise HTTPException(status_code=404, detail="Reservation not found")
     
-    reservation = RESERVATIONS_DB[res_index]
-    
     # Check if user owns this reservation
     if reservation["user_email"] != user_email:
         raise HTTPException(status_code=403, detail="You can only cancel your own reservations")
     
-    # Check if still pending
-    if reservation["status"] != "pending":
-        raise HTTPException(status_code=400, detail="Can only cancel pending reservations")
+    with ITEM_LOCKS.for_key(reservation["equipment_id"]):
+        # Check if still pending (an admin may have decided while waiting for the lock)
+        reservation = RESERVATION_STORE.get(reservation_id)
+        if reservation is None or reservation["status"] != "pending":
+            raise HTTPException(status_code=400, detail="Can only cancel pending reservations")
+        
+        with MARKETPLACE_LOG.batch():
+            # Update equipment status back to available
+            MARKETPLACE_STORE.update(reservation["equipment_id"], {"status": "available"})
+            
+            RESERVATION_STORE.remove(reservation_id)
+    return {"message": "Reservation cancelled successfully"}
+
+
+ORDERS_PAGE_SIZE = 100
+MAX_ORDERS_PAGE_SIZE = 1000
+
+
+@app.get("/api/orders/all")
+def get_all_orders(
+    limit: int = ORDERS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    department: Optional[str] = None
+):
+    """
+    Get orders/reservations with full details for admin view, newest first
+    
+    Pages are keyset-paginated: pass the previous page's next_cursor to get the
+    following one. The statistics cover every order, whatever the page.
+    """
+    limit = max(1, min(limit, MAX_ORDERS_PAGE_SIZE))
+    after = decode_orders_cursor(cursor) if cursor else None
     
-    # Update equipment status back to available
-    item_index = next((i for i, x in enumerate(MARKETPLACE_DB) if x["id"] == reservation["equipment_id"]), None)
-    if item_index is not None:
-        MARKETPLACE_DB[item_index]["status"] = "available"
+    def accept(reservation: dict) -> bool:
+        # Reservations whose equipment was deleted are not listed
+        return reservation["equipment_id"] in MARKETPLACE_STORE
     
-    RESERVATIONS_DB.pop(res_index)
-    return {"message": "Reservation cancelled successfully"}
+    orders = []
+    for reservation in RESERVATION_STORE.newest(limit, after, accept, status=status, department=department):
+        equipment = MARKETPLACE_STORE.get(reservation["equipment_id"])
+        if equipment is None:
+            # Deleted since the page was read
+            continue
+        orders.append({
+            "id": reservation["id"],
+            "equipment": {
+                "id": equipment["id"],
+                "type": equipment["type"],
+                "brand": equipment["brand"],
+                "model": equipment["model"],
+                "condition": equipment["condition"],
+                "price": effective_price(equipment)
+            },
+            "user": {
+                "id": reservation["user_id"],
+                "name": reservation["user_name"],
+                "email": reservation["user_email"],
+                "department": reservation["user_department"]
+            },
+            "message": reservation.get("message"),
+            "status": reservation["status"],
+            "created_at": reservation["created_at"]
+        })
+    
+    next_cursor = None
+    if len(orders) == limit:
+        last = orders[-1]
+        next_cursor = encode_orders_cursor(last["created_at"], last["id"])
+    
+    return {
+        "orders": orders,
+        "next_cursor": next_cursor,
+        "statistics": ORDER_STATS.snapshot()
+    }
+
+
+def encode_orders_cursor(created_at: str, reservation_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, reservation_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_orders_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, reservation_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), str(reservation_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@app.post("/api/orders/stats/verify")
+def verify_order_stats(repair: bool = True, admin_email: str = "admin@lvmh.com"):
+    """Check the orders statistics against a full recomputation, and rebuild them if they drifted (IT Admin only)"""
+    user = USERS_DB.get(admin_email)
+    if not user or user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    result = ORDER_STATS.verify(repair=repair)
+    if not result["consistent"]:
+        logger.warning(f"Order stats drifted: {result['differences']}")
+    return result
+
+
+@app.get("/api/analytics/orders")
+def get_order_analytics(
+    granularity: str = "day",
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    event: Optional[str] = None,
+    department: Optional[str] = None,
+    type: Optional[str] = None,
+    group_by: Optional[str] = None
+):
+    """
+    Order trends: reservations created and decided per time bucket
+    
+    Read from rollups maintained on every reservation change. Rows hold the
+    bucket start, the group_by dimensions (comma-separated among department,
+    type and event), the event count and, for approvals, the equipment value.
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if event is not None and event not in ORDER_EVENTS:
+        raise HTTPException(status_code=400, detail=f"event must be one of {', '.join(ORDER_EVENTS)}")
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()] if group_by else []
+    unknown = [d for d in dimensions if d not in DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by dimensions: {', '.join(unknown)}")
+    
+    rows = ORDER_STATS.rollup(
+        granularity,
+        since=since,
+        until=until,
+        event=event,
+        department=department,
+        equipment_type=type,
+        group_by=dimensions
+    )
+    return {"granularity": granularity, "group_by": dimensions, "rows": rows}
 
 
 # ============================================
-# MARKETPLACE - STATS ENDPOINT
+# MARKETPLACE - RESERVATION EXPIRY
 # ============================================
 
-@app.get("/api/marketplace/stats")
-def get_marketplace_stats():
-    """Get marketplace statistics"""
-    total = len(MARKETPLACE_DB)
-    available = len([i for i in MARKETPLACE_DB if i["status"] == "available"])
-    reserved = len([i for i in MARKETPLACE_DB if i["status"] == "reserved"])
-    sold = len([i for i in MARKETPLACE_DB if i["status"] == "sold"])
-    pending_reservations = len([r for r in RESERVATIONS_DB if r["status"] == "pending"])
-    
-    # Value of available equipment
-    total_value = sum(
-        (i["price_manual"] or i["price_suggested"]) 
-        for i in MARKETPLACE_DB if i["status"] == "available"
-    )
+# Longest wait between two expiry checks (new deadlines are only seen on the next check)
+RESERVATION_EXPIRY_TICK_SECONDS = 60
+
+
+def expire_reservations(now: Optional[datetime] = None) -> List[str]:
+    """
+    Expire the pending reservations past their deadline and release their items
+    
+    Only the reservations popped from the deadline heap are read. Each one is
+    re-checked under its item's lock, since it may have been decided or
+    cancelled meanwhile. The locks are held until the expirations are in the
+    marketplace log (one atomic batch).
     
+    Returns:
+        Ids of the expired reservations
+    """
+    now = now or datetime.now()
+    due = [
+        reservation
+        for reservation in map(RESERVATION_STORE.get, RESERVATION_EXPIRY.pop_due(now.timestamp()))
+        if reservation is not None
+    ]
+    expired = []
+    released = []
+    if not due:
+        return expired
+    _CHANGE_FEED_MUTED.value = True
+    try:
+        with ITEM_LOCKS.hold(*{reservation["equipment_id"] for reservation in due}):
+            with MARKETPLACE_LOG.batch():
+                for reservation in due:
+                    reservation = RESERVATION_STORE.get(reservation["id"])
+                    if reservation is None or reservation["status"] != "pending":
+                        continue
+                    item = MARKETPLACE_STORE.get(reservation["equipment_id"])
+                    RESERVATION_STORE.update(reservation["id"], {
+                        "status": "expired",
+                        "decided_at": now.isoformat(),
+                        "price": effective_price(item) if item else None
+                    })
+                    MARKETPLACE_STORE.update(reservation["equipment_id"], {"status": "available"})
+                    expired.append(reservation["id"])
+                    released.append(reservation["equipment_id"])
+    finally:
+        _CHANGE_FEED_MUTED.value = False
+    
+    if expired:
+        CHANGE_FEED.publish("reservations.expired", {"ids": expired, "equipment_ids": released})
+        publish_stats_delta()
+        logger.info(f"Expired {len(expired)} pending reservations")
+    return expired
+
+
+async def run_expiry_schedule():
+    """Background task expiring reservations when the earliest deadline passes"""
+    while True:
+        next_deadline = RESERVATION_EXPIRY.next_deadline()
+        delay = RESERVATION_EXPIRY_TICK_SECONDS
+        if next_deadline is not None:
+            delay = min(max(next_deadline - time.time(), 0), delay)
+        await asyncio.sleep(delay)
+        try:
+            await asyncio.to_thread(expire_reservations)
+        except Exception as e:
+            logger.error(f"Reservation expiry failed: {e}")
+
+
+@app.post("/api/reservations/expire")
+def expire_reservations_now(admin_email: str = "admin@lvmh.com"):
+    """Expire the overdue pending reservations now (IT Admin only)"""
+    user = USERS_DB.get(admin_email)
+    if not user or user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    expired = expire_reservations()
+    return {"expired": len(expired), "ids": expired, "scheduled": len(RESERVATION_EXPIRY)}
+
+
+# ============================================
+# MARKETPLACE - SAVED SEARCHES
+# ============================================
+
+class SavedSearchRequest(BaseModel):
+    """A search to be notified about, e.g. "laptop, excellent, under 400 €" """
+    user_email: str
+    label: Optional[str] = None
+    type: Optional[str] = None
+    condition: Optional[EquipmentCondition] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+
+@app.post("/api/saved-searches")
+def create_saved_search(request: SavedSearchRequest):
+    """Save a search: matching listings created or repriced later are queued as notifications"""
+    user = USERS_DB.get(request.user_email.lower())
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if request.min_price is not None and request.max_price is not None and request.min_price > request.max_price:
+        raise HTTPException(status_code=400, detail="min_price must not exceed max_price")
+    
+    search = {
+        "id": f"search-{str(uuid.uuid4())[:8]}",
+        "user_email": user["email"],
+        "label": request.label,
+        "type": request.type,
+        "condition": request.condition.value if request.condition else None,
+        "min_price": request.min_price,
+        "max_price": request.max_price,
+        "created_at": datetime.now().isoformat()
+    }
+    SAVED_SEARCHES.add(search)
+    MARKETPLACE_LOG.put("saved_searches", search["id"], search)
+    return search
+
+
+@app.get("/api/saved-searches")
+def get_saved_searches(user_email: str):
+    """Get the saved searches of a user"""
+    return SAVED_SEARCHES.for_user(user_email.lower())
+
+
+@app.delete("/api/saved-searches/{search_id}")
+def delete_saved_search(search_id: str, user_email: str):
+    """Delete a saved search (by the user who saved it)"""
+    search = SAVED_SEARCHES.searches.get(search_id)
+    if search is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    if search["user_email"] != user_email.lower():
+        raise HTTPException(status_code=403, detail="You can only delete your own saved searches")
+    
+    SAVED_SEARCHES.remove(search_id)
+    NOTIFICATIONS.forget_search(search_id)
+    MARKETPLACE_LOG.delete("saved_searches", search_id)
+    return {"message": "Saved search deleted successfully"}
+
+
+@app.get("/api/notifications")
+def get_notifications(user_email: str, unread_only: bool = False):
+    """Get the saved-search notifications of a user, newest first"""
+    notifications = NOTIFICATIONS.list(user_email.lower(), unread_only)
     return {
-        "total_items": total,
-        "available": available,
-        "reserved": reserved,
-        "sold": sold,
-        "pending_reservations": pending_reservations,
-        "total_available_value": round(total_value, 2)
+        "notifications": notifications,
+        "unread": sum(1 for n in notifications if not n["read"])
     }
 
 
-@app.get("/api/orders/all")
-def get_all_orders():
-    """Get all orders/reservations with full details for admin view"""
-    orders = []
+@app.post("/api/notifications/read")
+def mark_notifications_read(user_email: str):
+    """Mark all the notifications of a user as read"""
+    return {"marked_read": NOTIFICATIONS.mark_read(user_email.lower())}
+
+
+# ============================================
+# MARKETPLACE - IMPACT
+# ============================================
+
+def reservation_credit(reservation: dict) -> Optional[dict]:
+    """Impact credited by an approved reservation (computed for the ones approved before the ledger)"""
+    if reservation.get("impact"):
+        return reservation["impact"]
+    item = MARKETPLACE_STORE.get(reservation["equipment_id"])
+    return calculate_reuse_impact(item) if item else None
+
+
+# CO2 avoided and money saved per user and department, credited on approval
+IMPACT_LEDGER = ImpactLedger(reservation_credit)
+IMPACT_LEDGER.rebuild(RESERVATION_STORE)
+RESERVATION_STORE.listeners.append(IMPACT_LEDGER.on_reservation_change)
+
+
+# Declared before /api/impact/{user_email}, which would otherwise capture "leaderboard"
+@app.get("/api/impact/leaderboard")
+def get_impact_leaderboard(by: str = "department", metric: str = "co2_kg", limit: int = 10):
+    """Departments (or users) ranked by CO2 avoided or money saved through the marketplace"""
+    if by not in ("department", "user"):
+        raise HTTPException(status_code=400, detail="by must be department or user")
+    if metric not in IMPACT_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(IMPACT_METRICS)}")
     
-    for reservation in RESERVATIONS_DB:
-        # Find the equipment
-        equipment = next((e for e in MARKETPLACE_DB if e["id"] == reservation["equipment_id"]), None)
-        
-        if equipment:
-            order = {
-                "id": reservation["id"],
-                "equipment": {
-                    "id": equipment["id"],
+    return {
+        "by": by,
+        "metric": metric,
+        "leaderboard": IMPACT_LEDGER.leaderboard(by, metric, max(1, min(limit, 100)))
+    }
+
+
+@app.get("/api/impact/departments/{department}")
+def get_department_impact(department: str):
+    """Impact credited to a department, with its rank"""
+    return {"department": department, **IMPACT_LEDGER.department(department)}
+
+
+@app.get("/api/impact/{user_email}")
+def get_user_impact(user_email: str):
+    """Impact credited to a collaborator, with their rank and their department's totals"""
+    user = USERS_DB.get(user_email.lower())
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return {
+        "user_email": user["email"],
+        **IMPACT_LEDGER.user(user["email"]),
+        "department": {"name": user["department"], **IMPACT_LEDGER.department(user["department"])}
+    }
+
+
+# Certificates are cached by a hash of their inputs: unchanged ones are never rendered twice
+CERTIFICATE_RENDERER = CertificateRenderer(
+    CertificateCache(os.environ.get(
+        "CERTIFICATE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "data", "certificates")
+    )),
+    workers=int(os.environ["CERTIFICATE_WORKERS"]) if os.environ.get("CERTIFICATE_WORKERS") else None,
+    start_method=os.environ.get("CERTIFICATE_START_METHOD", "spawn")
+)
+
+
+def certificate_inputs(user_email: str, period: str) -> Optional[dict]:
+    """Everything printed on a user's certificate (None without credited impact)"""
+    user = USERS_DB.get(user_email)
+    impact = IMPACT_LEDGER.user(user_email)
+    if not user or impact["items"] <= 0:
+        return None
+    return {
+        "name": user["name"],
+        "department": user["department"],
+        "period": period,
+        "co2_kg": impact["co2_kg"],
+        "money_eur": impact["money_eur"],
+        "items": impact["items"]
+    }
+
+
+@app.post("/api/certificates/batch")
+def render_certificates(period: Optional[str] = None, admin_email: str = "admin@lvmh.com"):
+    """Render the CO2 certificates of every credited collaborator (IT Admin only)"""
+    user = USERS_DB.get(admin_email)
+    if not user or user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    started = time.perf_counter()
+    period = period or str(datetime.now().year)
+    certificates = [
+        inputs for inputs in (certificate_inputs(email, period) for email in IMPACT_LEDGER.credited_users())
+        if inputs is not None
+    ]
+    result = CERTIFICATE_RENDERER.render_batch(certificates)
+    return {
+        "period": period,
+        "certificates": len(certificates),
+        "rendered": result["rendered"],
+        "cached": result["cached"],
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+@app.get("/api/certificates/{user_email}")
+def get_certificate(user_email: str, period: Optional[str] = None):
+    """A collaborator's CO2 certificate, as SVG"""
+    inputs = certificate_inputs(user_email.lower(), period or str(datetime.now().year))
+    if inputs is None:
+        raise HTTPException(status_code=404, detail="No impact credited to this user")
+    return Response(content=CERTIFICATE_RENDERER.render(inputs), media_type="image/svg+xml")
+
+
+# ============================================
+# MARKETPLACE - CHANGE FEED ENDPOINTS
+# ============================================
+
+@app.get("/api/changes/stream")
+async def stream_changes(request: Request, since: Optional[int] = None):
+    """
+    Server-Sent Events stream of marketplace changes
+    (item.created/updated/deleted, reservation.created/updated/deleted, stats deltas)
+    
+    Args:
+        since: resume after this sequence number (browsers send it as Last-Event-ID on reconnect)
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        CHANGE_FEED.stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/changes")
+def get_changes(since: int = 0, limit: int = 1000):
+    """Get the buffered changes after a sequence number (polling fallback of the stream)"""
+    events = CHANGE_FEED.events_since(since, limit)
+    if events is None:
+        # Older events were dropped from the buffer: the client must refetch everything
+        return {"reset": True, "seq": CHANGE_FEED.seq, "events": []}
+    return {"reset": False, "seq": CHANGE_FEED.seq, "events": events}
+
+
+# ============================================
+# EXPORTS
+# ============================================
+
+# Orders are read from the reservation store one keyset page at a time
+EXPORT_PAGE_SIZE = 1000
+ORDER_EXPORT_FIELDS = [
+    "id", "created_at", "decided_at", "status", "user_name", "user_email", "user_department",
+    "equipment_id", "type", "brand", "model", "condition", "price", "message"
+]
+MARKETPLACE_EXPORT_FIELDS = list(MarketplaceItem.model_fields)
+DELL_EXPORT_FIELDS = ["id", "vendor", "name", "model", "screen_size", "rating", "reviews_count", "price", "link", "features"]
+EQUIPMENT_EXPORT_FIELDS = ["id"] + EQUIPMENT_CSV_FIELDS
+
+
+def iter_order_rows():
+    """Orders as flat rows, newest first, without holding the store lock between pages"""
+    after = None
+    while True:
+        page = RESERVATION_STORE.newest(EXPORT_PAGE_SIZE, after)
+        for reservation in page:
+            equipment = MARKETPLACE_STORE.get(reservation["equipment_id"])
+            if equipment is not None:
+                yield {
+                    **reservation,
                     "type": equipment["type"],
                     "brand": equipment["brand"],
                     "model": equipment["model"],
                     "condition": equipment["condition"],
-                    "price": equipment["price_manual"] or equipment["price_suggested"]
-                },
-                "user": {
-                    "id": reservation["user_id"],
-                    "name": reservation["user_name"],
-                    "email": reservation["user_email"],
-                    "department": reservation["user_department"]
-                },
-                "message": reservation.get("message"),
-                "status": reservation["status"],
-                "created_at": reservation["created_at"]
-            }
-            orders.append(order)
-    
-    # Sort by creation date (newest first)
-    orders.sort(key=lambda x: x["created_at"], reverse=True)
-    
-    # Calculate statistics
-    total_orders = len(orders)
-    pending = len([o for o in orders if o["status"] == "pending"])
-    approved = len([o for o in orders if o["status"] == "approved"])
-    rejected = len([o for o in orders if o["status"] == "rejected"])
-    
-    # Group by department
-    by_department = {}
-    for order in orders:
-        dept = order["user"]["department"]
-        if dept not in by_department:
-            by_department[dept] = 0
-        by_department[dept] += 1
-    
-    # Group by equipment type
-    by_type = {}
-    for order in orders:
-        eq_type = order["equipment"]["type"]
-        if eq_type not in by_type:
-            by_type[eq_type] = 0
-        by_type[eq_type] += 1
-    
-    # Total value of approved orders
-    total_value = sum(
-        o["equipment"]["price"] 
-        for o in orders if o["status"] == "approved"
-    )
+                    "price": effective_price(equipment)
+                }
+        if len(page) < EXPORT_PAGE_SIZE:
+            return
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+
+EXPORTS = {
+    "orders": (iter_order_rows, ORDER_EXPORT_FIELDS),
+    "marketplace": (lambda: iter(MARKETPLACE_STORE), MARKETPLACE_EXPORT_FIELDS),
+    "dell-laptops": (lambda: iter(get_dell_catalog()), DELL_EXPORT_FIELDS),
+    "equipment-catalog": (lambda: iter(EQUIPMENT_CATALOG), EQUIPMENT_EXPORT_FIELDS)
+}
+
+
+@app.get("/api/export/{dataset}")
+def export_dataset(dataset: str, format: str = "csv", gzip: bool = False):
+    """
+    Download orders, marketplace items, the Dell catalog or the equipment catalog
     
-    return {
-        "orders": orders,
-        "statistics": {
-            "total": total_orders,
-            "pending": pending,
-            "approved": approved,
-            "rejected": rejected,
-            "by_department": by_department,
-            "by_type": by_type,
-            "total_value": round(total_value, 2)
-        }
-    }
+    Rows are serialized as they are read and sent in chunks, so memory does not
+    grow with the number of rows and the download starts at once.
+    """
+    if dataset not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {dataset} (available: {', '.join(EXPORTS)})")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    
+    rows, fields = EXPORTS[dataset]
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return export_response(rows(), fields, f"{dataset}_{stamp}", format=format, gzip=gzip)
 
 
 # ============================================
 # SCRAPER ENDPOINTS
 # ============================================
 
+# Built on first use: importing the scrapers pulls in requests, BeautifulSoup,
+# lxml and APScheduler, which API-only deployments never need
+_SCRAPER_SERVICE = None
+_SCRAPER_SERVICE_LOCK = threading.Lock()
+
+
+def get_scraper_service():
+    """Get the scraper service, importing and initializing the scraper subsystem on first use"""
+    global _SCRAPER_SERVICE
+    if _SCRAPER_SERVICE is None:
+        with _SCRAPER_SERVICE_LOCK:
+            if _SCRAPER_SERVICE is None:
+                with BOOT_TIMER.phase("scraper_service"):
+                    from scraper_service import ScraperService
+                    _SCRAPER_SERVICE = ScraperService(
+                        data_dir=os.path.join(os.path.dirname(__file__), "data"),
+                        catalog_writer=CATALOG_WRITER
+                    )
+    return _SCRAPER_SERVICE
+
+
 @app.post("/api/scraper/scrape/{vendor}")
 def scrape_vendor(vendor: str, product_type: str = "laptop"):
     """
@@ -1643,13 +2772,13 @@ def scrape_vendor(vendor: str, product_type: str = "laptop"):
         vendor: Vendor name (dell, hp, etc.)
         product_type: Type of product to scrape (default: laptop)
     """
-    result = SCRAPER_SERVICE.scrape_vendor(vendor, product_type)
+    result = get_scraper_service().scrape_vendor(vendor, product_type)
     if not result.get("success"):
         raise HTTPException(status_code=500, detail=result.get("error", "Scraping failed"))
     
-    # Reload catalog if Dell was scraped
-    if vendor.lower() == "dell" and product_type == "laptop":
-        count = reload_dell_catalog()
+    # Reload the scraped vendor's shard only
+    if product_type == "laptop":
+        count = reload_vendor_catalog(vendor)
         result["catalog_reloaded"] = True
         result["catalog_count"] = count
     
@@ -1664,25 +2793,32 @@ def scrape_all_vendors(product_type: str = "laptop"):
     Args:
         product_type: Type of product to scrape (default: laptop)
     """
-    result = SCRAPER_SERVICE.scrape_all_vendors(product_type)
-    
-    # Reload catalog if Dell was scraped
-    if "dell" in result.get("results", {}) and product_type == "laptop":
-        count = reload_dell_catalog()
-        result["catalog_reloaded"] = True
-        result["catalog_count"] = count
+    result = get_scraper_service().scrape_all_vendors(product_type)
+    
+    # Reload the shards of the vendors that were scraped successfully
+    if product_type == "laptop":
+        counts = {
+            vendor: reload_vendor_catalog(vendor)
+            for vendor, vendor_result in result.get("results", {}).items()
+            if vendor_result.get("success")
+        }
+        result["catalog_reloaded"] = bool(counts)
+        result["catalog_count"] = sum(counts.values())
+        result["catalog_counts"] = counts
     
     return result
 
 
 @app.post("/api/scraper/reload-catalog")
-def reload_catalog():
-    """Manually reload the Dell catalog from CSV files"""
-    count = reload_dell_catalog()
+def reload_catalog(vendor: Optional[str] = None):
+    """Manually reload the scraped catalog from CSV files (one vendor, or all of them)"""
+    vendors = [vendor.lower()] if vendor else CATALOG_STORE.vendors()
+    counts = {v: reload_vendor_catalog(v) for v in vendors}
     return {
         "success": True,
         "message": f"Catalog reloaded successfully",
-        "product_count": count
+        "product_count": sum(counts.values()),
+        "vendors": counts
     }
 
 
@@ -1695,7 +2831,7 @@ def start_scheduler(hours: int = 24):
         hours: How often to scrape (in hours, default: 24)
     """
     try:
-        SCRAPER_SERVICE.start_scheduler(schedule_hours=hours)
+        get_scraper_service().start_scheduler(schedule_hours=hours)
         return {
             "success": True,
             "message": f"Scheduler started - will scrape every {hours} hours"
@@ -1708,7 +2844,8 @@ def start_scheduler(hours: int = 24):
 def stop_scheduler():
     """Stop the automatic scraping scheduler"""
     try:
-        SCRAPER_SERVICE.stop_scheduler()
+        if _SCRAPER_SERVICE is not None:
+            _SCRAPER_SERVICE.stop_scheduler()
         return {"success": True, "message": "Scheduler stopped"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1717,14 +2854,17 @@ def stop_scheduler():
 @app.get("/api/scraper/scheduler/status")
 def get_scheduler_status():
     """Get scheduler status"""
-    return SCRAPER_SERVICE.get_scheduler_status()
+    if _SCRAPER_SERVICE is None:
+        # Nothing was ever scheduled: report without loading the scraper subsystem
+        return {"running": False, "jobs": []}
+    return _SCRAPER_SERVICE.get_scheduler_status()
 
 
 @app.get("/api/scraper/vendors")
 def get_supported_vendors():
     """Get list of supported vendors"""
     return {
-        "vendors": list(SCRAPER_SERVICE.scrapers.keys()),
+        "vendors": get_scraper_service().vendors,
         "supported_product_types": ["laptop"]  # Can be extended
     }
 
@@ -1737,17 +2877,38 @@ def get_supported_vendors():
 async def startup_event():
     """Initialize services on startup"""
     logger.info("Starting Green IT ROI Platform API")
-    # Optionally start scheduler on startup (uncomment if desired)
-    # SCRAPER_SERVICE.start_scheduler(schedule_hours=24)
+    CHANGE_FEED.bind(asyncio.get_running_loop())
+    CERTIFICATE_RENDERER.start()
+    if MARKETPLACE_REPRICE_HOURS > 0:
+        app.state.repricing_task = asyncio.create_task(run_repricing_schedule())
+    if RESERVATION_TTL_HOURS > 0:
+        app.state.expiry_task = asyncio.create_task(run_expiry_schedule())
+    # The scraper subsystem is only loaded at startup when the scheduler is enabled
+    if SCRAPER_SCHEDULER_ENABLED:
+        get_scraper_service().start_scheduler(schedule_hours=SCRAPER_SCHEDULE_HOURS)
+    BOOT_TIMER.mark_ready()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down Green IT ROI Platform API")
-    SCRAPER_SERVICE.stop_scheduler()
+    for task_name in ("repricing_task", "expiry_task"):
+        task = getattr(app.state, task_name, None)
+        if task is not None:
+            task.cancel()
+    if _SCRAPER_SERVICE is not None:
+        _SCRAPER_SERVICE.stop_scheduler()
+    CATALOG_WRITER.close()
+    MARKETPLACE_LOG.close()
+    CERTIFICATE_RENDERER.close()
 
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
+    # Spawned workers (certificate pool) re-run the main script unless its spec
+    # is named __main__: they only need their own modules, not a second app
+    # recovering the same marketplace log
+    __spec__ = importlib.util.spec_from_loader("__main__", loader=None)
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,119 @@
+"""Marketplace statistics maintained incrementally from store changes"""
+import threading
+from typing import Dict, Iterable, Optional
+
+from marketplace_store import MarketplaceStore, ReservationStore, effective_price
+
+ITEM_STATUSES = ("available", "reserved", "sold")
+
+
+class MarketplaceStats:
+    """
+    Counters of the marketplace stats endpoint, updated by store listeners
+
+    Every item or reservation change adjusts the counters by the difference
+    between the record before and after it, so reading the stats never scans
+    the stores. verify() recomputes them from scratch to check for drift.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.total_items = 0
+        self.by_status: Dict[str, int] = {status: 0 for status in ITEM_STATUSES}
+        self.available_value = 0.0
+        self.pending_reservations = 0
+
+    def rebuild(self, items: Iterable[Dict], reservations: Iterable[Dict]):
+        """Recompute every counter from the full item and reservation lists"""
+        with self._lock:
+            self.reset()
+            for item in items:
+                self._apply_item(item, 1)
+            for reservation in reservations:
+                self._apply_reservation(reservation, 1)
+
+    def on_item_change(self, event: str, item: Dict, previous: Optional[Dict]):
+        """Marketplace store listener"""
+        with self._lock:
+            if event == "add":
+                self._apply_item(item, 1)
+            elif event == "remove":
+                self._apply_item(item, -1)
+            else:
+                self._apply_item(previous, -1)
+                self._apply_item(item, 1)
+
+    def on_reservation_change(self, event: str, reservation: Dict, previous: Optional[Dict]):
+        """Reservation store listener"""
+        with self._lock:
+            if event == "add":
+                self._apply_reservation(reservation, 1)
+            elif event == "remove":
+                self._apply_reservation(reservation, -1)
+            else:
+                self._apply_reservation(previous, -1)
+                self._apply_reservation(reservation, 1)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "total_items": self.total_items,
+                "available": self.by_status["available"],
+                "reserved": self.by_status["reserved"],
+                "sold": self.by_status["sold"],
+                "pending_reservations": self.pending_reservations,
+                "total_available_value": round(self.available_value, 2)
+            }
+
+    def verify(self, items: MarketplaceStore, reservations: ReservationStore, repair: bool = False) -> Dict:
+        """
+        Compare the counters with a full recomputation
+
+        Both store locks are held from the recount to the swap: a change applied
+        in between would be counted by the listeners but lost by the repair.
+
+        Args:
+            items: the marketplace store
+            reservations: the reservation store
+            repair: replace the counters with the recomputed ones when they differ
+
+        Returns:
+            Dictionary with the consistency flag and the differing counters
+        """
+        with items._lock, reservations._lock:
+            expected = MarketplaceStats()
+            expected.rebuild(items, reservations)
+            current, recomputed = self.snapshot(), expected.snapshot()
+            differences = {
+                name: {"current": current[name], "expected": recomputed[name]}
+                for name in current
+                if current[name] != recomputed[name]
+            }
+            if differences and repair:
+                with self._lock:
+                    self.total_items = expected.total_items
+                    self.by_status = expected.by_status
+                    self.available_value = expected.available_value
+                    self.pending_reservations = expected.pending_reservations
+        return {
+            "consistent": not differences,
+            "differences": differences,
+            "repaired": bool(differences) and repair
+        }
+
+    def _apply_item(self, item: Dict, sign: int):
+        self.total_items += sign
+        status = item["status"]
+        self.by_status[status] = self.by_status.get(status, 0) + sign
+        if status == "available":
+            self.available_value += sign * effective_price(item)
+            if self.by_status["available"] == 0:
+                # Cancel out the float error accumulated by additions and subtractions
+                self.available_value = 0.0
+
+    def _apply_reservation(self, reservation: Dict, sign: int):
+        if reservation["status"] == "pending":
+            self.pending_reservations += sign
@@ -0,0 +1,363 @@
+"""In-memory marketplace and reservation stores with secondary indexes"""
+import threading
+from contextlib import ExitStack, contextmanager
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# A listener is called after every mutation, under the store lock, with the
+# event ("add", "update" or "remove"), the record and, for updates, a copy of
+# the record before the change
+StoreListener = Callable[[str, Dict, Optional[Dict]], None]
+# A committer is called after every mutation, once the store lock is released
+# (e.g. to wait for the write-ahead log to be durable without blocking readers)
+StoreCommitter = Callable[[], None]
+
+
+# Above this many records, update_many() rebuilds sorted indexes instead of shifting them per record
+BULK_UPDATE_THRESHOLD = 256
+
+
+def effective_price(item: Dict) -> float:
+    """Price shown to buyers: the manual price when set, else the suggested one"""
+    return item["price_manual"] or item["price_suggested"]
+
+
+class IndexedStore:
+    """
+    Records by id, with equality indexes (field value -> set of ids) kept in sync
+
+    Queries intersect index entries, starting from the smallest, instead of
+    scanning every record. Results keep insertion order, like the lists the
+    stores replace.
+    """
+
+    indexed_fields: Tuple[str, ...] = ()
+
+    def __init__(self, records: Iterable[Dict] = ()):
+        self._lock = threading.RLock()
+        self._records: Dict[str, Dict] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        self._indexes: Dict[str, Dict[str, Set[str]]] = {field: {} for field in self.indexed_fields}
+        self.listeners: List[StoreListener] = []
+        self.committers: List[StoreCommitter] = []
+        # Set during bulk loads and updates, so sorted indexes are rebuilt once at the end
+        self._bulk = True
+        for record in records:
+            self._add(record)
+        self._bulk = False
+        self._rebuild_sorted()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Dict]:
+        with self._lock:
+            return iter(list(self._records.values()))
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._records
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        return self._records.get(record_id)
+
+    def add(self, record: Dict) -> Dict:
+        with self._lock:
+            self._add(record)
+            self._notify("add", record, None)
+        self._commit()
+        return record
+
+    def update(self, record_id: str, changes: Dict) -> Optional[Dict]:
+        """Apply field changes to a record and re-index it (None if the record does not exist)"""
+        with self._lock:
+            record = self._records.get(record_id)
+            if record is None:
+                return None
+            previous = dict(record)
+            self._unindex(record)
+            record.update(changes)
+            self._index(record)
+            self._notify("update", record, previous)
+        self._commit()
+        return record
+
+    def update_many(self, updates: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Apply many (record id, changes) updates, rebuilding sorted indexes once"""
+        with self._lock:
+            bulk = len(updates) > BULK_UPDATE_THRESHOLD
+            self._bulk = bulk
+            applied = []
+            try:
+                for record_id, changes in updates:
+                    record = self._records.get(record_id)
+                    if record is None:
+                        continue
+                    previous = dict(record)
+                    self._unindex(record)
+                    record.update(changes)
+                    self._index(record)
+                    applied.append((record, previous))
+            finally:
+                if bulk:
+                    self._bulk = False
+                    self._rebuild_sorted()
+            for record, previous in applied:
+                self._notify("update", record, previous)
+        self._commit()
+        return [record for record, _ in applied]
+
+    def remove(self, record_id: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._records.pop(record_id, None)
+            if record is None:
+                return None
+            self._unindex(record)
+            self._drop(record)
+            del self._order[record_id]
+            self._notify("remove", record, None)
+        self._commit()
+        return record
+
+    def ids_with(self, field: str, value: str) -> Set[str]:
+        """Ids of the records whose indexed field has a value (read-only view)"""
+        return self._indexes[field].get(value, set())
+
+    def count(self, field: str, value: str) -> int:
+        return len(self._indexes[field].get(value, ()))
+
+    def values_of(self, field: str) -> List[str]:
+        """Distinct values of an indexed field"""
+        return list(self._indexes[field].keys())
+
+    def select(self, candidates: List[Set[str]]) -> List[Dict]:
+        """Records whose id is in every candidate set, in insertion order"""
+        with self._lock:
+            if not candidates:
+                return list(self._records.values())
+            candidates = sorted(candidates, key=len)
+            ids = candidates[0]
+            for other in candidates[1:]:
+                if not ids:
+                    break
+                ids = ids & other
+            return [self._records[i] for i in sorted(ids, key=self._order.__getitem__)]
+
+    def find(self, **filters: Optional[str]) -> List[Dict]:
+        """Records matching every given indexed field value (None = any)"""
+        return self.select([self.ids_with(field, value) for field, value in filters.items() if value is not None])
+
+    def _add(self, record: Dict):
+        if record["id"] in self._records:
+            raise ValueError(f"Record {record['id']} already exists")
+        self._records[record["id"]] = record
+        self._order[record["id"]] = self._next_order
+        self._next_order += 1
+        self._index(record)
+
+    def _rebuild_sorted(self):
+        """Rebuild the sorted indexes after a bulk load or update"""
+
+    def _drop(self, record: Dict):
+        """Remove a deleted record from the indexes that updates keep (called under the lock)"""
+
+    def _index(self, record: Dict):
+        for field in self.indexed_fields:
+            self._indexes[field].setdefault(record.get(field), set()).add(record["id"])
+
+    def _unindex(self, record: Dict):
+        for field in self.indexed_fields:
+            ids = self._indexes[field].get(record.get(field))
+            if ids is not None:
+                ids.discard(record["id"])
+                if not ids:
+                    del self._indexes[field][record.get(field)]
+
+    def _notify(self, event: str, record: Dict, previous: Optional[Dict]):
+        for listener in self.listeners:
+            listener(event, record, previous)
+
+    def _commit(self):
+        for committer in self.committers:
+            committer()
+
+
+class MarketplaceStore(IndexedStore):
+    """
+    Marketplace items, indexed by status, type and condition, plus a sorted
+    (effective price, insertion order, id) list answering price ranges by bisection
+    """
+
+    indexed_fields = ("status", "type", "condition")
+
+    def __init__(self, items: Iterable[Dict] = ()):
+        self._prices: List[Tuple[float, int, str]] = []
+        super().__init__(items)
+
+    def query(self, type: Optional[str] = None, condition: Optional[str] = None,
+              statuses: Optional[List[str]] = None, min_price: Optional[float] = None,
+              max_price: Optional[float] = None) -> List[Dict]:
+        """
+        Items matching every given filter, in insertion order
+
+        Args:
+            type: equipment type
+            condition: equipment condition
+            statuses: accepted statuses (any of them)
+            min_price: lowest effective price (inclusive)
+            max_price: highest effective price (inclusive)
+        """
+        with self._lock:
+            candidates: List[Set[str]] = []
+            if type is not None:
+                candidates.append(self.ids_with("type", type))
+            if condition is not None:
+                candidates.append(self.ids_with("condition", condition))
+            if statuses is not None:
+                by_status = [self.ids_with("status", s) for s in statuses]
+                candidates.append(by_status[0] if len(by_status) == 1 else set().union(*by_status))
+            if min_price is not None or max_price is not None:
+                candidates.append(self._price_range(min_price, max_price))
+            return self.select(candidates)
+
+    def _rebuild_sorted(self):
+        # One sort instead of an insort (a list shift) per record
+        self._prices = sorted(
+            (effective_price(record), self._order[record_id], record_id)
+            for record_id, record in self._records.items()
+        )
+
+    def _price_range(self, min_price: Optional[float], max_price: Optional[float]) -> Set[str]:
+        lo = 0 if min_price is None else bisect_left(self._prices, (min_price,))
+        hi = len(self._prices) if max_price is None else bisect_right(self._prices, (max_price, float("inf")))
+        return {entry[2] for entry in self._prices[lo:hi]}
+
+    def _index(self, record: Dict):
+        super()._index(record)
+        if not self._bulk:
+            insort(self._prices, (effective_price(record), self._order[record["id"]], record["id"]))
+
+    def _unindex(self, record: Dict):
+        super()._unindex(record)
+        if self._bulk:
+            return
+        entry = (effective_price(record), self._order[record["id"]], record["id"])
+        i = bisect_left(self._prices, entry)
+        if i < len(self._prices) and self._prices[i] == entry:
+            del self._prices[i]
+
+
+class ReservationStore(IndexedStore):
+    """
+    Reservations, indexed by status, requester, department and equipment, plus
+    sorted (created_at, id) lists for keyset pagination (created_at never changes):
+    one over every reservation and one per status and per department value
+    """
+
+    indexed_fields = ("status", "user_email", "user_department", "equipment_id")
+    # Fields with one sorted (created_at, id) list per value, so filtered pages only walk matching reservations
+    sorted_by_created_fields = ("status", "user_department")
+
+    def __init__(self, reservations: Iterable[Dict] = ()):
+        self._created: List[Tuple[str, str]] = []
+        self._created_by: Dict[str, Dict[str, List[Tuple[str, str]]]] = {
+            field: {} for field in self.sorted_by_created_fields
+        }
+        super().__init__(reservations)
+
+    def newest(self, limit: int, after: Optional[Tuple[str, str]] = None,
+               accept: Optional[Callable[[Dict], bool]] = None,
+               status: Optional[str] = None, department: Optional[str] = None) -> List[Dict]:
+        """
+        A page of reservations, from the newest to the oldest by (created_at, id)
+
+        Args:
+            limit: page size
+            after: (created_at, id) of the last reservation of the previous page;
+                only older reservations are returned
+            accept: filter, applied while walking so that pages stay full
+            status: only reservations with this status
+            department: only reservations of this requester department
+        """
+        with self._lock:
+            filters = [(field, value) for field, value in (("status", status), ("user_department", department))
+                       if value is not None]
+            # Walk the shortest list that holds every match, check the other filter on the way
+            created = self._created
+            for field, value in filters:
+                entries = self._created_by[field].get(value, [])
+                if len(entries) < len(created):
+                    created = entries
+            page = []
+            i = len(created) if after is None else bisect_left(created, after)
+            while i > 0 and len(page) < limit:
+                i -= 1
+                record = self._records[created[i][1]]
+                if all(record.get(field) == value for field, value in filters) and (accept is None or accept(record)):
+                    page.append(record)
+            return page
+
+    def _add(self, record: Dict):
+        super()._add(record)
+        if not self._bulk:
+            insort(self._created, (record["created_at"], record["id"]))
+
+    def _drop(self, record: Dict):
+        _remove_sorted(self._created, (record["created_at"], record["id"]))
+
+    def _index(self, record: Dict):
+        super()._index(record)
+        if not self._bulk:
+            for field in self.sorted_by_created_fields:
+                insort(self._created_by[field].setdefault(record.get(field), []), (record["created_at"], record["id"]))
+
+    def _unindex(self, record: Dict):
+        super()._unindex(record)
+        if self._bulk:
+            return
+        for field in self.sorted_by_created_fields:
+            entries = self._created_by[field].get(record.get(field))
+            if entries is not None:
+                _remove_sorted(entries, (record["created_at"], record["id"]))
+                if not entries:
+                    del self._created_by[field][record.get(field)]
+
+    def _rebuild_sorted(self):
+        self._created = sorted((record["created_at"], record_id) for record_id, record in self._records.items())
+        self._created_by = {field: {} for field in self.sorted_by_created_fields}
+        # Filled in created order, so each list comes out sorted
+        for entry in self._created:
+            record = self._records[entry[1]]
+            for field in self.sorted_by_created_fields:
+                self._created_by[field].setdefault(record.get(field), []).append(entry)
+
+
+def _remove_sorted(entries: List[Tuple[str, str]], entry: Tuple[str, str]):
+    i = bisect_left(entries, entry)
+    if i < len(entries) and entries[i] == entry:
+        del entries[i]
+
+
+class StripedLock:
+    """
+    Fixed pool of locks, one chosen per key by hash
+
+    Operations on the same key (e.g. an equipment id) are serialized, while
+    operations on different keys almost never wait for each other, without
+    keeping one lock per key alive.
+    """
+
+    def __init__(self, stripes: int = 256):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def for_key(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def hold(self, *keys: str):
+        """Hold the locks of several keys, always taken in stripe order to avoid deadlocks"""
+        stripes = sorted({hash(key) % len(self._locks) for key in keys})
+        with ExitStack() as stack:
+            for stripe in stripes:
+                stack.enter_context(self._locks[stripe])
+            yield
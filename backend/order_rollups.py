@@ -0,0 +1,106 @@
+"""Time-bucketed rollups of order events (reservations created and decided)"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+GRANULARITIES = ("hour", "day", "week", "month")
+DIMENSIONS = ("department", "type", "event")
+# "created" when a reservation is made, then the status it is decided to
+ORDER_EVENTS = ("created", "approved", "rejected", "expired")
+
+# (department, equipment type, event) -> [count, value in cents]
+BucketCounts = Dict[Tuple[str, str, str], List[int]]
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> str:
+    """Label of the bucket holding a timestamp: its start, as an ISO date (or date and hour)"""
+    if granularity == "hour":
+        return timestamp.strftime("%Y-%m-%dT%H:00")
+    if granularity == "day":
+        return timestamp.date().isoformat()
+    if granularity == "week":
+        return (timestamp.date() - timedelta(days=timestamp.weekday())).isoformat()
+    return timestamp.date().replace(day=1).isoformat()
+
+
+class OrderRollups:
+    """
+    Order event counters per time bucket, for each granularity
+
+    Events are "created" (at the reservation's created_at) and the decision
+    statuses (at its decided_at), split by the requester's department and the
+    equipment type; approvals also sum the equipment value. The counters are
+    fed by OrderStats with the same contributions as its totals, so queries
+    only read buckets, never reservations.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, Dict[str, BucketCounts]] = {granularity: {} for granularity in GRANULARITIES}
+
+    def apply(self, timestamp: Optional[str], department: str, equipment_type: str, event: str, cents: int,
+              sign: int):
+        """Add (sign=1) or remove (sign=-1) one event"""
+        if not timestamp:
+            return
+        try:
+            when = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return
+        key = (department, equipment_type, event)
+        for granularity, buckets in self._buckets.items():
+            label = bucket_start(when, granularity)
+            counts = buckets.setdefault(label, {})
+            entry = counts.get(key)
+            if entry is None:
+                entry = counts[key] = [0, 0]
+            entry[0] += sign
+            entry[1] += sign * cents
+            if entry[0] == 0:
+                del counts[key]
+                if not counts:
+                    del buckets[label]
+
+    def query(self, granularity: str, since: Optional[str] = None, until: Optional[str] = None,
+              event: Optional[str] = None, department: Optional[str] = None, equipment_type: Optional[str] = None,
+              group_by: Sequence[str] = ()) -> List[Dict]:
+        """
+        Event counts and values per bucket
+
+        Args:
+            granularity: hour, day, week or month
+            since: first bucket (inclusive, same format as the bucket labels or any ISO prefix)
+            until: last bucket (inclusive)
+            event: keep one event ("created", "approved", ...)
+            department: keep one department
+            equipment_type: keep one equipment type
+            group_by: dimensions kept in the rows (department, type, event); the others are summed
+
+        Returns:
+            One row per bucket and group, sorted by bucket
+        """
+        rows: Dict[Tuple, Dict] = {}
+        for label in sorted(self._buckets[granularity]):
+            if since is not None and label < since[:len(label)]:
+                continue
+            if until is not None and label[:len(until)] > until:
+                break
+            for (dept, eq_type, evt), (count, cents) in self._buckets[granularity][label].items():
+                if (event is not None and evt != event) or (department is not None and dept != department) \
+                        or (equipment_type is not None and eq_type != equipment_type):
+                    continue
+                values = {"department": dept, "type": eq_type, "event": evt}
+                group = tuple(values[dimension] for dimension in group_by)
+                row = rows.get((label,) + group)
+                if row is None:
+                    row = rows[(label,) + group] = {"bucket": label, **{d: values[d] for d in group_by}, "count": 0, "cents": 0}
+                row["count"] += count
+                row["cents"] += cents
+        return [
+            {**{k: v for k, v in row.items() if k != "cents"}, "value": row["cents"] / 100}
+            for row in rows.values()
+        ]
+
+    def bucket_count(self) -> int:
+        return sum(len(buckets) for buckets in self._buckets.values())
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, OrderRollups) and self._buckets == other._buckets
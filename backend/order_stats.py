@@ -0,0 +1,174 @@
+"""Statistics of the admin orders view, materialized from store changes"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from marketplace_store import ReservationStore, effective_price
+from order_rollups import OrderRollups
+
+# What one order adds to the statistics: (status, department, equipment type,
+# price in cents, created_at, decided_at)
+Contribution = Tuple[str, str, str, int, str, Optional[str]]
+# Equipment type of the reservations whose item was deleted before the type was recorded on them
+UNKNOWN_TYPE = "unknown"
+
+
+def freeze_item_fields(reservation: Dict, item: Optional[Dict]) -> Dict:
+    """
+    Item fields an order keeps from the moment of its events, missing from a reservation
+
+    The equipment type is recorded when the reservation is created and the
+    item's price when it is decided, so editing, repricing or deleting the item
+    afterwards does not rewrite the order's history.
+    """
+    changes = {}
+    if item is None:
+        return changes
+    if reservation.get("equipment_type") is None:
+        changes["equipment_type"] = item["type"]
+    if reservation["status"] != "pending" and reservation.get("price") is None:
+        changes["price"] = effective_price(item)
+    return changes
+
+
+class OrderStats:
+    """
+    Order counters (by status, department and equipment type) and approved value
+
+    An order is a reservation, with the equipment type and price recorded on
+    it when it was created and decided (see freeze_item_fields): later changes
+    of the item, its deletion included, do not alter the statistics of past
+    orders. The contribution of every order is kept, so a reservation change
+    replaces its old contribution by the new one without scanning the other
+    orders. Values are summed in cents, which keeps the total exact however
+    many changes are applied. The same contributions feed the time-bucketed
+    rollups, where they only ever add the events of a reservation's
+    transitions (created, then decided); only a cancelled, hence deleted,
+    pending reservation withdraws its "created" event.
+    """
+
+    def __init__(self, reservations: ReservationStore):
+        self.reservations = reservations
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._contributions: Dict[str, Contribution] = {}
+        self.by_status: Dict[str, int] = {}
+        self.by_department: Dict[str, int] = {}
+        self.by_type: Dict[str, int] = {}
+        self.approved_cents = 0
+        self.rollups = OrderRollups()
+
+    def rebuild(self):
+        """Recompute every counter from the stores"""
+        with self._lock:
+            self.reset()
+            for reservation in self.reservations:
+                self._set(reservation["id"], self._contribution(reservation))
+
+    def on_reservation_change(self, event: str, reservation: Dict, previous: Optional[Dict]):
+        """Reservation store listener"""
+        with self._lock:
+            self._set(reservation["id"], None if event == "remove" else self._contribution(reservation))
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "total": sum(self.by_status.values()),
+                "pending": self.by_status.get("pending", 0),
+                "approved": self.by_status.get("approved", 0),
+                "rejected": self.by_status.get("rejected", 0),
+                "expired": self.by_status.get("expired", 0),
+                "by_department": dict(sorted(self.by_department.items())),
+                "by_type": dict(sorted(self.by_type.items())),
+                "total_value": self.approved_cents / 100
+            }
+
+    def rollup(self, granularity: str, **filters) -> List[Dict]:
+        """Time-bucketed order events (see OrderRollups.query)"""
+        with self._lock:
+            return self.rollups.query(granularity, **filters)
+
+    def verify(self, repair: bool = False) -> Dict:
+        """
+        Compare the counters with a full recomputation
+
+        The reservation store lock is held from the recount to the swap, so no
+        change is applied in between and lost by the repair.
+
+        Args:
+            repair: replace the counters with the recomputed ones when they differ
+
+        Returns:
+            Dictionary with the consistency flag and the differing counters
+        """
+        with self.reservations._lock:
+            expected = OrderStats(self.reservations)
+            expected.rebuild()
+            current, recomputed = self.snapshot(), expected.snapshot()
+            differences = {
+                name: {"current": current[name], "expected": recomputed[name]}
+                for name in current
+                if current[name] != recomputed[name]
+            }
+            if self.rollups != expected.rollups:
+                differences["rollups"] = {
+                    "current": self.rollups.bucket_count(),
+                    "expected": expected.rollups.bucket_count()
+                }
+            if differences and repair:
+                with self._lock:
+                    self._contributions = expected._contributions
+                    self.by_status = expected.by_status
+                    self.by_department = expected.by_department
+                    self.by_type = expected.by_type
+                    self.approved_cents = expected.approved_cents
+                    self.rollups = expected.rollups
+        return {
+            "consistent": not differences,
+            "differences": differences,
+            "repaired": bool(differences) and repair
+        }
+
+    @staticmethod
+    def _contribution(reservation: Dict) -> Contribution:
+        price = reservation.get("price")
+        return (
+            reservation["status"],
+            reservation["user_department"],
+            reservation.get("equipment_type") or UNKNOWN_TYPE,
+            round(price * 100) if price is not None else 0,
+            reservation["created_at"],
+            reservation.get("decided_at")
+        )
+
+    def _set(self, reservation_id: str, contribution: Optional[Contribution]):
+        previous = self._contributions.pop(reservation_id, None)
+        if previous == contribution:
+            if previous is not None:
+                self._contributions[reservation_id] = previous
+            return
+        if previous is not None:
+            self._apply(previous, -1)
+        if contribution is not None:
+            self._contributions[reservation_id] = contribution
+            self._apply(contribution, 1)
+
+    def _apply(self, contribution: Contribution, sign: int):
+        status, department, equipment_type, cents, created_at, decided_at = contribution
+        _add(self.by_status, status, sign)
+        _add(self.by_department, department, sign)
+        _add(self.by_type, equipment_type, sign)
+        if status == "approved":
+            self.approved_cents += sign * cents
+        self.rollups.apply(created_at, department, equipment_type, "created", 0, sign)
+        if status != "pending":
+            self.rollups.apply(decided_at, department, equipment_type, status, cents if status == "approved" else 0, sign)
+
+
+def _add(counts: Dict[str, int], key: str, sign: int):
+    count = counts.get(key, 0) + sign
+    if count:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
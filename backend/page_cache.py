@@ -0,0 +1,150 @@
+"""On-disk cache of fetched pages, revalidated with conditional requests"""
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import NamedTuple, Optional
+
+# Where pages are cached and how much disk they may use (0 disables the cache)
+SCRAPER_HTTP_CACHE_DIR = os.environ.get(
+    "SCRAPER_HTTP_CACHE_DIR", os.path.join(os.path.dirname(__file__), "data", "http_cache")
+)
+SCRAPER_HTTP_CACHE_MB = float(os.environ.get("SCRAPER_HTTP_CACHE_MB", "256"))
+
+
+class CachedResponse(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_hash: str
+
+
+class HTTPCache:
+    """
+    Pages fetched by URL, with the validators to ask the site whether they changed
+
+    An SQLite index maps every URL to its ETag, Last-Modified and the sha256
+    of its body; bodies are files named by that hash, so identical pages are
+    stored once. When the total size exceeds `max_bytes`, the least recently
+    used URLs are dropped (sizes are counted per URL).
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "body_hash TEXT NOT NULL, size INTEGER NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_body_hash ON responses (body_hash)")
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def body_path(self, body_hash: str) -> str:
+        return os.path.join(self.directory, "bodies", body_hash[:2], body_hash)
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Validators and body hash of a cached URL, None if it is not cached"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, body_hash FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def body(self, body_hash: str) -> Optional[bytes]:
+        try:
+            with open(self.body_path(body_hash), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def store(self, url: str, content: bytes, body_hash: str, etag: Optional[str], last_modified: Optional[str]):
+        """Cache a 200 response, replacing the previous one of the URL"""
+        if len(content) > self.max_bytes:
+            return
+        path = self.body_path(body_hash)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Written aside then renamed: a reader never sees a partial body
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            previous = self._db.execute("SELECT body_hash, size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body_hash, size, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body_hash, len(content), time.time())
+            )
+            self._total += len(content)
+            if previous is not None:
+                self._total -= previous[1]
+                if previous[0] != body_hash:
+                    self._remove_body_if_unused(previous[0])
+            self._evict()
+            self._db.commit()
+
+    def touch(self, url: str):
+        """Mark a URL as just used (revalidated by a 304)"""
+        with self._lock:
+            self._db.execute("UPDATE responses SET used_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def forget(self, url: str):
+        with self._lock:
+            self._delete(url)
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _evict(self):
+        while self._total > self.max_bytes:
+            row = self._db.execute("SELECT url FROM responses ORDER BY used_at LIMIT 1").fetchone()
+            if row is None:
+                self._total = 0
+                return
+            self._delete(row[0])
+
+    def _delete(self, url: str):
+        row = self._db.execute("SELECT body_hash, size FROM responses WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return
+        self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+        self._total -= row[1]
+        self._remove_body_if_unused(row[0])
+
+    def _remove_body_if_unused(self, body_hash: str):
+        if self._db.execute("SELECT 1 FROM responses WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone() is None:
+            try:
+                os.remove(self.body_path(body_hash))
+            except FileNotFoundError:
+                pass
+
+
+_shared_cache: Optional[HTTPCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_http_cache() -> Optional[HTTPCache]:
+    """The cache used by every scraper of the process, None when SCRAPER_HTTP_CACHE_MB is 0"""
+    global _shared_cache
+    if SCRAPER_HTTP_CACHE_MB <= 0:
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = HTTPCache(SCRAPER_HTTP_CACHE_DIR, int(SCRAPER_HTTP_CACHE_MB * 1024 * 1024))
+        return _shared_cache
@@ -0,0 +1,414 @@
+"""Write-ahead log and snapshots for the in-memory marketplace data"""
+import io
+import os
+import json
+import glob
+import zlib
+import struct
+import logging
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Every record is framed as: payload length, crc32, sequence number, op, payload.
+# The crc covers the sequence number, the op and the payload, so a torn or
+# corrupted record is detected instead of being replayed.
+RECORD_HEADER = struct.Struct("<IIQB")
+OP_PUT = 1
+OP_DELETE = 2
+OP_SNAPSHOT = 3
+# The records of a batch(), framed inside the payload of one record: replayed entirely or not at all
+OP_BATCH = 4
+
+SEGMENT_PATTERN = "wal-*.log"
+SNAPSHOT_NAME = "snapshot.bin"
+
+# collection name -> record key -> record
+State = Dict[str, Dict[str, Dict]]
+
+
+class CorruptLogError(Exception):
+    """Raised when a log or snapshot record fails its checksum outside of the log tail"""
+
+
+def encode_record(seq: int, op: int, payload: bytes) -> bytes:
+    crc = zlib.crc32(payload, zlib.crc32(struct.pack("<QB", seq, op)))
+    return RECORD_HEADER.pack(len(payload), crc, seq, op) + payload
+
+
+def read_records(f: BinaryIO) -> Iterator[Tuple[int, int, bytes, int]]:
+    """
+    Read framed records from a file
+
+    Yields:
+        (sequence number, op, payload, offset after the record); stops at the
+        end of the file or at the first incomplete or corrupted record
+    """
+    offset = f.tell()
+    while True:
+        header = f.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return
+        length, crc, seq, op = RECORD_HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload, zlib.crc32(struct.pack("<QB", seq, op))) != crc:
+            return
+        offset += RECORD_HEADER.size + length
+        yield seq, op, payload, offset
+
+
+class DurableLog:
+    """
+    Append-only log of record puts and deletes, compacted into snapshots
+
+    Each mutation is appended to the current log segment, then made durable
+    by `sync()` before the caller returns. Appends only write to the segment's
+    buffer under the log lock; the fsync runs outside it, and covers every
+    record appended meanwhile, so concurrent writers share one fsync (group
+    commit). Every `snapshot_every` records (or, for a state larger than that,
+    every state-size records, which keeps snapshot writes linear in the number
+    of mutations), the full state is written to a snapshot (temporary file +
+    rename) on a background thread, the log moves to a new segment and the
+    segments covered by the snapshot are deleted. Recovery therefore replays
+    at most as many records as the snapshot holds, whatever the history length.
+
+    The log also keeps each record's JSON encoding in memory, which makes a
+    snapshot a consistent copy of the state without calling back into the stores.
+    """
+
+    def __init__(self, directory: str, snapshot_every: int = 10000, fsync: bool = True):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.seq = 0
+        self.snapshot_seq = 0
+        # Highest seq known to be on disk, advanced by sync()
+        self.durable_seq = 0
+        self._state: Dict[str, Dict[str, str]] = {}
+        self._segment: Optional[BinaryIO] = None
+        self._since_snapshot = 0
+        self._lock = threading.Lock()
+        # One fsync at a time: writers wait on this condition until a sync covers their records
+        self._synced = threading.Condition()
+        self._syncing = False
+        self.stats = {"appends": 0, "fsyncs": 0}
+        self._snapshot_thread: Optional[threading.Thread] = None
+        # Per-thread batch depth and records: a batch() is appended as one record at its end
+        self._local = threading.local()
+        self.recovery = {"snapshot_records": 0, "replayed_records": 0, "truncated_bytes": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    # ============================================
+    # RECOVERY
+    # ============================================
+
+    def recover(self) -> Optional[State]:
+        """
+        Load the latest snapshot and replay the log segments written after it
+
+        Returns:
+            The recovered state, or None when nothing was ever persisted
+        """
+        with self._lock:
+            found = self._load_snapshot()
+            segments = self._segments()
+            for i, path in enumerate(segments):
+                found = self._replay_segment(path, last=i == len(segments) - 1) or found
+            self._open_segment(self.seq + 1 if not segments else None, segments)
+            self.durable_seq = self.seq
+            if not found:
+                return None
+            return {
+                collection: {key: json.loads(value) for key, value in records.items()}
+                for collection, records in self._state.items()
+            }
+
+    def _load_snapshot(self) -> bool:
+        path = os.path.join(self.directory, SNAPSHOT_NAME)
+        if not os.path.exists(path):
+            return False
+        expected = None
+        with open(path, 'rb') as f:
+            for seq, op, payload, _ in read_records(f):
+                if op == OP_SNAPSHOT:
+                    header = json.loads(payload)
+                    self.seq = self.snapshot_seq = header["seq"]
+                    expected = header["records"]
+                elif op == OP_PUT:
+                    self._apply_put(payload)
+                    self.recovery["snapshot_records"] += 1
+        if expected is None or expected != self.recovery["snapshot_records"]:
+            # A snapshot is renamed into place only once complete: a short one means a damaged disk
+            raise CorruptLogError(f"Snapshot {path} is damaged")
+        return True
+
+    def _replay_segment(self, path: str, last: bool) -> bool:
+        replayed = False
+        with open(path, 'r+b') as f:
+            good_offset = 0
+            for seq, op, payload, offset in read_records(f):
+                good_offset = offset
+                replayed = True
+                if seq <= self.seq:
+                    # Already covered by the snapshot
+                    continue
+                if op == OP_BATCH:
+                    for _, inner_op, inner_payload, _ in read_records(io.BytesIO(payload)):
+                        self._apply(inner_op, inner_payload)
+                        self.recovery["replayed_records"] += 1
+                else:
+                    self._apply(op, payload)
+                    self.recovery["replayed_records"] += 1
+                self.seq = seq
+            size = f.seek(0, os.SEEK_END)
+            if size > good_offset:
+                if not last:
+                    raise CorruptLogError(f"Log segment {path} is damaged at offset {good_offset}")
+                # A crash during an append leaves a torn record at the end of the last segment
+                logger.warning(f"Truncating {size - good_offset} bytes of incomplete log records in {path}")
+                self.recovery["truncated_bytes"] += size - good_offset
+                f.truncate(good_offset)
+        self._since_snapshot = self.seq - self.snapshot_seq
+        return replayed
+
+    @property
+    def _records(self) -> int:
+        return sum(len(records) for records in self._state.values())
+
+    def _apply(self, op: int, payload: bytes):
+        if op == OP_PUT:
+            self._apply_put(payload)
+        elif op == OP_DELETE:
+            collection, key = json.loads(payload)
+            self._state.get(collection, {}).pop(key, None)
+
+    def _apply_put(self, payload: bytes):
+        collection, key, record = json.loads(payload)
+        self._state.setdefault(collection, {})[key] = json.dumps(record, separators=(',', ':'))
+
+    # ============================================
+    # WRITING
+    # ============================================
+
+    def put(self, collection: str, key: str, record: Dict, sync: bool = True):
+        """Persist the new value of a record (sync=False: append only, the caller calls sync())"""
+        value = json.dumps(record, separators=(',', ':'), default=str)
+        payload = f'[{json.dumps(collection)},{json.dumps(key)},{value}]'.encode('utf-8')
+        self._write([(OP_PUT, payload, collection, key, value)], sync)
+
+    def delete(self, collection: str, key: str, sync: bool = True):
+        """Persist the removal of a record (sync=False: append only, the caller calls sync())"""
+        payload = json.dumps([collection, key]).encode('utf-8')
+        self._write([(OP_DELETE, payload, collection, key, None)], sync)
+
+    def put_all(self, state: State):
+        """Persist a whole state (first start: the seed data)"""
+        for collection, records in state.items():
+            for key, record in records.items():
+                self.put(collection, key, record)
+
+    @contextmanager
+    def batch(self):
+        """
+        Group this thread's puts and deletes into one atomic log record
+
+        The records are appended and synced when the outermost batch ends: a
+        crash replays all of them or none. Until then they are not in the log,
+        so callers keep the records they change locked (e.g. by the item locks)
+        until the block ends.
+        """
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self._local.records = []
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                records, self._local.records = self._local.records, None
+                if records:
+                    self._write(records, sync=True)
+
+    def sync(self, seq: Optional[int] = None):
+        """
+        Wait until the log is durable up to `seq` (default: everything appended so far)
+
+        When no sync is running, the caller flushes and fsyncs every record
+        appended until then; the writers that append meanwhile wait for it, and
+        the next one to wake up syncs all of their records at once. No-op inside
+        a batch, whose records are not appended yet.
+        """
+        if getattr(self._local, "depth", 0):
+            return
+        seq = self.seq if seq is None else seq
+        with self._synced:
+            while self._syncing and self.durable_seq < seq:
+                self._synced.wait()
+            if self.durable_seq >= seq:
+                return
+            self._syncing = True
+        target = None
+        try:
+            with self._lock:
+                self._segment.flush()
+                # Records of earlier segments were synced when their segment was closed
+                fd = os.dup(self._segment.fileno()) if self.fsync else None
+                seq_flushed = self.seq
+            if fd is not None:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self.stats["fsyncs"] += 1
+            target = seq_flushed
+        finally:
+            with self._synced:
+                self._syncing = False
+                if target is not None:
+                    self.durable_seq = target
+                self._synced.notify_all()
+
+    def _write(self, entries: List[Tuple[int, bytes, str, str, Optional[str]]], sync: bool):
+        """Apply (op, payload, collection, key, value) entries to the state and append them as one record"""
+        if getattr(self._local, "depth", 0):
+            self._local.records.extend(entries)
+            return
+        with self._lock:
+            for op, _, collection, key, value in entries:
+                if op == OP_PUT:
+                    self._state.setdefault(collection, {})[key] = value
+                else:
+                    self._state.get(collection, {}).pop(key, None)
+            if len(entries) == 1:
+                self._append(entries[0][0], entries[0][1], 1)
+            else:
+                payload = b"".join(encode_record(0, op, payload) for op, payload, _, _, _ in entries)
+                self._append(OP_BATCH, payload, len(entries))
+            seq = self.seq
+        if sync:
+            self.sync(seq)
+
+    def _append(self, op: int, payload: bytes, records: int):
+        self.seq += 1
+        self._segment.write(encode_record(self.seq, op, payload))
+        self.stats["appends"] += 1
+        self._since_snapshot += records
+        if self._since_snapshot >= max(self.snapshot_every, self._records) and self._snapshot_thread is None:
+            self._start_snapshot()
+
+    # ============================================
+    # SNAPSHOTS
+    # ============================================
+
+    def snapshot(self):
+        """Write a snapshot now and wait for it"""
+        with self._lock:
+            if self._snapshot_thread is None:
+                self._start_snapshot()
+            thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+
+    def _start_snapshot(self):
+        # Called under the lock: copy the state and switch segments, the thread writes the file
+        seq = self.seq
+        state = {collection: dict(records) for collection, records in self._state.items()}
+        self._open_segment(seq + 1, self._segments())
+        self._since_snapshot = 0
+        self._snapshot_thread = threading.Thread(
+            target=self._write_snapshot, args=(seq, state), name="marketplace-snapshot", daemon=True
+        )
+        self._snapshot_thread.start()
+
+    def _write_snapshot(self, seq: int, state: Dict[str, Dict[str, str]]):
+        path = os.path.join(self.directory, SNAPSHOT_NAME)
+        tmp_path = path + ".tmp"
+        try:
+            count = sum(len(records) for records in state.values())
+            with open(tmp_path, 'wb') as f:
+                f.write(encode_record(seq, OP_SNAPSHOT, json.dumps({"seq": seq, "records": count}).encode('utf-8')))
+                for collection, records in state.items():
+                    prefix = f'[{json.dumps(collection)},'
+                    for key, value in records.items():
+                        f.write(encode_record(seq, OP_PUT, f'{prefix}{json.dumps(key)},{value}]'.encode('utf-8')))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            self._fsync_directory()
+
+            # Segments that only hold records up to seq are now redundant
+            for segment in self._segments():
+                if _segment_start(segment) <= seq:
+                    os.remove(segment)
+            self.snapshot_seq = seq
+            logger.info(f"Marketplace snapshot written at seq {seq} ({count} records)")
+        except OSError as e:
+            logger.error(f"Error writing marketplace snapshot: {e}")
+        finally:
+            with self._lock:
+                self._snapshot_thread = None
+
+    # ============================================
+    # SEGMENTS
+    # ============================================
+
+    def _segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)), key=_segment_start)
+
+    def _open_segment(self, first_seq: Optional[int], segments: List[str]):
+        """Open a new segment starting at first_seq, or reopen the last one for appending"""
+        if self._segment is not None:
+            # sync() only fsyncs the current segment: the records left in this one are synced here
+            self._segment.flush()
+            if self.fsync:
+                os.fsync(self._segment.fileno())
+            self._segment.close()
+        if first_seq is None:
+            path = segments[-1]
+        else:
+            path = os.path.join(self.directory, f"wal-{first_seq:020d}.log")
+        self._segment = open(path, 'ab')
+        self._fsync_directory()
+
+    def _fsync_directory(self):
+        # Makes file creations and renames durable (not supported on every platform)
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def close(self):
+        with self._lock:
+            thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+        self.sync()
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+
+    def status(self) -> Dict:
+        return {
+            "directory": self.directory,
+            "seq": self.seq,
+            "durable_seq": self.durable_seq,
+            "snapshot_seq": self.snapshot_seq,
+            "records_since_snapshot": self._since_snapshot,
+            "segments": len(self._segments()),
+            "recovery": self.recovery,
+            **self.stats
+        }
+
+
+def _segment_start(path: str) -> int:
+    return int(os.path.basename(path)[4:-4])
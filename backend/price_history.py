@@ -0,0 +1,299 @@
+"""Columnar time-series store for scraped product prices"""
+import os
+import csv
+import io
+import bisect
+import statistics
+import threading
+import logging
+from array import array
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SUFFIX = "_catalog.csv"
+
+
+class PriceSeries:
+    """Observed prices for one product, kept as two parallel arrays sorted by time"""
+
+    __slots__ = ("timestamps", "prices")
+
+    def __init__(self):
+        self.timestamps = array('d')
+        self.prices = array('d')
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(self, timestamp: float, price: float):
+        """Add an observation, keeping the arrays ordered by timestamp"""
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.prices.append(price)
+            return
+        index = bisect.bisect_right(self.timestamps, timestamp)
+        self.timestamps.insert(index, timestamp)
+        self.prices.insert(index, price)
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[int, int]:
+        """Return the [lo, hi) index range of observations inside the time window"""
+        lo = 0 if start is None else bisect.bisect_left(self.timestamps, start)
+        hi = len(self.timestamps) if end is None else bisect.bisect_right(self.timestamps, end)
+        return lo, hi
+
+    def copy(self, start: Optional[float] = None, end: Optional[float] = None) -> "PriceSeries":
+        """Copy of the observations inside the time window"""
+        lo, hi = self.window(start, end)
+        copy = PriceSeries()
+        copy.timestamps = self.timestamps[lo:hi]
+        copy.prices = self.prices[lo:hi]
+        return copy
+
+
+class PriceHistoryStore:
+    """
+    Keeps every price observed by the scrapers, per product id.
+
+    The store tails the `{vendor}_catalog.csv` files written by ScraperService:
+    each refresh only parses the bytes appended since the previous one, so the
+    full history is read once at startup and incrementally afterwards. Queries
+    copy the observations they need under the lock, since a refresh may be
+    appending to (or inserting into) the same arrays.
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._series: Dict[str, PriceSeries] = {}
+        self._vendors: Dict[str, str] = {}
+        self._offsets: Dict[str, int] = {}
+        self._headers: Dict[str, List[str]] = {}
+        self._drops: Dict[str, float] = {}
+        self._drops_sorted: Optional[List[Tuple[float, str]]] = None
+        self._observations = 0
+        self._lock = threading.Lock()
+
+    # ----------------------------------------
+    # Ingestion
+    # ----------------------------------------
+
+    def refresh(self) -> int:
+        """
+        Ingest rows appended to the vendor catalog files since the last refresh
+
+        Returns:
+            Number of new observations
+        """
+        if not os.path.isdir(self.data_dir):
+            return 0
+
+        added = 0
+        with self._lock:
+            for entry in os.scandir(self.data_dir):
+                if (entry.is_file() and entry.name.endswith(CATALOG_SUFFIX)
+                        and entry.name != "equipment_catalog.csv"):
+                    added += self._ingest_file(entry.path, entry.stat().st_size)
+            if added:
+                self._drops_sorted = None
+        if added:
+            logger.info(f"Price history: ingested {added} observations ({self._observations} total)")
+        return added
+
+    def _ingest_file(self, path: str, size: int) -> int:
+        offset = self._offsets.get(path, 0)
+        if size < offset:
+            # File was rewritten rather than appended to: start over for it
+            offset = 0
+            self._headers.pop(path, None)
+        if size == offset:
+            return 0
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read(size - offset)
+
+        # Only consume complete lines; a partially written row is picked up next time
+        end = chunk.rfind(b'\n')
+        if end < 0:
+            return 0
+        chunk = chunk[:end + 1]
+        self._offsets[path] = offset + len(chunk)
+
+        text = chunk.decode('utf-8-sig' if offset == 0 else 'utf-8', errors='replace')
+        reader = csv.reader(io.StringIO(text))
+        header = self._headers.get(path)
+        if header is None:
+            header = next(reader, None)
+            if not header:
+                return 0
+            self._headers[path] = header
+
+        try:
+            id_col = header.index("id")
+            price_col = header.index("price")
+            ts_col = header.index("scraped_at")
+        except ValueError:
+            logger.warning(f"Price history: {path} has no id/price/scraped_at columns")
+            return 0
+        vendor_col = header.index("vendor") if "vendor" in header else None
+        default_vendor = os.path.basename(path)[:-len(CATALOG_SUFFIX)]
+        width = max(id_col, price_col, ts_col) + 1
+
+        added = 0
+        for row in reader:
+            if len(row) < width:
+                continue
+            product_id = row[id_col]
+            try:
+                price = float(row[price_col])
+                timestamp = datetime.fromisoformat(row[ts_col]).timestamp()
+            except ValueError:
+                continue
+            if not product_id or price <= 0:
+                continue
+            vendor = row[vendor_col] if vendor_col is not None and len(row) > vendor_col else ""
+            self._record(product_id, timestamp, price, vendor or default_vendor)
+            added += 1
+        return added
+
+    def _record(self, product_id: str, timestamp: float, price: float, vendor: str):
+        series = self._series.get(product_id)
+        if series is None:
+            series = self._series[product_id] = PriceSeries()
+            self._vendors[product_id] = vendor
+        series.append(timestamp, price)
+        self._observations += 1
+
+        if len(series) >= 2:
+            previous, last = series.prices[-2], series.prices[-1]
+            self._drops[product_id] = (previous - last) / previous * 100 if previous > 0 else 0.0
+
+    # ----------------------------------------
+    # Queries
+    # ----------------------------------------
+
+    def get_history(self, product_id: str, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None, max_points: int = 500) -> Optional[Dict]:
+        """
+        Get the price history of a product
+
+        Long ranges are downsampled to at most `max_points` points by keeping the
+        lowest and highest observation of each time bucket, so price spikes and
+        drops survive the downsampling.
+        """
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2 (the lowest and highest price of a bucket)")
+        with self._lock:
+            series = self._series.get(product_id)
+            if series is None:
+                return None
+            series = series.copy(_ts(start), _ts(end))
+            vendor = self._vendors.get(product_id, "")
+
+        count = len(series)
+        if count <= max_points:
+            indexes = range(count)
+            downsampled = False
+        else:
+            indexes = _min_max_buckets(series, 0, count, max_points // 2)
+            downsampled = True
+
+        return {
+            "id": product_id,
+            "vendor": vendor,
+            "observations": count,
+            "downsampled": downsampled,
+            "points": [
+                {
+                    "timestamp": datetime.fromtimestamp(series.timestamps[i]).isoformat(),
+                    "price": series.prices[i]
+                }
+                for i in indexes
+            ]
+        }
+
+    def get_stats(self, product_id: str, start: Optional[datetime] = None,
+                  end: Optional[datetime] = None) -> Optional[Dict]:
+        """Get min / max / median price of a product over a time window"""
+        with self._lock:
+            series = self._series.get(product_id)
+            if series is None:
+                return None
+            prices = series.copy(_ts(start), _ts(end)).prices
+        if not prices:
+            return {"id": product_id, "observations": 0, "min": None, "max": None, "median": None,
+                    "first": None, "last": None}
+
+        return {
+            "id": product_id,
+            "observations": len(prices),
+            "min": min(prices),
+            "max": max(prices),
+            "median": statistics.median(prices),
+            "first": prices[0],
+            "last": prices[-1]
+        }
+
+    def get_price_drops(self, min_drop_percent: float, vendor: Optional[str] = None,
+                        limit: int = 100) -> List[Dict]:
+        """Get products whose price dropped more than `min_drop_percent` since the previous scrape"""
+        with self._lock:
+            if self._drops_sorted is None:
+                self._drops_sorted = sorted((-drop, pid) for pid, drop in self._drops.items())
+
+            # Sorted by descending drop: everything before the cut-off qualifies
+            cutoff = bisect.bisect_left(self._drops_sorted, (-min_drop_percent, ""))
+            results = []
+            for neg_drop, product_id in self._drops_sorted[:cutoff]:
+                if vendor and self._vendors.get(product_id, "").lower() != vendor.lower():
+                    continue
+                series = self._series[product_id]
+                results.append({
+                    "id": product_id,
+                    "vendor": self._vendors.get(product_id, ""),
+                    "previous_price": series.prices[-2],
+                    "price": series.prices[-1],
+                    "drop_percent": round(-neg_drop, 2),
+                    "scraped_at": datetime.fromtimestamp(series.timestamps[-1]).isoformat()
+                })
+                if len(results) >= limit:
+                    break
+        return results
+
+    def get_summary(self) -> Dict:
+        """Get size information about the store"""
+        with self._lock:
+            return {
+                "products": len(self._series),
+                "observations": self._observations,
+                "files": len(self._offsets)
+            }
+
+
+def _ts(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+
+def _min_max_buckets(series: PriceSeries, lo: int, hi: int, buckets: int) -> List[int]:
+    """Pick the indexes of the min and max price of each of `buckets` equal-duration buckets"""
+    indexes = []
+    prices = series.prices
+    timestamps = series.timestamps
+    first, last = timestamps[lo], timestamps[hi - 1]
+    width = (last - first) / buckets
+    start = lo
+    for b in range(buckets):
+        # Buckets split the time range, not the observations: irregular scrapes keep their place on the axis
+        stop = hi if b == buckets - 1 or width <= 0 else bisect.bisect_left(timestamps, first + (b + 1) * width, start, hi)
+        if start >= stop:
+            continue
+        low = high = start
+        for i in range(start + 1, stop):
+            if prices[i] < prices[low]:
+                low = i
+            elif prices[i] > prices[high]:
+                high = i
+        indexes.extend(sorted({low, high}))
+        start = stop
+    return indexes
@@ -0,0 +1,222 @@
+"""Entity matching between scraped products and the equipment catalog"""
+import re
+import math
+import unicodedata
+from typing import List, Dict, Optional, Iterable, Tuple
+
+# Confidence thresholds driving the action suggested to the admin
+LINK_CONFIDENCE = 0.9
+REVIEW_CONFIDENCE = 0.6
+
+# Words that say nothing about which product it is
+STOPWORDS = {
+    "ordinateur", "portable", "laptop", "notebook", "pc", "de", "du", "des", "le", "la", "les",
+    "et", "ou", "en", "avec", "pour", "the", "with", "and", "or", "inch", "pouces", "pouce"
+}
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_MODEL_CHARS = re.compile(r'[^A-Z0-9]+')
+_SCREEN_SIZE = re.compile(r'(\d{1,2}(?:[.,]\d)?)\s*(?:"|”|\'\'|pouces|inch|in\b)', re.IGNORECASE)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and strip accents"""
+    text = unicodedata.normalize('NFKD', text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def normalize_model(model: str) -> str:
+    """Normalize a model code: 'PC16-250 ' and 'pc16250' both become 'PC16250'"""
+    return _MODEL_CHARS.sub('', normalize_text(model).upper())
+
+
+def name_tokens(name: str) -> List[str]:
+    return [t for t in _NON_ALNUM.split(normalize_text(name)) if t and t not in STOPWORDS]
+
+
+def screen_size(*texts: str) -> Optional[float]:
+    """Screen size in inches, read from the first text that mentions one"""
+    for text in texts:
+        if not text:
+            continue
+        match = _SCREEN_SIZE.search(text)
+        if match:
+            return float(match.group(1).replace(',', '.'))
+    return None
+
+
+class ProductRecord:
+    """Normalized view of a catalog item or scraped product used for matching"""
+
+    __slots__ = ("id", "source", "brand", "model_key", "tokens", "screen", "raw")
+
+    def __init__(self, raw: Dict, source: str):
+        self.raw = raw
+        self.id = raw["id"]
+        self.source = source
+        self.brand = normalize_text(raw.get("brand") or raw.get("vendor") or "")
+        self.model_key = normalize_model(raw.get("model", ""))
+        self.tokens = set(name_tokens(raw.get("name", "")))
+        # The model code is a strong token too ("PC16250" appears in some names)
+        if self.model_key:
+            self.tokens.add(self.model_key.lower())
+        self.screen = screen_size(raw.get("screen_size", ""), raw.get("name", ""))
+
+
+class ProductMatcher:
+    """
+    Links products to an indexed set of reference products
+
+    Candidates come from blocking indexes (exact model code, and the rarest name
+    tokens) instead of comparing every pair, so matching N products against M
+    references costs roughly O(N + M) instead of O(N × M).
+    """
+
+    def __init__(self, references: Iterable[ProductRecord], max_block_size: int = 200):
+        self.references: List[ProductRecord] = list(references)
+        self.max_block_size = max_block_size
+        self.by_model: Dict[str, List[int]] = {}
+        self.by_token: Dict[str, List[int]] = {}
+
+        for i, ref in enumerate(self.references):
+            if ref.model_key:
+                self.by_model.setdefault(ref.model_key, []).append(i)
+            for token in ref.tokens:
+                self.by_token.setdefault(token, []).append(i)
+
+        n = max(len(self.references), 1)
+        self.idf = {token: math.log(1 + n / len(ids)) for token, ids in self.by_token.items()}
+
+    def candidates(self, record: ProductRecord, max_tokens: int = 3) -> List[int]:
+        found = set(self.by_model.get(record.model_key, [])) if record.model_key else set()
+
+        # Block on the rarest tokens only: frequent ones ("dell", "latitude") make huge blocks
+        blocks = [self.by_token[t] for t in record.tokens if t in self.by_token]
+        blocks = [b for b in blocks if len(b) <= self.max_block_size]
+        blocks.sort(key=len)
+        for block in blocks[:max_tokens]:
+            found.update(block)
+        return list(found)
+
+    def score(self, record: ProductRecord, ref: ProductRecord) -> Tuple[float, List[str]]:
+        """Confidence (0-1) that two records are the same product, with the reasons"""
+        reasons = []
+        confidence = 0.0
+
+        if record.model_key and record.model_key == ref.model_key:
+            confidence = 0.95
+            reasons.append("same model code")
+        elif (record.model_key and ref.model_key and min(len(record.model_key), len(ref.model_key)) >= 4
+              and (record.model_key in ref.model_key or ref.model_key in record.model_key)):
+            confidence = 0.8
+            reasons.append("model code variant")
+
+        similarity = self._weighted_jaccard(record.tokens, ref.tokens)
+        if similarity > confidence:
+            confidence = similarity
+            reasons.append(f"name similarity {similarity:.2f}")
+
+        if record.screen is not None and ref.screen is not None:
+            if abs(record.screen - ref.screen) < 0.15:
+                confidence = min(1.0, confidence + 0.05)
+                reasons.append("same screen size")
+            else:
+                confidence *= 0.6
+                reasons.append("different screen size")
+
+        if record.brand and ref.brand and record.brand != ref.brand:
+            confidence *= 0.5
+            reasons.append("different brand")
+
+        return round(confidence, 3), reasons
+
+    def best_match(self, record: ProductRecord, exclude_id: Optional[str] = None) -> Optional[Dict]:
+        best = None
+        for i in self.candidates(record):
+            ref = self.references[i]
+            if ref.id == exclude_id:
+                continue
+            confidence, reasons = self.score(record, ref)
+            if best is None or confidence > best["confidence"]:
+                best = {"id": ref.id, "source": ref.source, "confidence": confidence, "reasons": reasons}
+        return best
+
+    def _weighted_jaccard(self, a: set, b: set) -> float:
+        if not a or not b:
+            return 0.0
+        default_idf = math.log(1 + len(self.references))
+        inter = sum(self.idf.get(t, default_idf) for t in a & b)
+        union = sum(self.idf.get(t, default_idf) for t in a | b)
+        return inter / union if union else 0.0
+
+
+def suggested_action(confidence: float) -> str:
+    if confidence >= LINK_CONFIDENCE:
+        return "link"
+    if confidence >= REVIEW_CONFIDENCE:
+        return "review"
+    return "add"
+
+
+def match_scraped_products(scraped: List[Dict], catalog: List[Dict],
+                           min_confidence: float = 0.0) -> Dict:
+    """
+    Match scraped products against the equipment catalog and against each other
+
+    Returns:
+        Dictionary with, per scraped product, its best catalog match, the
+        suggested action (link / review / add) and its cluster of equivalent
+        scraped products across vendors and scrapes.
+    """
+    scraped_records = [ProductRecord(p, "scraped") for p in scraped]
+    catalog_matcher = ProductMatcher(ProductRecord(item, "catalog") for item in catalog)
+    scraped_matcher = ProductMatcher(scraped_records)
+
+    # Union-find over scraped products that look like the same product
+    parent = {r.id: r.id for r in scraped_records}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for record in scraped_records:
+        twin = scraped_matcher.best_match(record, exclude_id=record.id)
+        if twin and twin["confidence"] >= LINK_CONFIDENCE:
+            root_a, root_b = find(record.id), find(twin["id"])
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+    clusters: Dict[str, List[str]] = {}
+    for record in scraped_records:
+        clusters.setdefault(find(record.id), []).append(record.id)
+
+    matches = []
+    summary = {"link": 0, "review": 0, "add": 0}
+    for record in scraped_records:
+        best = catalog_matcher.best_match(record)
+        confidence = best["confidence"] if best else 0.0
+        action = suggested_action(confidence)
+        summary[action] += 1
+        if confidence < min_confidence:
+            continue
+        cluster = clusters[find(record.id)]
+        matches.append({
+            "product_id": record.id,
+            "vendor": record.raw.get("vendor", ""),
+            "name": record.raw.get("name", ""),
+            "catalog_item_id": best["id"] if best else None,
+            "confidence": confidence,
+            "reasons": best["reasons"] if best else [],
+            "action": action,
+            "cluster_id": find(record.id),
+            "same_product_ids": [pid for pid in cluster if pid != record.id]
+        })
+
+    return {
+        "matches": matches,
+        "total": len(matches),
+        "summary": summary,
+        "clusters": sum(1 for ids in clusters.values() if len(ids) > 1)
+    }
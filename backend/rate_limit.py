@@ -0,0 +1,30 @@
+"""Per-host request budgets of the scrapers"""
+import time
+import threading
+
+
+class TokenBucket:
+    """
+    Request budget of one host: `rate` requests per second, in bursts of up to `burst`
+
+    reserve() takes a token and returns how long the caller must wait before
+    using it, so the waiting happens outside the lock.
+    """
+    
+    def __init__(self, rate: float, burst: float = 1.0):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # A negative balance is the queue of callers already waiting for a token
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
@@ -0,0 +1,124 @@
+"""Suggested price computation and batch repricing of marketplace listings"""
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from product_matching import normalize_model, normalize_text
+
+CONDITION_FACTORS = {
+    "excellent": 0.9,
+    "good": 0.7,
+    "fair": 0.5
+}
+DEFAULT_CONDITION_FACTOR = 0.7
+MAX_DEPRECIATION = 0.8
+DAYS_PER_MONTH = 30.44
+
+# (brand, model) key -> (new price, lifespan in months or None)
+ModelPriceIndex = Dict[Tuple[str, str], Tuple[float, Optional[int]]]
+
+
+def suggested_price(price_new: float, lifespan_months: int, age_months: int, condition: str) -> float:
+    """
+    Suggested_Price = Price_New × (1 - (Age_months / Lifespan_months)) × Condition_Factor
+    """
+    condition_factor = CONDITION_FACTORS.get(condition, DEFAULT_CONDITION_FACTOR)
+    depreciation = min(age_months / lifespan_months, MAX_DEPRECIATION)  # Max 80% depreciation
+    return round(price_new * (1 - depreciation) * condition_factor, 2)
+
+
+@lru_cache(maxsize=65536)
+def model_key(brand: str, model: str) -> Tuple[str, str]:
+    return normalize_text(brand).strip(), normalize_model(model)
+
+
+def build_model_price_index(catalog_items: Iterable[Dict], laptops: Iterable[Dict]) -> ModelPriceIndex:
+    """
+    Index model-level new prices by (brand, model)
+
+    Args:
+        catalog_items: equipment catalog items (brand, model, price_new, lifespan_new)
+        laptops: vendor catalog laptops (vendor, model, price)
+    """
+    index: ModelPriceIndex = {}
+    # Vendor prices first, so the curated equipment catalog wins on conflicts
+    for laptop in laptops:
+        if laptop.get("model") and laptop.get("price"):
+            index[model_key(laptop.get("brand") or laptop.get("vendor", ""), laptop["model"])] = (laptop["price"], None)
+    for item in catalog_items:
+        if item.get("model") and item.get("price_new"):
+            index[model_key(item.get("brand", ""), item["model"])] = (item["price_new"], item.get("lifespan_new"))
+    return index
+
+
+def whole_months_since(timestamp: str, now: datetime) -> Tuple[int, Optional[str]]:
+    """
+    Whole months elapsed since a timestamp, and the timestamp moved forward by
+    that many months (the remainder keeps counting toward the next month)
+    """
+    try:
+        then = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return 0, None
+    months = max(int((now - then).days / DAYS_PER_MONTH), 0)
+    return months, (then + timedelta(days=months * DAYS_PER_MONTH)).isoformat()
+
+
+def reprice_listings(items: Iterable[Dict], type_defaults: Dict[str, Dict], model_prices: ModelPriceIndex,
+                     now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Age every listing and recompute its suggested price, in one pass
+
+    A listing's age is counted from `age_updated_at` (the last time its age was
+    set or repriced), falling back to `created_at`. The new price comes from the
+    model-level price when the (brand, model) is known, else from the type defaults.
+
+    Returns:
+        One change per listing whose age or suggested price changed, with the
+        fields to update under "changes"
+    """
+    now = now or datetime.now()
+    # Listings created together share their reference timestamp
+    age_cache: Dict[str, Tuple[int, Optional[str]]] = {}
+    results = []
+
+    for item in items:
+        reference = item.get("age_updated_at") or item.get("created_at", "")
+        aged = age_cache.get(reference)
+        if aged is None:
+            aged = age_cache[reference] = whole_months_since(reference, now)
+        elapsed, new_reference = aged
+        age = item["age_months"] + elapsed
+
+        model_price = model_prices.get(model_key(item.get("brand", ""), item.get("model", "")))
+        defaults = type_defaults.get(item["type"])
+        if model_price is not None:
+            price_new, lifespan = model_price
+            lifespan = lifespan or (defaults["lifespan_new"] if defaults else None)
+            source = "model"
+        elif defaults is not None:
+            price_new, lifespan = defaults["price_new"], defaults["lifespan_new"]
+            source = "type"
+        else:
+            continue
+        if not lifespan:
+            continue
+
+        price = suggested_price(price_new, lifespan, age, item["condition"])
+        if price == item["price_suggested"] and age == item["age_months"]:
+            continue
+
+        changes = {"price_suggested": price}
+        if elapsed:
+            changes["age_months"] = age
+            changes["age_updated_at"] = new_reference
+        results.append({
+            "id": item["id"],
+            "price_before": item["price_suggested"],
+            "price_after": price,
+            "age_before": item["age_months"],
+            "age_after": age,
+            "price_source": source,
+            "changes": changes
+        })
+    return results
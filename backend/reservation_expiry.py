@@ -0,0 +1,75 @@
+"""Deadlines of pending reservations, kept in a min-heap"""
+import heapq
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+class ExpiryHeap:
+    """
+    Pending reservations ordered by expiry deadline
+
+    A reservation store listener schedules every pending reservation and
+    forgets it once it is decided, cancelled or expired. Forgotten entries stay
+    in the heap and are skipped when they surface, so every change is
+    O(log n) and a tick only pops the reservations that are due.
+    """
+
+    def __init__(self, ttl: timedelta):
+        self.ttl = ttl
+        self._heap: List[Tuple[float, str]] = []
+        # Current deadline of every scheduled reservation: heap entries that differ are stale
+        self._deadlines: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def deadline(self, reservation: Dict) -> Optional[datetime]:
+        """Expiry of a reservation: its expires_at, or its creation plus the TTL"""
+        try:
+            if reservation.get("expires_at"):
+                return datetime.fromisoformat(reservation["expires_at"])
+            return datetime.fromisoformat(reservation["created_at"]) + self.ttl
+        except (TypeError, ValueError):
+            return None
+
+    def on_reservation_change(self, event: str, reservation: Dict, previous: Optional[Dict]):
+        """Reservation store listener"""
+        if event != "remove" and reservation["status"] == "pending":
+            deadline = self.deadline(reservation)
+            if deadline is not None:
+                self.schedule(reservation["id"], deadline.timestamp())
+                return
+        self.forget(reservation["id"])
+
+    def schedule(self, reservation_id: str, deadline: float):
+        with self._lock:
+            if self._deadlines.get(reservation_id) == deadline:
+                return
+            self._deadlines[reservation_id] = deadline
+            heapq.heappush(self._heap, (deadline, reservation_id))
+
+    def forget(self, reservation_id: str):
+        with self._lock:
+            if self._deadlines.pop(reservation_id, None) is not None and len(self._heap) > 2 * len(self._deadlines) + 1024:
+                # Mostly stale entries: rebuild from the live deadlines
+                self._heap = [(deadline, rid) for rid, deadline in self._deadlines.items()]
+                heapq.heapify(self._heap)
+
+    def pop_due(self, now: float) -> List[str]:
+        """Remove and return the reservations whose deadline has passed"""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, reservation_id = heapq.heappop(self._heap)
+                if self._deadlines.get(reservation_id) == deadline:
+                    del self._deadlines[reservation_id]
+                    due.append(reservation_id)
+            return due
+
+    def next_deadline(self) -> Optional[float]:
+        with self._lock:
+            while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
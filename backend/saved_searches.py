@@ -0,0 +1,182 @@
+"""Saved marketplace searches, matched against new listings with a reverse index"""
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+# Wildcard of the (type, condition) buckets, for searches without that filter
+ANY = "*"
+MAX_NOTIFICATIONS_PER_USER = 200
+# Items remembered per search to avoid notifying them twice (the oldest are forgotten)
+MAX_SENT_PER_SEARCH = 10000
+
+
+class IntervalTree:
+    """
+    Static centered interval tree answering "which intervals contain x"
+
+    A stabbing query visits one node per level and only reads the intervals it
+    returns (plus one per visited node), so it costs O(log n + matches).
+    """
+
+    __slots__ = ("center", "left", "right", "by_low", "by_high")
+
+    def __init__(self, intervals: List[Tuple[float, float, str]]):
+        lows = sorted(low for low, _, _ in intervals)
+        self.center = lows[len(lows) // 2]
+        here, left, right = [], [], []
+        for interval in intervals:
+            if interval[1] < self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.by_low = sorted(here, key=lambda i: i[0])
+        self.by_high = sorted(here, key=lambda i: i[1], reverse=True)
+        self.left = IntervalTree(left) if left else None
+        self.right = IntervalTree(right) if right else None
+
+    def stab(self, x: float) -> List[str]:
+        found = []
+        node = self
+        while node is not None:
+            if x < node.center:
+                for low, _, key in node.by_low:
+                    if low > x:
+                        break
+                    found.append(key)
+                node = node.left
+            else:
+                for _, high, key in node.by_high:
+                    if high < x:
+                        break
+                    found.append(key)
+                node = node.right if x > node.center else None
+        return found
+
+
+class SavedSearchIndex:
+    """
+    Percolator: saved searches indexed so that a listing finds its searches
+
+    Searches are bucketed by (type or *, condition or *), and each bucket holds
+    an interval tree over the searches' price ranges. A listing looks up its 4
+    buckets and stabs each tree with its price, instead of running every saved
+    search. Trees are rebuilt lazily after searches are added or removed.
+    """
+
+    def __init__(self, searches: Iterable[Dict] = ()):
+        self._lock = threading.Lock()
+        self.searches: Dict[str, Dict] = {}
+        self._buckets: Dict[Tuple[str, str], Dict[str, Tuple[float, float, str]]] = {}
+        self._trees: Dict[Tuple[str, str], Optional[IntervalTree]] = {}
+        for search in searches:
+            self.add(search)
+
+    def add(self, search: Dict) -> Dict:
+        with self._lock:
+            self.searches[search["id"]] = search
+            bucket = _bucket_key(search)
+            low = search["min_price"] if search.get("min_price") is not None else float("-inf")
+            high = search["max_price"] if search.get("max_price") is not None else float("inf")
+            self._buckets.setdefault(bucket, {})[search["id"]] = (low, high, search["id"])
+            self._trees.pop(bucket, None)
+            return search
+
+    def remove(self, search_id: str) -> Optional[Dict]:
+        with self._lock:
+            search = self.searches.pop(search_id, None)
+            if search is not None:
+                bucket = _bucket_key(search)
+                self._buckets[bucket].pop(search_id, None)
+                if not self._buckets[bucket]:
+                    del self._buckets[bucket]
+                self._trees.pop(bucket, None)
+            return search
+
+    def for_user(self, user_email: str) -> List[Dict]:
+        return [s for s in self.searches.values() if s["user_email"] == user_email]
+
+    def match(self, equipment_type: str, condition: str, price: float) -> List[Dict]:
+        """Saved searches matching a listing"""
+        with self._lock:
+            found = []
+            for bucket in ((equipment_type, condition), (equipment_type, ANY), (ANY, condition), (ANY, ANY)):
+                tree = self._tree(bucket)
+                if tree is not None:
+                    found.extend(self.searches[search_id] for search_id in tree.stab(price))
+            return found
+
+    def _tree(self, bucket: Tuple[str, str]) -> Optional[IntervalTree]:
+        if bucket in self._trees:
+            return self._trees[bucket]
+        intervals = self._buckets.get(bucket)
+        tree = IntervalTree(list(intervals.values())) if intervals else None
+        self._trees[bucket] = tree
+        return tree
+
+
+class NotificationQueue:
+    """Per-user queues of saved-search matches (the oldest are dropped past a maximum)"""
+
+    def __init__(self, max_per_user: int = MAX_NOTIFICATIONS_PER_USER, max_sent_per_search: int = MAX_SENT_PER_SEARCH):
+        self.max_per_user = max_per_user
+        self.max_sent_per_search = max_sent_per_search
+        self._queues: Dict[str, Deque[Dict]] = {}
+        # Item ids already notified per search, oldest first, so a repriced listing is not notified twice
+        self._sent: Dict[str, "OrderedDict[str, None]"] = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def push(self, search: Dict, item: Dict, price: float) -> Optional[Dict]:
+        with self._lock:
+            sent = self._sent.setdefault(search["id"], OrderedDict())
+            if item["id"] in sent:
+                return None
+            sent[item["id"]] = None
+            if len(sent) > self.max_sent_per_search:
+                sent.popitem(last=False)
+            self._next_id += 1
+            notification = {
+                "id": self._next_id,
+                "search_id": search["id"],
+                "search_label": search.get("label"),
+                "item_id": item["id"],
+                "item": {
+                    "type": item["type"],
+                    "brand": item["brand"],
+                    "model": item["model"],
+                    "condition": item["condition"],
+                    "price": price
+                },
+                "created_at": datetime.now().isoformat(),
+                "read": False
+            }
+            queue = self._queues.setdefault(search["user_email"], deque(maxlen=self.max_per_user))
+            queue.append(notification)
+            return notification
+
+    def forget_search(self, search_id: str):
+        with self._lock:
+            self._sent.pop(search_id, None)
+
+    def list(self, user_email: str, unread_only: bool = False) -> List[Dict]:
+        with self._lock:
+            notifications = list(self._queues.get(user_email, ()))
+        if unread_only:
+            notifications = [n for n in notifications if not n["read"]]
+        return list(reversed(notifications))
+
+    def mark_read(self, user_email: str) -> int:
+        with self._lock:
+            count = 0
+            for notification in self._queues.get(user_email, ()):
+                if not notification["read"]:
+                    notification["read"] = True
+                    count += 1
+            return count
+
+
+def _bucket_key(search: Dict) -> Tuple[str, str]:
+    return search.get("type") or ANY, search.get("condition") or ANY
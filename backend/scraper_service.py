@@ -4,8 +4,6 @@ import csv
 import logging
 from typing import List, Dict, Optional
 from datetime import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
 from scrapers import DellScraper, HPScraper
 
 logger = logging.getLogger(__name__)
@@ -14,15 +12,32 @@ logger = logging.getLogger(__name__)
 class ScraperService:
     """Service to manage automatic product scraping"""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", catalog_writer=None):
         self.data_dir = data_dir
-        self.scheduler = BackgroundScheduler()
-        self.scrapers = {
-            "dell": DellScraper(),
-            "hp": HPScraper()
+        # Shared CatalogWriter, so scraper appends never interleave with API writes
+        self.catalog_writer = catalog_writer
+        # Created by start_scheduler(), APScheduler is only imported when scheduling is used
+        self.scheduler = None
+        self.scraper_classes = {
+            "dell": DellScraper,
+            "hp": HPScraper
         }
+        # Scrapers (and their HTTP sessions) are created on first scrape
+        self.scrapers = {}
         self._ensure_data_dir()
     
+    @property
+    def vendors(self) -> List[str]:
+        """Names of the supported vendors"""
+        return list(self.scraper_classes.keys())
+    
+    def get_scraper(self, vendor: str):
+        """Get the scraper of a vendor, creating it on first use"""
+        vendor = vendor.lower()
+        if vendor not in self.scrapers:
+            self.scrapers[vendor] = self.scraper_classes[vendor]()
+        return self.scrapers[vendor]
+    
     def _ensure_data_dir(self):
         """Ensure data directory exists"""
         os.makedirs(self.data_dir, exist_ok=True)
@@ -38,14 +53,14 @@ class ScraperService:
         Returns:
             Dictionary with scraping results
         """
-        if vendor.lower() not in self.scrapers:
+        if vendor.lower() not in self.scraper_classes:
             return {
                 "success": False,
                 "error": f"Vendor {vendor} not supported",
                 "products_count": 0
             }
         
-        scraper = self.scrapers[vendor.lower()]
+        scraper = self.get_scraper(vendor)
         start_time = datetime.now()
         
         try:
@@ -94,7 +109,7 @@ class ScraperService:
         """
         results = {}
         
-        for vendor in self.scrapers.keys():
+        for vendor in self.vendors:
             logger.info(f"Scraping {vendor}...")
             results[vendor] = self.scrape_vendor(vendor, product_type)
         
@@ -119,65 +134,49 @@ class ScraperService:
             "price", "link", "features", "vendor", "scraped_at"
         ]
         
-        # Add all products to main catalog (append mode)
-        file_exists = os.path.exists(main_csv_path)
+        rows = [self._csv_row(vendor, product) for product in products]
         
-        with open(main_csv_path, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            
-            if not file_exists:
-                writer.writeheader()
-            
-            for product in products:
-                # Clean Dell URLs
-                link = product.get("link", "")
-                if vendor.lower() == "dell" and link and 'https://www.dell.com//www.dell.com/' in link:
-                    link = link.replace('https://www.dell.com//www.dell.com/', 'https://www.dell.com/', 1)
-                
-                row = {
-                    "id": product.get("id", ""),
-                    "name": product.get("name", ""),
-                    "model": product.get("model", ""),
-                    "screen_size": product.get("screen_size", ""),
-                    "rating": product.get("rating") or "",
-                    "reviews_count": product.get("reviews_count") or "",
-                    "price": product.get("price", ""),
-                    "link": link,
-                    "features": product.get("features", ""),
-                    "vendor": product.get("vendor", vendor),
-                    "scraped_at": datetime.now().isoformat()
-                }
-                writer.writerow(row)
+        # Add all products to main catalog (append mode)
+        if self.catalog_writer is not None:
+            self.catalog_writer.append(main_csv_path, fieldnames, rows).result()
+        else:
+            file_exists = os.path.exists(main_csv_path)
+            with open(main_csv_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                if not file_exists:
+                    writer.writeheader()
+                writer.writerows(rows)
         
         # Also save timestamped copy
         with open(csv_path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
-            
-            for product in products:
-                # Clean Dell URLs
-                link = product.get("link", "")
-                if vendor.lower() == "dell" and link and 'https://www.dell.com//www.dell.com/' in link:
-                    link = link.replace('https://www.dell.com//www.dell.com/', 'https://www.dell.com/', 1)
-                
-                row = {
-                    "id": product.get("id", ""),
-                    "name": product.get("name", ""),
-                    "model": product.get("model", ""),
-                    "screen_size": product.get("screen_size", ""),
-                    "rating": product.get("rating") or "",
-                    "reviews_count": product.get("reviews_count") or "",
-                    "price": product.get("price", ""),
-                    "link": link,
-                    "features": product.get("features", ""),
-                    "vendor": product.get("vendor", vendor),
-                    "scraped_at": datetime.now().isoformat()
-                }
-                writer.writerow(row)
+            writer.writerows(rows)
         
         logger.info(f"Saved {len(products)} products to {csv_path}")
         return csv_path
     
+    def _csv_row(self, vendor: str, product: Dict) -> Dict:
+        """Build the catalog CSV row of a scraped product"""
+        # Clean Dell URLs
+        link = product.get("link", "")
+        if vendor.lower() == "dell" and link and 'https://www.dell.com//www.dell.com/' in link:
+            link = link.replace('https://www.dell.com//www.dell.com/', 'https://www.dell.com/', 1)
+        
+        return {
+            "id": product.get("id", ""),
+            "name": product.get("name", ""),
+            "model": product.get("model", ""),
+            "screen_size": product.get("screen_size", ""),
+            "rating": product.get("rating") or "",
+            "reviews_count": product.get("reviews_count") or "",
+            "price": product.get("price", ""),
+            "link": link,
+            "features": product.get("features", ""),
+            "vendor": product.get("vendor", vendor),
+            "scraped_at": datetime.now().isoformat()
+        }
+    
     def start_scheduler(self, schedule_hours: int = 24):
         """
         Start automatic scraping scheduler
@@ -185,6 +184,12 @@ class ScraperService:
         Args:
             schedule_hours: How often to scrape (in hours)
         """
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.triggers.cron import CronTrigger
+        
+        if self.scheduler is None:
+            self.scheduler = BackgroundScheduler()
+        
         if self.scheduler.running:
             logger.warning("Scheduler is already running")
             return
@@ -204,12 +209,14 @@ class ScraperService:
     
     def stop_scheduler(self):
         """Stop the automatic scraping scheduler"""
-        if self.scheduler.running:
+        if self.scheduler is not None and self.scheduler.running:
             self.scheduler.shutdown()
             logger.info("Scheduler stopped")
     
     def get_scheduler_status(self) -> Dict:
         """Get scheduler status"""
+        if self.scheduler is None:
+            return {"running": False, "jobs": []}
         return {
             "running": self.scheduler.running,
             "jobs": [
@@ -1,32 +1,95 @@
 """Base scraper class for vendor websites"""
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import Callable, List, Dict, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
 import requests
 from bs4 import BeautifulSoup
+import os
+import copy
 import time
+import hashlib
+import asyncio
 import logging
+import threading
+from ingestion import parse_number
+from rate_limit import TokenBucket
+from page_cache import HTTPCache, shared_http_cache
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Pages fetched at the same time, and requests per second allowed per host
+# (the sequential scrapers waited 0.5 s after each product page)
+SCRAPER_CONCURRENCY = int(os.environ.get("SCRAPER_CONCURRENCY", "8"))
+SCRAPER_RATE_PER_HOST = float(os.environ.get("SCRAPER_RATE_PER_HOST", "2"))
+# Product details kept in memory by page body, so an unchanged product page is not parsed again
+SCRAPER_PARSED_PRODUCTS = int(os.environ.get("SCRAPER_PARSED_PRODUCTS", "2048"))
+
 
 class BaseScraper(ABC):
     """Base class for all vendor scrapers"""
     
-    def __init__(self, vendor_name: str, base_url: str):
+    def __init__(self, vendor_name: str, base_url: str, http_cache: Optional[HTTPCache] = None):
         self.vendor_name = vendor_name
         self.base_url = base_url
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        # Connections kept open for every concurrent fetch
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(SCRAPER_CONCURRENCY, 10))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.concurrency = SCRAPER_CONCURRENCY
+        self.requests_per_second = SCRAPER_RATE_PER_HOST
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        self.http_cache = http_cache if http_cache is not None else shared_http_cache()
+        self._products: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        self._products_lock = threading.Lock()
     
     def fetch_page(self, url: str, retries: int = 3, delay: float = 1.0) -> Optional[BeautifulSoup]:
-        """Fetch a page and return BeautifulSoup object"""
+        """Fetch a page and return BeautifulSoup object (a new tree on every call)"""
+        fetched = self.fetch_body(url, retries, delay)
+        return BeautifulSoup(fetched[1], 'lxml') if fetched is not None else None
+    
+    def fetch_body(self, url: str, retries: int = 3, delay: float = 1.0) -> Optional[Tuple[str, bytes]]:
+        """
+        Fetch a page and return the sha256 of its body and the body
+        
+        A cached page is revalidated with If-None-Match / If-Modified-Since: on
+        a 304 its cached body is read from disk instead of downloaded.
+        """
         for attempt in range(retries):
             try:
-                response = self.session.get(url, timeout=30)
+                self.throttle(url)
+                cached = self.http_cache.lookup(url) if self.http_cache is not None else None
+                headers = {}
+                if cached is not None:
+                    if cached.etag:
+                        headers['If-None-Match'] = cached.etag
+                    if cached.last_modified:
+                        headers['If-Modified-Since'] = cached.last_modified
+                response = self.session.get(url, timeout=30, headers=headers)
+                if response.status_code == 304 and cached is not None:
+                    self.http_cache.touch(url)
+                    content = self.http_cache.body(cached.body_hash)
+                    if content is not None:
+                        return cached.body_hash, content
+                    # Body evicted meanwhile: fetch the page again in full
+                    self.http_cache.forget(url)
+                    self.throttle(url)
+                    response = self.session.get(url, timeout=30)
                 response.raise_for_status()
-                return BeautifulSoup(response.content, 'lxml')
+                content = response.content
+                body_hash = hashlib.sha256(content).hexdigest()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if self.http_cache is not None and (etag or last_modified):
+                    self.http_cache.store(url, content, body_hash, etag, last_modified)
+                return body_hash, content
             except requests.RequestException as e:
                 logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
                 if attempt < retries - 1:
@@ -35,29 +98,80 @@ class BaseScraper(ABC):
                     logger.error(f"Failed to fetch {url} after {retries} attempts")
                     return None
     
-    def parse_price(self, price_str: str) -> Optional[float]:
-        """Parse price string to float"""
-        if not price_str:
+    def fetch_product(self, url: str, extract: Callable[[BeautifulSoup, str], Optional[Dict]]) -> Optional[Dict]:
+        """
+        Fetch a product page and extract its details with extract(soup, url)
+        
+        The details extracted from a page body are kept (up to
+        SCRAPER_PARSED_PRODUCTS), so a page that did not change since the last
+        scraping is neither parsed nor extracted again. Callers get a copy.
+        """
+        fetched = self.fetch_body(url)
+        if fetched is None:
             return None
+        key = (url, fetched[0])
+        with self._products_lock:
+            product = self._products.get(key)
+            if product is not None:
+                self._products.move_to_end(key)
+                return copy.deepcopy(product)
+        product = extract(BeautifulSoup(fetched[1], 'lxml'), url)
+        if product is not None:
+            with self._products_lock:
+                self._products[key] = copy.deepcopy(product)
+                while len(self._products) > SCRAPER_PARSED_PRODUCTS:
+                    self._products.popitem(last=False)
+        return product
+    
+    def throttle(self, url: str):
+        """Wait for the URL's host to allow one more request (every request, retries included)"""
+        host = urlparse(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.requests_per_second, burst=self.requests_per_second)
+        wait = bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    def fetch_concurrently(self, urls: List[str], handler: Callable[[str], Optional[T]]) -> List[Optional[T]]:
+        """
+        Run a blocking fetch-and-parse handler (e.g. get_product_details) on many URLs
         
-        # Remove currency symbols and whitespace
-        price_str = price_str.replace('€', '').replace('$', '').replace('£', '')
-        price_str = price_str.replace(' ', '').replace('\u00a0', '').replace('\u202f', '')
-        price_str = price_str.strip()
+        Handlers run in threads, at most `concurrency` at a time, while the
+        per-host token buckets keep the request rate within budget: the wall
+        time is bounded by the rate instead of the sum of the latencies.
+        Called from synchronous code (the scraper service and its scheduler).
         
-        # Handle comma as decimal separator (European format)
-        if ',' in price_str and '.' in price_str:
-            # Both present: assume comma is thousands separator
-            price_str = price_str.replace(',', '')
-        elif ',' in price_str:
-            # Only comma: assume decimal separator
-            price_str = price_str.replace(',', '.')
+        Returns:
+            The handler results in the order of the URLs (None for failures)
+        """
+        if not urls:
+            return []
+        return asyncio.run(self._gather(urls, handler))
+    
+    async def _gather(self, urls: List[str], handler: Callable[[str], Optional[T]]) -> List[Optional[T]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
         
-        try:
-            return float(price_str)
-        except ValueError:
-            logger.warning(f"Could not parse price: {price_str}")
+        async def run(url: str) -> Optional[T]:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(handler, url)
+                except Exception as e:
+                    logger.error(f"Error processing {url}: {e}")
+                    return None
+        
+        return await asyncio.gather(*(run(url) for url in urls))
+    
+    def parse_price(self, price_str: str) -> Optional[float]:
+        """Parse price string to float (shared locale-aware parser, see ingestion.parse_number)"""
+        if not price_str:
             return None
+        
+        price = parse_number(price_str)
+        if price is None:
+            logger.warning(f"Could not parse price: {price_str}")
+        return price
     
     @abstractmethod
     def scrape_products(self, product_type: str = "laptop", max_pages: int = 10) -> List[Dict]:
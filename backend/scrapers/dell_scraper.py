@@ -3,7 +3,6 @@ from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 import re
 import logging
-import time
 from .base_scraper import BaseScraper
 
 logger = logging.getLogger(__name__)
@@ -58,7 +57,8 @@ class DellScraper(BaseScraper):
                     product_links = links
                     break
             
-            # Extract product information
+            # Collect the product URLs
+            product_urls = []
             for link in product_links[:50]:  # Limit to 50 products per run
                 href = link.get('href', '')
                 if not href:
@@ -74,14 +74,12 @@ class DellScraper(BaseScraper):
                         product_url = product_url.replace('https://www.dell.com//www.dell.com/', 'https://www.dell.com/', 1)
                 else:
                     continue
-                
-                # Get product details
-                product = self.get_product_details(product_url)
+                product_urls.append(product_url)
+            
+            # Get product details, a few pages at a time within the rate limit
+            for product in self.fetch_concurrently(product_urls, self.get_product_details):
                 if product:
                     products.append(product)
-                
-                # Add delay to avoid rate limiting
-                time.sleep(0.5)
         
         except Exception as e:
             logger.error(f"Error scraping Dell products: {e}")
@@ -90,11 +88,11 @@ class DellScraper(BaseScraper):
     
     def get_product_details(self, product_url: str) -> Optional[Dict]:
         """Get detailed information for a Dell product"""
+        return self.fetch_product(product_url, self.extract_product_details)
+    
+    def extract_product_details(self, soup: BeautifulSoup, product_url: str) -> Optional[Dict]:
+        """Details of a Dell product from its parsed page"""
         try:
-            soup = self.fetch_page(product_url)
-            if not soup:
-                return None
-            
             # Extract product name
             name = None
             name_selectors = [
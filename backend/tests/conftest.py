@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules are imported as top-level modules, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def main(tmp_path_factory):
+    """The API module, imported once with its marketplace log and caches in a temporary directory"""
+    state_dir = tmp_path_factory.mktemp("state")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("MARKETPLACE_STATE_DIR", str(state_dir / "marketplace"))
+        patch.setenv("MARKETPLACE_FSYNC", "0")
+        patch.setenv("CERTIFICATE_CACHE_DIR", str(state_dir / "certificates"))
+        import main
+    yield main
+    main.MARKETPLACE_LOG.close()
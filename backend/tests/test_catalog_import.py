@@ -0,0 +1,73 @@
+import asyncio
+import io
+import shutil
+
+import pytest
+from fastapi import UploadFile
+
+
+@pytest.fixture
+def catalog_csv(main, tmp_path, monkeypatch):
+    """A copy of the equipment catalog file, written to instead of the real one"""
+    path = tmp_path / "equipment_catalog.csv"
+    shutil.copy(main.EQUIPMENT_CSV_PATH, path)
+    monkeypatch.setattr(main, "EQUIPMENT_CSV_PATH", str(path))
+    return path
+
+
+def product(model, **fields):
+    return {"name": f"Laptop {model}", "type": "laptop", "brand": "Acme", "model": model,
+            "price_new": 1000, "co2_new": 300, **fields}
+
+
+def statuses(result):
+    return [(outcome["row"], outcome["status"]) for outcome in result["outcomes"]]
+
+
+def test_atomic_import_writes_nothing_when_a_row_is_rejected(main, catalog_csv):
+    before = catalog_csv.read_bytes()
+    existing = main.EQUIPMENT_CATALOG[0]
+    result = main.bulk_import_catalog([
+        product("A-1"),
+        product(existing["model"], type=existing["type"], brand=existing["brand"]),
+        product("A-2", price_new="cheap"),
+        product("A-1"),
+    ], atomic=True)
+
+    assert not result["success"]
+    assert (result["created"], result["rejected"]) == (0, 3)
+    assert statuses(result) == [(1, "skipped"), (2, "duplicate"), (3, "invalid"), (4, "duplicate")]
+    assert catalog_csv.read_bytes() == before
+    assert "laptop-acme-a-1" not in main.EQUIPMENT_INDEX
+
+
+def test_non_atomic_import_adds_the_valid_rows(main, catalog_csv):
+    before = catalog_csv.read_text()
+    result = main.bulk_import_catalog([product("B-1"), product("B-2", co2_new=None), product("B-3")], atomic=False)
+
+    assert result["success"]
+    assert statuses(result) == [(1, "created"), (2, "invalid"), (3, "created")]
+    assert {"laptop-acme-b-1", "laptop-acme-b-3"} <= set(main.EQUIPMENT_INDEX)
+    added = catalog_csv.read_text()[len(before):].splitlines()
+    assert [line.split(",")[2] for line in added] == ["B-1", "B-3"]
+
+    # Importing them again only finds duplicates
+    again = main.bulk_import_catalog([product("B-1")], atomic=True)
+    assert statuses(again) == [(1, "duplicate")]
+
+
+def test_atomic_csv_import_rolls_back_on_parse_errors(main, catalog_csv):
+    before = catalog_csv.read_bytes()
+    header = ",".join(main.EQUIPMENT_CSV_FIELDS)
+    content = (
+        f"{header}\n"
+        "laptop,Acme,C-1,Laptop C-1,1000,,300,,60,,0.05,0.005,ADEME\n"
+        "laptop,Acme,C-2,Laptop C-2,not a price,,300,,60,,0.05,0.005,ADEME\n"
+    )
+    upload = UploadFile(file=io.BytesIO(content.encode("utf-8")), filename="import.csv")
+    result = asyncio.run(main.bulk_import_catalog_csv(upload, atomic=True))
+
+    assert not result["success"]
+    assert statuses(result) == [(1, "skipped"), (2, "invalid")]
+    assert catalog_csv.read_bytes() == before
+    assert "laptop-acme-c-1" not in main.EQUIPMENT_INDEX
@@ -0,0 +1,62 @@
+import os
+
+import catalog_store
+from catalog_store import VendorCatalogStore
+
+HEADER = "id,vendor,name,model,screen_size,rating,reviews_count,price,link,features,scraped_at\n"
+
+
+def write_catalog(directory, vendor, rows):
+    with open(directory / f"{vendor}_catalog.csv", "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        for product_id, price in rows:
+            f.write(f"{product_id},,{product_id},{product_id},,,,{price},,,\n")
+
+
+def test_new_vendor_file_and_reload_notify_a_change(tmp_path):
+    changes = []
+    write_catalog(tmp_path, "hp", [("hp-1", 500)])
+    store = VendorCatalogStore(str(tmp_path), on_change=lambda: changes.append(1))
+
+    assert [p["id"] for p in store.get_all()] == ["hp-1"]
+    seen = len(changes)
+    assert seen >= 2  # hp discovered, then loaded
+
+    store.get_all()
+    assert len(changes) == seen
+
+    write_catalog(tmp_path, "lenovo", [("lenovo-1", 700)])
+    assert sorted(p["id"] for p in store.get_all()) == ["hp-1", "lenovo-1"]
+    assert store.vendor_counts() == {"HP": 1, "Lenovo": 1}
+    assert len(changes) > seen
+
+    seen = len(changes)
+    write_catalog(tmp_path, "hp", [("hp-1", 500), ("hp-2", 600)])
+    assert store.reload("hp") == 2
+    assert len(changes) > seen
+
+
+def test_directory_is_listed_again_only_when_it_changes(tmp_path, monkeypatch):
+    listings = []
+    real_listdir = catalog_store.os.listdir
+    monkeypatch.setattr(catalog_store.os, "listdir", lambda path: listings.append(path) or real_listdir(path))
+    write_catalog(tmp_path, "hp", [("hp-1", 500)])
+    os.utime(tmp_path, (1_000_000_000, 1_000_000_000))
+    store = VendorCatalogStore(str(tmp_path))
+
+    store.get_all()
+    store.get_all()
+    assert store.vendor_counts() == {"HP": 1}
+    assert store.vendors() == ["hp"]
+    assert len(listings) == 1
+
+    # A new vendor file changes the directory's mtime
+    write_catalog(tmp_path, "lenovo", [("lenovo-1", 700)])
+    assert store.vendors() == ["hp", "lenovo"]
+    assert len(listings) == 2
+
+    # A reload always lists the directory
+    os.utime(tmp_path, (1_000_000_000, 1_000_000_000))
+    store.discover()
+    store.reload("hp")
+    assert len(listings) == 4
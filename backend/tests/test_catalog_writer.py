@@ -0,0 +1,38 @@
+from catalog_writer import CatalogWriter
+
+
+def test_rows_on_disk_resolve_the_future_even_if_memory_update_fails(tmp_path):
+    resynced = []
+    writer = CatalogWriter(fsync="never", on_apply_error=resynced.append)
+    path = str(tmp_path / "catalog.csv")
+
+    def broken(rows):
+        raise RuntimeError("index update failed")
+
+    try:
+        future = writer.submit(path, ["id"], lambda claimed: ([{"id": "a"}], "ok"), broken)
+        assert future.result(timeout=5) == "ok"
+        assert writer.append(path, ["id"], [{"id": "b"}]).result(timeout=5) == 1
+    finally:
+        writer.close(timeout=5)
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read().split() == ["id", "a", "b"]
+    assert resynced == [path]
+    assert writer.stats["apply_errors"] == 1
+
+
+def test_rejected_prepare_fails_only_its_mutation(tmp_path):
+    writer = CatalogWriter(fsync="never")
+    path = str(tmp_path / "catalog.csv")
+
+    def reject(claimed):
+        raise ValueError("duplicate")
+
+    try:
+        bad = writer.submit(path, ["id"], reject)
+        good = writer.append(path, ["id"], [{"id": "a"}])
+        assert good.result(timeout=5) == 1
+        assert isinstance(bad.exception(timeout=5), ValueError)
+    finally:
+        writer.close(timeout=5)
@@ -0,0 +1,27 @@
+from certificates import MIN_POOL_BATCH, CertificateCache, CertificateRenderer, certificate_key, render_certificate_svg
+
+
+def certificates(count):
+    return [{"name": f"User {i}", "department": "IT", "period": "2026", "co2_kg": 10.0 + i, "money_eur": 100.0 + i,
+             "items": 1 + i % 3} for i in range(count)]
+
+
+def test_started_pool_renders_in_spawned_workers(tmp_path):
+    renderer = CertificateRenderer(CertificateCache(str(tmp_path)), workers=2, start_method="spawn")
+    renderer.start()
+    try:
+        batch = certificates(MIN_POOL_BATCH + 10)
+        assert renderer.render_batch(batch)["rendered"] == len(batch)
+        for certificate in batch:
+            assert renderer.cache.get(certificate_key(certificate)) == render_certificate_svg(certificate)
+        # Rendered once only
+        assert renderer.render_batch(batch)["cached"] == len(batch)
+    finally:
+        renderer.close()
+    assert renderer._pool is None
+
+
+def test_batches_render_in_process_until_started(tmp_path):
+    renderer = CertificateRenderer(CertificateCache(str(tmp_path)), workers=2)
+    assert renderer.render_batch(certificates(MIN_POOL_BATCH))["rendered"] == MIN_POOL_BATCH
+    assert renderer._pool is None
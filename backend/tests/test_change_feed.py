@@ -0,0 +1,72 @@
+import asyncio
+
+from change_feed import ChangeFeed
+
+
+def frame_ids(text):
+    return [int(line[4:]) for line in text.splitlines() if line.startswith("id: ")]
+
+
+def test_events_since_resumes_after_a_cursor():
+    feed = ChangeFeed(buffer_size=5)
+    for i in range(3):
+        feed.publish("item.updated", {"i": i})
+    assert [e["seq"] for e in feed.events_since(1)] == [2, 3]
+    assert feed.events_since(3) == []
+    assert [e["seq"] for e in feed.events_since(0, limit=2)] == [1, 2]
+
+
+def test_events_since_detects_dropped_events_and_restarts():
+    feed = ChangeFeed(buffer_size=5)
+    for i in range(8):
+        feed.publish("item.updated", {"i": i})
+    assert feed.events_since(2) is None
+    assert [e["seq"] for e in feed.events_since(3)] == [4, 5, 6, 7, 8]
+    # A cursor from before a restart is ahead of the feed
+    assert feed.events_since(42) is None
+    assert feed.status()["oldest_buffered_seq"] == 4
+
+
+def test_stream_resumes_from_cursor_then_follows_live_events():
+    async def scenario():
+        feed = ChangeFeed(buffer_size=100)
+        feed.bind(asyncio.get_running_loop())
+        for i in range(4):
+            feed.publish("item.updated", {"i": i})
+        stream = feed.stream(since=2)
+        assert (await stream.__anext__()).startswith("retry:")
+        assert frame_ids(await stream.__anext__()) == [3, 4]
+        feed.publish("item.created", {"i": 4})
+        assert frame_ids(await stream.__anext__()) == [5]
+        await stream.aclose()
+        assert feed.subscribers == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_sends_reset_when_cursor_fell_out_of_the_buffer():
+    async def scenario():
+        feed = ChangeFeed(buffer_size=3)
+        feed.bind(asyncio.get_running_loop())
+        for i in range(10):
+            feed.publish("item.updated", {"i": i})
+        stream = feed.stream(since=1)
+        await stream.__anext__()
+        assert "event: reset" in await stream.__anext__()
+        feed.publish("item.updated", {"i": 10})
+        assert frame_ids(await stream.__anext__()) == [11]
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_buffered_events_keep_the_values_at_publish_time():
+    feed = ChangeFeed(buffer_size=5)
+    item = {"id": "equip-1", "price": 100, "status": "available"}
+    feed.publish("item.created", {"id": item["id"], "item": item})
+    before = feed.events_since(0)
+
+    # Store listeners publish the live record, which later updates modify in place
+    item.update(price=80, status="reserved")
+    assert feed.events_since(0) == before
+    assert before[0]["data"]["item"] == {"id": "equip-1", "price": 100, "status": "available"}
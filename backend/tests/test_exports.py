@@ -0,0 +1,79 @@
+import csv
+import gzip
+import io
+import json
+import zlib
+
+import pytest
+
+import exports
+from exports import csv_chunks, export_response, gzip_chunks, ndjson_chunks
+
+FIELDS = ["id", "name", "price"]
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(exports, "CHUNK_BYTES", 200)
+
+
+def make_rows(count):
+    return [{"id": i, "name": f"Écran «{i}», 27\"", "price": i * 1.5, "ignored": "x"} for i in range(count)]
+
+
+def test_csv_header_goes_out_before_any_row_is_read():
+    read = []
+
+    def rows():
+        for row in make_rows(3):
+            read.append(row["id"])
+            yield row
+
+    chunks = csv_chunks(rows(), FIELDS)
+    assert next(chunks) == b"id,name,price\r\n"
+    assert read == []
+
+
+def test_csv_chunks_hold_whole_rows():
+    rows = make_rows(100)
+    chunks = list(csv_chunks(rows, FIELDS))
+    assert len(chunks) > 3
+    assert all(len(chunk) >= 200 and chunk.endswith(b"\r\n") for chunk in chunks[1:-1])
+
+    parsed = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert [row["name"] for row in parsed] == [row["name"] for row in rows]
+    # Every chunk is valid UTF-8 on its own: no character is split
+    for chunk in chunks:
+        chunk.decode("utf-8")
+
+
+def test_ndjson_chunks_hold_whole_lines():
+    rows = make_rows(100)
+    chunks = list(ndjson_chunks(rows, FIELDS))
+    assert len(chunks) > 3
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    lines = [json.loads(line) for chunk in chunks for line in chunk.decode("utf-8").splitlines()]
+    assert lines == [{field: row[field] for field in FIELDS} for row in rows]
+    assert list(ndjson_chunks([], FIELDS)) == []
+
+
+def test_gzip_stream_decompresses_chunk_by_chunk():
+    chunks = list(csv_chunks(make_rows(100), FIELDS))
+    compressed = list(gzip_chunks(chunks))
+    assert gzip.decompress(b"".join(compressed)) == b"".join(chunks)
+
+    # Each chunk is flushed: what the client received so far decompresses to the rows sent so far
+    decompressor = zlib.decompressobj(31)
+    for chunk, data in zip(chunks, compressed):
+        assert decompressor.decompress(data) == chunk
+
+
+def test_gzip_of_an_empty_stream_is_a_valid_empty_file():
+    assert gzip.decompress(b"".join(gzip_chunks([]))) == b""
+
+
+def test_export_response_names_the_file():
+    response = export_response(iter([]), FIELDS, "items_2026", format="ndjson", gzip=True)
+    assert response.media_type == "application/gzip"
+    assert response.headers["content-disposition"] == 'attachment; filename="items_2026.ndjson.gz"'
+    assert export_response(iter([]), FIELDS, "items").media_type == "text/csv; charset=utf-8"
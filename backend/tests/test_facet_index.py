@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from facet_index import FacetIndex, LAPTOP_FACETS, price_bucket, screen_size_value
+
+FACETS = {
+    "vendor": lambda row: row["vendor"],
+    "size": lambda row: row["size"],
+}
+
+
+def make_rows(count, seed=1):
+    rng = random.Random(seed)
+    return [
+        {"id": i, "vendor": rng.choice(["Dell", "HP", "Lenovo"]), "size": rng.choice(["13", "14", "16", None])}
+        for i in range(count)
+    ]
+
+
+def matches(row, facet, values):
+    return FACETS[facet](row) in values
+
+
+def brute_force(rows, filters, operator):
+    active = {facet: values for facet, values in filters.items() if values}
+    if not active:
+        return rows
+    combine = any if operator == "or" else all
+    return [row for row in rows if combine(matches(row, facet, values) for facet, values in active.items())]
+
+
+@pytest.mark.parametrize("operator", ["and", "or"])
+@pytest.mark.parametrize("filters", [
+    {},
+    {"vendor": ["Dell"]},
+    {"vendor": ["Dell", "HP"]},
+    {"vendor": ["HP"], "size": ["14", "16"]},
+    {"vendor": ["Lenovo"], "size": []},
+    {"vendor": ["Acer"], "size": ["13"]},
+])
+def test_search_matches_a_scan_of_the_rows(filters, operator):
+    rows = make_rows(300)
+    result = FacetIndex(rows, FACETS).search(filters, operator)
+    expected = brute_force(rows, filters, operator)
+    assert result["items"] == expected
+    assert result["total"] == len(expected)
+
+
+def test_facet_counts_ignore_their_own_filter_under_and():
+    rows = make_rows(300)
+    index = FacetIndex(rows, FACETS)
+    filters = {"vendor": ["Dell"], "size": ["16"]}
+
+    counts = index.search(filters, "and")["facets"]
+    # Vendor counts among 16" rows, size counts among Dell rows
+    assert counts["vendor"]["HP"] == len(brute_force(rows, {"vendor": ["HP"], "size": ["16"]}, "and"))
+    assert counts["size"]["13"] == len(brute_force(rows, {"vendor": ["Dell"], "size": ["13"]}, "and"))
+    # Rows without a size are not counted in any size value
+    assert sum(counts["size"].values()) == len([r for r in brute_force(rows, {"vendor": ["Dell"]}, "and") if r["size"]])
+
+    # Under OR, every facet is counted over the matching rows
+    matching = brute_force(rows, filters, "or")
+    counts = index.search(filters, "or")["facets"]
+    assert counts["vendor"] == {v: sum(r["vendor"] == v for r in matching) for v in ("Dell", "HP", "Lenovo")}
+
+
+def test_pages_and_unknown_facets():
+    rows = make_rows(50)
+    index = FacetIndex(rows, FACETS)
+    everything = index.search({"color": ["red"]})
+    assert everything["total"] == 50
+    assert index.search({}, offset=45, limit=10)["items"] == rows[45:]
+    assert index.search({"vendor": ["HP"]}, offset=2, limit=3)["items"] == brute_force(rows, {"vendor": ["HP"]}, "and")[2:5]
+    assert FacetIndex([], FACETS).search({"vendor": ["HP"]}) == {"items": [], "total": 0, "facets": {"vendor": {}, "size": {}}}
+
+
+def test_bucketing_helpers():
+    assert [price_bucket(p) for p in (None, 0, 499.99, 500, 2500)] == [None, "0-500", "0-500", "500-1000", "2000+"]
+    assert [screen_size_value(s) for s in ('16"', "15,6 pouces", "15.60", "", None)] == ["16", "15.6", "15.6", None, None]
+    assert LAPTOP_FACETS["vendor"]({"vendor": ""}) is None
@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException, Request
+
+from http_cache import CatalogVersion, ResponseCache, conditional_json
+
+
+def make_request(path="/api/catalog/screen", headers=None):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    })
+
+
+def missing():
+    raise HTTPException(status_code=404, detail="Catalog not found")
+
+
+def test_matching_etag_returns_304():
+    version, cache = CatalogVersion(), ResponseCache()
+    first = conditional_json(make_request(), version, cache, lambda: {"items": []})
+    assert first.status_code == 200
+    again = conditional_json(make_request(headers={"If-None-Match": first.headers["ETag"]}), version, cache, lambda: {})
+    assert again.status_code == 304
+
+
+def test_version_bump_invalidates_etag():
+    version, cache = CatalogVersion(), ResponseCache()
+    etag = conditional_json(make_request(), version, cache, lambda: {"v": 1}).headers["ETag"]
+    version.bump()
+    response = conditional_json(make_request(headers={"If-None-Match": etag}), version, cache, lambda: {"v": 2})
+    assert response.status_code == 200
+    assert response.body == b'{"v":2}'
+
+
+@pytest.mark.parametrize("tag", ["*", "current"])
+def test_missing_resource_is_404_not_304(tag):
+    version, cache = CatalogVersion(), ResponseCache()
+    etag = version.snapshot()[1] if tag == "current" else tag
+    with pytest.raises(HTTPException) as error:
+        conditional_json(make_request("/api/catalog/bogus", {"If-None-Match": etag}), version, cache, missing)
+    assert error.value.status_code == 404
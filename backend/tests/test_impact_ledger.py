@@ -0,0 +1,73 @@
+from impact_ledger import ImpactLedger, RankedTotals
+
+
+def test_ranks_follow_updates_and_discards():
+    totals = RankedTotals()
+    for key, amount in (("a", 5), ("b", 10), ("c", 1)):
+        totals.add(key, amount)
+    assert [totals.rank(key) for key in "abc"] == [2, 1, 3]
+
+    totals.add("c", 20)
+    totals.add("b", -10)
+    assert totals.top(3) == [("c", 21), ("a", 5), ("b", 0)]
+    assert totals.rank("b") == 3
+
+    totals.discard("b")
+    totals.discard("missing")
+    assert totals.rank("b") is None
+    assert totals.top(3) == [("c", 21), ("a", 5)]
+    assert len(totals) == 2
+
+    # Ties are ranked by key
+    totals.add("0", 5)
+    assert totals.top(3) == [("c", 21), ("0", 5), ("a", 5)]
+
+
+def reservation(reservation_id, user_email, department, status="approved"):
+    return {"id": reservation_id, "user_email": user_email, "user_department": department, "status": status}
+
+
+def make_ledger():
+    ledger = ImpactLedger(lambda reservation: {"co2_kg": 100.0, "money_eur": 50.0})
+    ledger.rebuild([
+        reservation("r1", "alice@lvmh.com", "IT"),
+        reservation("r2", "alice@lvmh.com", "IT"),
+        reservation("r3", "bob@lvmh.com", "HR"),
+        reservation("r4", "carol@lvmh.com", "HR", status="pending"),
+    ])
+    return ledger
+
+
+def test_retracted_approvals_update_totals_and_ranks():
+    ledger = make_ledger()
+    assert ledger.user("alice@lvmh.com") == {"items": 2, "co2_kg": 200.0, "co2_kg_rank": 1, "money_eur": 100.0,
+                                             "money_eur_rank": 1, "ranked": 2}
+    assert ledger.user("bob@lvmh.com")["co2_kg_rank"] == 2
+
+    # Alice loses one item: tie with Bob, ranked by email
+    ledger.on_reservation_change("update", reservation("r2", "alice@lvmh.com", "IT", status="rejected"),
+                                 reservation("r2", "alice@lvmh.com", "IT"))
+    assert [row["user"] for row in ledger.leaderboard("user")] == ["alice@lvmh.com", "bob@lvmh.com"]
+    assert ledger.user("alice@lvmh.com")["co2_kg"] == 100.0
+
+    ledger.on_reservation_change("add", reservation("r5", "carol@lvmh.com", "HR"), None)
+    assert ledger.department("HR") == {"items": 2, "co2_kg": 200.0, "co2_kg_rank": 1, "money_eur": 100.0,
+                                       "money_eur_rank": 1, "ranked": 2}
+    assert ledger.department("IT")["co2_kg_rank"] == 2
+
+
+def test_keys_without_approved_items_leave_the_rankings():
+    ledger = make_ledger()
+    ledger.on_reservation_change("remove", reservation("r3", "bob@lvmh.com", "HR"), None)
+
+    assert ledger.user("bob@lvmh.com") == {"items": 0, "co2_kg": 0.0, "co2_kg_rank": None, "money_eur": 0.0,
+                                           "money_eur_rank": None, "ranked": 1}
+    assert ledger.department("HR")["co2_kg_rank"] is None
+    assert [row["department"] for row in ledger.leaderboard("department")] == ["IT"]
+    assert ledger.credited_users() == ["alice@lvmh.com"]
+
+    # Rebuilding from the same reservations gives the same rankings
+    rebuilt = ImpactLedger(ledger.credit_of)
+    rebuilt.rebuild([reservation("r1", "alice@lvmh.com", "IT"), reservation("r2", "alice@lvmh.com", "IT")])
+    assert rebuilt.leaderboard("user") == ledger.leaderboard("user")
+    assert rebuilt.leaderboard("department") == ledger.leaderboard("department")
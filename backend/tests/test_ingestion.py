@@ -0,0 +1,59 @@
+import io
+
+import pytest
+
+from ingestion import Column, IngestReport, Schema, parse_number, stream_rows
+
+SCHEMA = Schema("test", [
+    Column("id", required=True),
+    Column("rating", "float"),
+    Column("price", "number", required=True, positive=True, locale="fr"),
+    Column("note", default="none"),
+])
+
+
+def load(text):
+    report = IngestReport("test.csv", SCHEMA.name)
+    return list(stream_rows(io.StringIO(text), SCHEMA, report)), report
+
+
+def test_rows_are_typed_and_invalid_rows_reported():
+    rows, report = load("id,rating,price\na,4.5,\"1 495,78 €\"\nb,N/A,12\n,3,10\nd,x,-4\n")
+    assert rows == [
+        {"id": "a", "rating": 4.5, "price": 1495.78, "note": "none"},
+        {"id": "b", "rating": None, "price": 12.0, "note": "none"},
+    ]
+    assert (report.rows_read, report.rows_loaded, report.rows_rejected) == (4, 2, 2)
+    assert {(e["row"], e["column"], e["action"]) for e in report.errors} == {
+        (3, "id", "rejected"), (4, "rating", "set to null"), (4, "price", "rejected")
+    }
+
+
+def test_parse_number_locales():
+    assert parse_number("1.495,78") == 1495.78
+    assert parse_number("$1,495.78", "en") == 1495.78
+    assert parse_number("abc") is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1,495", 1495.0),
+    ("1.495", 1495.0),
+    ("1.495,78", 1495.78),
+    ("1,495.78", 1495.78),
+    ("1 495,78 €", 1495.78),
+    ("€12,345", 12345.0),
+    ("-1.495", -1495.0),
+    ("941.40", 941.4),
+    ("941,4", 941.4),
+    ("0,495", 0.495),
+    ("1495", 1495.0),
+])
+def test_parse_number_auto_separators(text, expected):
+    assert parse_number(text) == expected
+
+
+def test_auto_number_columns_read_lone_thousands_separators():
+    schema = Schema("test", [Column("id", required=True), Column("price", "number")])
+    report = IngestReport("test.csv", schema.name)
+    rows = list(stream_rows(io.StringIO('id,price\na,"1,495"\nb,12.50\nc,1.495\n'), schema, report))
+    assert [row["price"] for row in rows] == [1495.0, 12.5, 1495.0]
@@ -0,0 +1,85 @@
+import threading
+
+from marketplace_stats import MarketplaceStats
+from marketplace_store import MarketplaceStore, ReservationStore
+
+
+def item(item_id, status="available", price=100.0):
+    return {"id": item_id, "type": "laptop", "status": status, "price_manual": None, "price_suggested": price}
+
+
+def reservation(reservation_id, status="pending"):
+    return {"id": reservation_id, "equipment_id": "equip-0", "user_email": "u@lvmh.com",
+            "user_department": "IT", "status": status, "created_at": "2026-01-01T09:00:00"}
+
+
+def make_stats(items, reservations):
+    stats = MarketplaceStats()
+    stats.rebuild(items, reservations)
+    items.listeners.append(stats.on_item_change)
+    reservations.listeners.append(stats.on_reservation_change)
+    return stats
+
+
+def test_counters_follow_store_changes():
+    items = MarketplaceStore([item("equip-0"), item("equip-1", "sold")])
+    reservations = ReservationStore([reservation("res-0")])
+    stats = make_stats(items, reservations)
+
+    items.add(item("equip-2", price=49.99))
+    items.update("equip-0", {"status": "reserved"})
+    items.update("equip-2", {"price_manual": 10.0})
+    items.remove("equip-1")
+    reservations.add(reservation("res-1"))
+    reservations.update("res-0", {"status": "approved"})
+
+    assert stats.snapshot() == {
+        "total_items": 2,
+        "available": 1,
+        "reserved": 1,
+        "sold": 0,
+        "pending_reservations": 1,
+        "total_available_value": 10.0
+    }
+    assert stats.verify(items, reservations) == {"consistent": True, "differences": {}, "repaired": False}
+
+
+def test_verify_reports_and_repairs_drift():
+    items = MarketplaceStore([item("equip-0"), item("equip-1")])
+    reservations = ReservationStore([])
+    stats = make_stats(items, reservations)
+    stats.by_status["available"] = 5
+
+    result = stats.verify(items, reservations)
+    assert result["differences"] == {"available": {"current": 5, "expected": 2}}
+    assert stats.snapshot()["available"] == 5
+
+    assert stats.verify(items, reservations, repair=True)["repaired"]
+    assert stats.snapshot()["available"] == 2
+    assert stats.verify(items, reservations)["consistent"]
+
+
+def test_repair_does_not_lose_changes_made_during_the_recount(monkeypatch):
+    items = MarketplaceStore([item("equip-0"), item("equip-1")])
+    reservations = ReservationStore([])
+    stats = make_stats(items, reservations)
+    with stats._lock:
+        stats.by_status["sold"] += 1
+    writers = []
+    rebuild = MarketplaceStats.rebuild
+
+    def rebuild_then_sell(self, *stores):
+        rebuild(self, *stores)
+        if self is not stats:
+            # Another request sells an item once the recount is done
+            writer = threading.Thread(target=items.update, args=("equip-0", {"status": "sold"}))
+            writer.start()
+            writer.join(timeout=0.2)
+            writers.append(writer)
+
+    monkeypatch.setattr(MarketplaceStats, "rebuild", rebuild_then_sell)
+    stats.verify(items, reservations, repair=True)
+    writers[0].join()
+    monkeypatch.undo()
+    assert stats.snapshot()["sold"] == 1
+    assert stats.verify(items, reservations)["consistent"]
@@ -0,0 +1,65 @@
+import random
+
+from marketplace_store import BULK_UPDATE_THRESHOLD, ReservationStore
+
+STATUSES = ["pending", "approved", "rejected", "expired"]
+DEPARTMENTS = ["IT", "HR", "Finance"]
+
+
+def make_store(rng, count):
+    return ReservationStore({
+        "id": f"res-{i:04d}",
+        "created_at": f"2026-01-01T00:{rng.randrange(60):02d}:{rng.randrange(60):02d}",
+        "status": rng.choice(STATUSES),
+        "user_email": "u@lvmh.com",
+        "user_department": rng.choice(DEPARTMENTS),
+        "equipment_id": f"equip-{i % 7}",
+    } for i in range(count))
+
+
+def all_pages(store, limit, **filters):
+    ids, after = [], None
+    while True:
+        page = store.newest(limit, after, **filters)
+        ids += [r["id"] for r in page]
+        if len(page) < limit:
+            return ids
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+
+def expected(store, status=None, department=None):
+    matching = [r for r in store if (status is None or r["status"] == status)
+                and (department is None or r["user_department"] == department)]
+    return [r["id"] for r in sorted(matching, key=lambda r: (r["created_at"], r["id"]), reverse=True)]
+
+
+def check_every_filter(store):
+    for status in [None] + STATUSES:
+        for department in [None] + DEPARTMENTS:
+            assert all_pages(store, 7, status=status, department=department) == expected(store, status, department)
+
+
+def test_newest_filters_follow_updates_and_removals():
+    rng = random.Random(3)
+    store = make_store(rng, 300)
+    check_every_filter(store)
+
+    for record in rng.sample(list(store), 40):
+        store.update(record["id"], {"status": rng.choice(STATUSES)})
+    for record in rng.sample(list(store), 20):
+        store.remove(record["id"])
+    check_every_filter(store)
+
+    # Above the threshold, update_many rebuilds the sorted lists instead
+    updates = [(record["id"], {"status": "expired"}) for record in list(store)[:BULK_UPDATE_THRESHOLD + 1]]
+    store.update_many(updates)
+    check_every_filter(store)
+
+
+def test_newest_combines_filters_with_accept():
+    store = make_store(random.Random(5), 100)
+    page = store.newest(10, status="pending", accept=lambda r: r["equipment_id"] == "equip-1")
+    assert [r["id"] for r in page] == [
+        i for i in expected(store, status="pending") if store.get(i)["equipment_id"] == "equip-1"
+    ][:10]
+    assert store.newest(10, status="unknown") == []
@@ -0,0 +1,101 @@
+from datetime import datetime
+
+from marketplace_store import MarketplaceStore, ReservationStore
+from order_rollups import OrderRollups, bucket_start
+from order_stats import OrderStats, freeze_item_fields
+
+
+def test_bucket_start_per_granularity():
+    when = datetime(2026, 3, 19, 14, 35)  # a Thursday
+    assert bucket_start(when, "hour") == "2026-03-19T14:00"
+    assert bucket_start(when, "day") == "2026-03-19"
+    assert bucket_start(when, "week") == "2026-03-16"
+    assert bucket_start(when, "month") == "2026-03-01"
+
+
+def test_query_filters_groups_and_bounds():
+    rollups = OrderRollups()
+    rollups.apply("2026-03-01T09:00:00", "IT", "laptop", "created", 0, 1)
+    rollups.apply("2026-03-01T10:00:00", "HR", "laptop", "created", 0, 1)
+    rollups.apply("2026-03-02T11:00:00", "IT", "laptop", "approved", 45000, 1)
+    rollups.apply("2026-03-05T11:00:00", "IT", "monitor", "approved", 9000, 1)
+    rollups.apply("not a date", "IT", "laptop", "created", 0, 1)
+
+    assert rollups.query("day", event="created") == [{"bucket": "2026-03-01", "count": 2, "value": 0.0}]
+    assert rollups.query("month", event="approved", group_by=["type"]) == [
+        {"bucket": "2026-03-01", "type": "laptop", "count": 1, "value": 450.0},
+        {"bucket": "2026-03-01", "type": "monitor", "count": 1, "value": 90.0},
+    ]
+    assert [row["bucket"] for row in rollups.query("day", since="2026-03-02", until="2026-03-04")] == ["2026-03-02"]
+    assert rollups.query("day", department="HR", group_by=["event"]) == [
+        {"bucket": "2026-03-01", "event": "created", "count": 1, "value": 0.0}
+    ]
+
+    # Removing an event drops its bucket once empty
+    rollups.apply("2026-03-05T11:00:00", "IT", "monitor", "approved", 9000, -1)
+    assert [row["bucket"] for row in rollups.query("day")] == ["2026-03-01", "2026-03-02"]
+
+
+def make_stores():
+    items = MarketplaceStore([
+        {"id": "equip-1", "type": "laptop", "status": "sold", "price_manual": None, "price_suggested": 450.0},
+        {"id": "equip-2", "type": "monitor", "status": "available", "price_manual": 90.0, "price_suggested": 120.0},
+    ])
+    reservations = ReservationStore([])
+    return items, reservations
+
+
+def reserve(reservations, items, reservation_id, equipment_id, status, decided_at=None):
+    reservation = {
+        "id": reservation_id,
+        "equipment_id": equipment_id,
+        "user_email": "u@lvmh.com",
+        "user_department": "IT",
+        "status": status,
+        "created_at": "2026-03-01T09:00:00",
+        "decided_at": decided_at,
+    }
+    reservation.update(freeze_item_fields(reservation, items.get(equipment_id)))
+    reservations.add(reservation)
+
+
+def test_item_edits_and_deletions_do_not_rewrite_past_orders():
+    items, reservations = make_stores()
+    stats = OrderStats(reservations)
+    reservations.listeners.append(stats.on_reservation_change)
+    reserve(reservations, items, "res-1", "equip-1", "approved", "2026-03-02T10:00:00")
+    reserve(reservations, items, "res-2", "equip-2", "expired", "2026-03-04T10:00:00")
+    before = (stats.snapshot(), stats.rollup("day", group_by=["event", "type"]))
+
+    items.update("equip-1", {"price_manual": 10.0, "type": "tablet"})
+    items.remove("equip-2")
+    assert (stats.snapshot(), stats.rollup("day", group_by=["event", "type"])) == before
+
+    rebuilt = OrderStats(reservations)
+    rebuilt.rebuild()
+    assert rebuilt.snapshot() == before[0]
+    assert rebuilt.rollups == stats.rollups
+    assert stats.verify()["consistent"]
+
+
+def test_expired_orders_are_counted():
+    items, reservations = make_stores()
+    stats = OrderStats(reservations)
+    reservations.listeners.append(stats.on_reservation_change)
+    reserve(reservations, items, "res-1", "equip-2", "pending")
+    reservations.update("res-1", {"status": "expired", "decided_at": "2026-03-04T10:00:00", "price": 90.0})
+
+    snapshot = stats.snapshot()
+    assert (snapshot["total"], snapshot["pending"], snapshot["expired"]) == (1, 0, 1)
+    assert snapshot["total_value"] == 0
+    assert stats.rollup("day", event="expired") == [{"bucket": "2026-03-04", "count": 1, "value": 0.0}]
+    # The reservation's creation stays in its bucket
+    assert stats.rollup("day", event="created") == [{"bucket": "2026-03-01", "count": 1, "value": 0.0}]
+
+
+def test_freeze_item_fields_keeps_recorded_values():
+    item = {"id": "equip-1", "type": "laptop", "price_manual": None, "price_suggested": 450.0}
+    assert freeze_item_fields({"status": "pending"}, item) == {"equipment_type": "laptop"}
+    assert freeze_item_fields({"status": "approved", "equipment_type": "tablet"}, item) == {"price": 450.0}
+    assert freeze_item_fields({"status": "approved", "equipment_type": "tablet", "price": 1.0}, item) == {}
+    assert freeze_item_fields({"status": "approved"}, None) == {}
@@ -0,0 +1,79 @@
+import hashlib
+import os
+
+import pytest
+
+import page_cache
+from page_cache import HTTPCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time.time for the used_at of the cached URLs, advanced by hand"""
+    now = [1000.0]
+    monkeypatch.setattr(page_cache.time, "time", lambda: now[0])
+    return now
+
+
+def store(cache, url, content, etag=None):
+    body_hash = hashlib.sha256(content).hexdigest()
+    cache.store(url, content, body_hash, etag, "Mon, 05 Jan 2026 10:00:00 GMT")
+    return body_hash
+
+
+def test_revalidated_urls_keep_their_body_and_validators(tmp_path, clock):
+    cache = HTTPCache(str(tmp_path), max_bytes=1000)
+    body_hash = store(cache, "https://a/1", b"page one", etag='"v1"')
+
+    cached = cache.lookup("https://a/1")
+    assert cached == ('"v1"', "Mon, 05 Jan 2026 10:00:00 GMT", body_hash)
+    assert cache.body(cached.body_hash) == b"page one"
+    assert cache.lookup("https://a/2") is None
+
+    # A 304 only refreshes the URL's use time; the index survives a reopen
+    clock[0] += 10
+    cache.touch("https://a/1")
+    cache.close()
+    cache = HTTPCache(str(tmp_path), max_bytes=1000)
+    assert cache.lookup("https://a/1") == cached
+    assert len(cache) == 1
+
+    cache.forget("https://a/1")
+    assert cache.lookup("https://a/1") is None
+    assert not os.path.exists(cache.body_path(body_hash))
+    cache.close()
+
+
+def test_least_recently_used_urls_are_evicted_past_the_size_bound(tmp_path, clock):
+    cache = HTTPCache(str(tmp_path), max_bytes=25)
+    for i in range(3):
+        clock[0] += 1
+        store(cache, f"https://a/{i}", bytes([65 + i]) * 10)
+    # 30 bytes: the oldest URL is gone
+    assert cache.lookup("https://a/0") is None
+
+    # Revalidating a URL makes it the most recently used
+    clock[0] += 1
+    cache.touch("https://a/1")
+    clock[0] += 1
+    store(cache, "https://a/3", b"D" * 10)
+    assert [url for url in ("https://a/1", "https://a/2", "https://a/3") if cache.lookup(url)] == ["https://a/1", "https://a/3"]
+
+    # Bodies larger than the whole cache are not stored
+    store(cache, "https://a/big", b"x" * 26)
+    assert cache.lookup("https://a/big") is None
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_identical_pages_share_one_body(tmp_path, clock):
+    cache = HTTPCache(str(tmp_path), max_bytes=1000)
+    body_hash = store(cache, "https://a/1", b"same page")
+    store(cache, "https://a/2", b"same page")
+
+    cache.forget("https://a/1")
+    assert cache.body(body_hash) == b"same page"
+    # Replacing the last URL using a body removes the body
+    store(cache, "https://a/2", b"new page")
+    assert cache.body(body_hash) is None
+    cache.close()
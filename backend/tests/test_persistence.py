@@ -0,0 +1,153 @@
+import glob
+import os
+import threading
+
+import pytest
+
+from persistence import CorruptLogError, DurableLog
+
+
+def reopen(directory):
+    log = DurableLog(str(directory), fsync=False)
+    return log, log.recover()
+
+
+def last_segment(directory):
+    return sorted(glob.glob(os.path.join(str(directory), "wal-*.log")))[-1]
+
+
+def test_replay_restores_puts_and_deletes(tmp_path):
+    log, state = reopen(tmp_path)
+    assert state is None
+    log.put("items", "a", {"id": "a", "price": 1})
+    log.put("items", "b", {"id": "b", "price": 2})
+    log.put("items", "a", {"id": "a", "price": 3})
+    log.delete("items", "b")
+    log.close()
+
+    log, state = reopen(tmp_path)
+    assert state == {"items": {"a": {"id": "a", "price": 3}}}
+    assert log.recovery["replayed_records"] == 4
+    log.close()
+
+
+def test_torn_tail_is_truncated_and_appends_continue(tmp_path):
+    log, _ = reopen(tmp_path)
+    log.put("items", "a", {"id": "a"})
+    log.put("items", "b", {"id": "b"})
+    log.close()
+    path = last_segment(tmp_path)
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size - 3)
+
+    log, state = reopen(tmp_path)
+    assert state == {"items": {"a": {"id": "a"}}}
+    assert log.recovery["truncated_bytes"] > 0
+    log.put("items", "c", {"id": "c"})
+    log.close()
+
+    log, state = reopen(tmp_path)
+    assert set(state["items"]) == {"a", "c"}
+    log.close()
+
+
+def test_batch_is_replayed_entirely_or_not_at_all(tmp_path):
+    log, _ = reopen(tmp_path)
+    log.put("items", "a", {"id": "a", "status": "available"})
+    with log.batch():
+        log.put("items", "a", {"id": "a", "status": "sold"})
+        with log.batch():
+            log.put("reservations", "r", {"id": "r", "status": "approved"})
+        # Nothing is written before the outermost batch ends
+        assert log.seq == 1
+    log.close()
+
+    log, state = reopen(tmp_path)
+    assert state["items"]["a"]["status"] == "sold"
+    assert state["reservations"]["r"]["status"] == "approved"
+    log.close()
+
+    # A crash in the middle of writing the batch record loses the whole batch
+    path = last_segment(tmp_path)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 10)
+    log, state = reopen(tmp_path)
+    assert state == {"items": {"a": {"id": "a", "status": "available"}}}
+    log.close()
+
+
+def test_snapshot_bounds_replay(tmp_path):
+    log = DurableLog(str(tmp_path), snapshot_every=10, fsync=False)
+    log.recover()
+    for i in range(25):
+        log.put("items", str(i % 5), {"id": str(i % 5), "n": i})
+    log.snapshot()
+    log.close()
+
+    log, state = reopen(tmp_path)
+    assert state["items"]["4"]["n"] == 24
+    assert log.recovery["snapshot_records"] == 5
+    assert log.recovery["replayed_records"] < 25
+    log.close()
+
+
+def test_damage_before_the_last_segment_is_an_error(tmp_path):
+    log = DurableLog(str(tmp_path), snapshot_every=1000, fsync=False)
+    log.recover()
+    log.put("items", "a", {"id": "a"})
+    log.close()
+    first = last_segment(tmp_path)
+    log, _ = reopen(tmp_path)
+    log._open_segment(log.seq + 1, log._segments())
+    log.put("items", "b", {"id": "b"})
+    log.close()
+    with open(first, "r+b") as f:
+        f.truncate(os.path.getsize(first) - 2)
+
+    with pytest.raises(CorruptLogError):
+        reopen(tmp_path)
+
+
+def test_unsynced_appends_are_made_durable_by_one_shared_sync(tmp_path):
+    log = DurableLog(str(tmp_path), fsync=True)
+    log.recover()
+    log.put("items", "a", {"id": "a"}, sync=False)
+    log.delete("items", "a", sync=False)
+    log.put("items", "b", {"id": "b"}, sync=False)
+    assert log.durable_seq == 0
+    log.sync()
+    assert log.durable_seq == 3
+    assert log.stats["fsyncs"] == 1
+    # Already durable: no second fsync
+    log.sync(2)
+    assert log.stats["fsyncs"] == 1
+    log.close()
+
+    log, state = reopen(tmp_path)
+    assert state == {"items": {"b": {"id": "b"}}}
+    log.close()
+
+
+def test_concurrent_writers_share_fsyncs(tmp_path):
+    log = DurableLog(str(tmp_path), fsync=True)
+    log.recover()
+
+    def write(thread):
+        for i in range(50):
+            appended_before = log.seq
+            log.put("items", f"{thread}-{i}", {"id": f"{thread}-{i}"})
+            # put() returns once its record (after appended_before) is durable
+            assert log.durable_seq > appended_before
+
+    threads = [threading.Thread(target=write, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert log.durable_seq == log.seq == 400
+    log.close()
+
+    log, state = reopen(tmp_path)
+    assert len(state["items"]) == 400
+    log.close()
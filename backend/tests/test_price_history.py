@@ -0,0 +1,100 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from price_history import PriceHistoryStore
+
+START = datetime(2026, 1, 1)
+HEADER = "id,vendor,price,scraped_at\n"
+
+
+def rows(product_id, prices, start=START, vendor="dell"):
+    return "".join(
+        f"{product_id},{vendor},{price},{(start + timedelta(hours=i)).isoformat()}\n"
+        for i, price in enumerate(prices)
+    )
+
+
+def write(path, text, mode="a"):
+    with open(path, mode) as f:
+        f.write(text)
+
+
+def test_refresh_ingests_only_complete_appended_rows(tmp_path):
+    path = tmp_path / "dell_catalog.csv"
+    write(path, HEADER + rows("p1", [100, 90]), mode="w")
+    store = PriceHistoryStore(str(tmp_path))
+    assert store.refresh() == 2
+    assert store.refresh() == 0
+
+    # The partial last line waits for the next refresh
+    write(path, rows("p1", [80], start=START + timedelta(hours=2)) + "p1,dell,70")
+    assert store.refresh() == 1
+    write(path, f",{(START + timedelta(hours=3)).isoformat()}\n")
+    assert store.refresh() == 1
+    assert [point["price"] for point in store.get_history("p1")["points"]] == [100, 90, 80, 70]
+    assert store.get_summary() == {"products": 1, "observations": 4, "files": 1}
+
+
+def test_history_downsampling_keeps_the_extremes_of_each_bucket(tmp_path):
+    prices = [100] * 100
+    prices[37], prices[70] = 20, 300
+    write(tmp_path / "dell_catalog.csv", HEADER + rows("p1", prices), mode="w")
+    store = PriceHistoryStore(str(tmp_path))
+    store.refresh()
+
+    history = store.get_history("p1", max_points=10)
+    assert history["downsampled"] and history["observations"] == 100
+    assert len(history["points"]) <= 10
+    assert {20, 300} <= {point["price"] for point in history["points"]}
+    timestamps = [point["timestamp"] for point in history["points"]]
+    assert timestamps == sorted(timestamps)
+
+    window = store.get_history("p1", start=START + timedelta(hours=10), end=START + timedelta(hours=19))
+    assert window["observations"] == 10 and not window["downsampled"]
+    assert store.get_history("missing") is None
+    with pytest.raises(ValueError):
+        store.get_history("p1", max_points=1)
+
+
+def test_stats_and_drops(tmp_path):
+    write(tmp_path / "dell_catalog.csv", HEADER + rows("p1", [100, 120, 90]) + rows("p2", [50, 45]), mode="w")
+    write(tmp_path / "hp_catalog.csv", HEADER + rows("p3", [200, 100], vendor=""), mode="w")
+    store = PriceHistoryStore(str(tmp_path))
+    store.refresh()
+
+    assert store.get_stats("p1") == {"id": "p1", "observations": 3, "min": 90, "max": 120, "median": 100,
+                                     "first": 100, "last": 90}
+    assert store.get_stats("p1", start=START + timedelta(hours=5))["observations"] == 0
+
+    drops = store.get_price_drops(10)
+    assert [(drop["id"], drop["vendor"], drop["drop_percent"]) for drop in drops] == [("p3", "hp", 50.0), ("p1", "dell", 25.0)]
+    assert [drop["id"] for drop in store.get_price_drops(5, vendor="DELL")] == ["p1", "p2"]
+    assert len(store.get_price_drops(5, limit=1)) == 1
+
+
+def test_reads_see_consistent_series_while_refreshing(tmp_path):
+    path = tmp_path / "dell_catalog.csv"
+    write(path, HEADER, mode="w")
+    store = PriceHistoryStore(str(tmp_path))
+    done = threading.Event()
+
+    def scrape():
+        for batch in range(200):
+            write(path, rows("p1", [100 + batch] * 5, start=START + timedelta(hours=5 * batch)))
+            store.refresh()
+        done.set()
+
+    writer = threading.Thread(target=scrape)
+    writer.start()
+    while not done.is_set():
+        history = store.get_history("p1", max_points=50)
+        if history is not None:
+            assert len(history["points"]) <= max(history["observations"], 50)
+            timestamps = [point["timestamp"] for point in history["points"]]
+            assert timestamps == sorted(timestamps)
+            stats = store.get_stats("p1")
+            assert stats["min"] <= stats["median"] <= stats["max"]
+    writer.join()
+    assert store.get_history("p1")["observations"] == 1000
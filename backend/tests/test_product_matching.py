@@ -0,0 +1,77 @@
+import math
+
+from product_matching import (
+    ProductMatcher, ProductRecord, match_scraped_products, name_tokens, normalize_model, screen_size,
+    suggested_action,
+)
+
+
+def record(product_id, name, model="", brand="", screen="", source="catalog"):
+    return ProductRecord({"id": product_id, "name": name, "model": model, "brand": brand, "screen_size": screen}, source)
+
+
+def test_normalization():
+    assert normalize_model("PC16-250 ") == normalize_model("pc16250") == "PC16250"
+    assert name_tokens("Ordinateur portable Dell Latitude 5540 avec écran") == ["dell", "latitude", "5540", "ecran"]
+    assert screen_size("", 'HP EliteBook 15,6" FHD') == 15.6
+    assert screen_size("14 pouces") == 14.0
+    assert screen_size("no size") is None
+
+
+def test_idf_weights_rare_tokens_more():
+    references = [record(f"r{i}", f"Dell Latitude {5000 + i}") for i in range(10)]
+    matcher = ProductMatcher(references)
+    assert matcher.idf["dell"] == math.log(1 + 10 / 10)
+    assert matcher.idf["5003"] == math.log(1 + 10 / 1)
+
+    # Sharing only the frequent tokens is a weak match, sharing the rare one is a strong match
+    frequent = matcher._weighted_jaccard({"dell", "latitude", "9999"}, references[3].tokens)
+    rare = matcher._weighted_jaccard({"5003"}, references[3].tokens)
+    assert frequent < rare
+
+
+def test_blocking_skips_tokens_shared_by_too_many_references():
+    references = [record(f"r{i}", f"Dell Latitude {5000 + i}") for i in range(10)]
+    references.append(record("model", "Something else", model="LAT-5540"))
+    matcher = ProductMatcher(references, max_block_size=5)
+
+    # "dell" and "latitude" blocks hold 10 references: only the rare token and the model code block
+    assert sorted(matcher.candidates(record("x", "Dell Latitude 5007"))) == [7]
+    assert sorted(matcher.candidates(record("x", "Latitude", model="lat5540"))) == [10]
+    assert matcher.candidates(record("x", "Dell Latitude")) == []
+
+
+def test_scores_and_actions():
+    matcher = ProductMatcher([
+        record("same", "Dell Latitude 5540", model="LAT5540", brand="Dell", screen='15.6"'),
+        record("variant", "Dell Latitude 5540 vPro", model="LAT5540V", brand="Dell"),
+    ])
+    scraped = record("s", "Latitude 5540", model="lat-5540", brand="dell", screen='15,6"', source="scraped")
+
+    confidence, reasons = matcher.score(scraped, matcher.references[0])
+    assert confidence == 1.0 and reasons[0] == "same model code" and "same screen size" in reasons
+    confidence, reasons = matcher.score(scraped, matcher.references[1])
+    assert confidence == 0.8 and reasons == ["model code variant"]
+    assert matcher.best_match(scraped)["id"] == "same"
+
+    other_brand = record("hp", "Latitude 5540", model="LAT5540", brand="HP")
+    assert matcher.score(other_brand, matcher.references[0])[0] == round(0.95 * 0.5, 3)
+    assert [suggested_action(c) for c in (0.95, 0.7, 0.2)] == ["link", "review", "add"]
+
+
+def test_scraped_products_are_clustered_and_matched():
+    catalog = [{"id": "cat-1", "name": "Dell Latitude 5540", "model": "LAT5540", "brand": "Dell"}]
+    scraped = [
+        {"id": "dell-1", "vendor": "Dell", "name": "Latitude 5540", "model": "LAT-5540"},
+        {"id": "dell-2", "vendor": "Dell", "name": "Latitude 5540 (2024)", "model": "lat5540"},
+        {"id": "hp-1", "vendor": "HP", "name": "HP ProBook 450 G10", "model": "PB450G10"},
+    ]
+    result = match_scraped_products(scraped, catalog)
+    by_id = {m["product_id"]: m for m in result["matches"]}
+    assert by_id["dell-1"]["catalog_item_id"] == "cat-1" and by_id["dell-1"]["action"] == "link"
+    assert by_id["dell-1"]["same_product_ids"] == ["dell-2"]
+    assert by_id["hp-1"]["action"] == "add" and by_id["hp-1"]["same_product_ids"] == []
+    assert result["summary"] == {"link": 2, "review": 0, "add": 1}
+    assert result["clusters"] == 1
+
+    assert match_scraped_products(scraped, catalog, min_confidence=0.5)["total"] == 2
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+import rate_limit
+from rate_limit import TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_is_free_then_callers_queue_at_the_rate(clock):
+    bucket = TokenBucket(rate=2, burst=2)
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+    # Each extra caller waits half a second more than the previous one
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_rate_must_be_positive(rate):
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate)
+
+
+def test_tokens_refill_over_time_up_to_the_burst(clock):
+    bucket = TokenBucket(rate=2, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    clock[0] += 0.5
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.5
+
+    # A long idle period refills the burst, not more
+    clock[0] += 60
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+
+
+def test_concurrent_reservations_are_spread_over_time(clock):
+    bucket = TokenBucket(rate=4, burst=1)
+    waits = []
+    lock = threading.Lock()
+
+    def reserve():
+        wait = bucket.reserve()
+        with lock:
+            waits.append(wait)
+
+    threads = [threading.Thread(target=reserve) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # No two callers are given the same slot
+    assert sorted(waits) == [i / 4 for i in range(20)]
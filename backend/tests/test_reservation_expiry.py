@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from reservation_expiry import ExpiryHeap
+
+
+def reservation(reservation_id, created_at, status="pending", expires_at=None):
+    return {"id": reservation_id, "created_at": created_at, "status": status, "expires_at": expires_at}
+
+
+def ts(text):
+    return datetime.fromisoformat(text).timestamp()
+
+
+def test_due_reservations_pop_in_deadline_order():
+    heap = ExpiryHeap(timedelta(hours=1))
+    heap.on_reservation_change("add", reservation("b", "2026-01-01T10:00:00"), None)
+    heap.on_reservation_change("add", reservation("a", "2026-01-01T09:00:00"), None)
+    # expires_at wins over created_at + ttl
+    heap.on_reservation_change("add", reservation("c", "2026-01-01T08:00:00", expires_at="2026-01-01T12:00:00"), None)
+
+    assert heap.next_deadline() == ts("2026-01-01T10:00:00")
+    assert heap.pop_due(ts("2026-01-01T09:59:59")) == []
+    assert heap.pop_due(ts("2026-01-01T11:00:00")) == ["a", "b"]
+    assert len(heap) == 1
+    assert heap.pop_due(ts("2026-01-01T12:00:00")) == ["c"]
+    assert heap.next_deadline() is None
+
+
+def test_decided_removed_and_rescheduled_reservations_are_skipped():
+    heap = ExpiryHeap(timedelta(hours=1))
+    for reservation_id in ("a", "b", "c"):
+        heap.on_reservation_change("add", reservation(reservation_id, "2026-01-01T09:00:00"), None)
+
+    heap.on_reservation_change("update", reservation("a", "2026-01-01T09:00:00", status="approved"), None)
+    heap.on_reservation_change("remove", reservation("b", "2026-01-01T09:00:00"), None)
+    later = reservation("c", "2026-01-01T09:00:00", expires_at="2026-01-02T09:00:00")
+    heap.on_reservation_change("update", later, None)
+
+    assert len(heap) == 1
+    assert heap.pop_due(ts("2026-01-01T12:00:00")) == []
+    assert heap.next_deadline() == ts("2026-01-02T09:00:00")
+
+
+def test_stale_entries_are_compacted():
+    heap = ExpiryHeap(timedelta(hours=1))
+    for i in range(3000):
+        heap.on_reservation_change("add", reservation(f"r{i}", "2026-01-01T09:00:00"), None)
+    for i in range(2990):
+        heap.forget(f"r{i}")
+
+    assert len(heap) == 10
+    assert len(heap._heap) <= 2 * len(heap) + 1024
+    assert sorted(heap.pop_due(ts("2026-01-01T10:00:00"))) == sorted(f"r{i}" for i in range(2990, 3000))
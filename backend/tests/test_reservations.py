@@ -0,0 +1,102 @@
+import glob
+import os
+import shutil
+
+from persistence import DurableLog
+
+USER_EMAIL = "marie.dupont@lvmh.com"
+
+
+def add_item(main, item_id):
+    """A new available item, copied from the seed laptop"""
+    item = {**main.MARKETPLACE_STORE.get("equip-001"), "id": item_id, "status": "available"}
+    main.MARKETPLACE_STORE.add(item)
+    return item
+
+
+def recover_copy(main, tmp_path, truncate=0):
+    """State recovered from a copy of the marketplace log, its last `truncate` bytes torn off"""
+    directory = tmp_path / "copy"
+    shutil.copytree(main.MARKETPLACE_LOG.directory, directory)
+    path = sorted(glob.glob(os.path.join(directory, "wal-*.log")))[-1]
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - truncate)
+    log = DurableLog(str(directory), fsync=False)
+    try:
+        return log.recover()
+    finally:
+        log.close()
+
+
+def test_a_reservation_and_its_item_are_logged_as_one_record(main, tmp_path):
+    add_item(main, "equip-torn")
+    seq = main.MARKETPLACE_LOG.seq
+    reservation = main.create_reservation(main.ReservationRequest(equipment_id="equip-torn", user_email=USER_EMAIL))
+    assert main.MARKETPLACE_LOG.seq == seq + 1
+
+    state = recover_copy(main, tmp_path)
+    assert reservation.id in state["reservations"]
+    assert state["marketplace"]["equip-torn"]["status"] == "reserved"
+
+    # A crash while writing the record loses both the reservation and the reserved status
+    state = recover_copy(main, tmp_path / "torn", truncate=10)
+    assert reservation.id not in state["reservations"]
+    assert state["marketplace"]["equip-torn"]["status"] == "available"
+
+
+def test_decisions_and_cancellations_are_logged_as_one_record(main):
+    for item_id in ("equip-decided", "equip-cancelled"):
+        add_item(main, item_id)
+    decided = main.create_reservation(main.ReservationRequest(equipment_id="equip-decided", user_email=USER_EMAIL))
+    cancelled = main.create_reservation(main.ReservationRequest(equipment_id="equip-cancelled", user_email=USER_EMAIL))
+
+    seq = main.MARKETPLACE_LOG.seq
+    main.update_reservation(decided.id, main.UpdateReservationRequest(status="approved"))
+    assert main.MARKETPLACE_LOG.seq == seq + 1
+    assert main.MARKETPLACE_STORE.get("equip-decided")["status"] == "sold"
+
+    main.cancel_reservation(cancelled.id, USER_EMAIL)
+    assert main.MARKETPLACE_LOG.seq == seq + 2
+    assert main.MARKETPLACE_STORE.get("equip-cancelled")["status"] == "available"
+    assert cancelled.id not in main.RESERVATION_STORE
+
+
+def test_bulk_decisions_skip_stale_reservations(main):
+    for item_id in ("equip-bulk-1", "equip-bulk-2", "equip-bulk-3"):
+        add_item(main, item_id)
+    first, second, third = (
+        main.create_reservation(main.ReservationRequest(equipment_id=item_id, user_email=USER_EMAIL)).id
+        for item_id in ("equip-bulk-1", "equip-bulk-2", "equip-bulk-3")
+    )
+    # Decided or cancelled since the admin loaded the list
+    main.update_reservation(second, main.UpdateReservationRequest(status="rejected"))
+    main.cancel_reservation(third, USER_EMAIL)
+
+    seq = main.MARKETPLACE_LOG.seq
+    results = main.apply_reservation_decisions([
+        (first, "approved"), (second, "approved"), (third, "approved"), (first, "rejected"), ("res-missing", "rejected")
+    ])
+    assert results == [
+        {"reservation_id": first, "outcome": "approved"},
+        {"reservation_id": second, "outcome": "not_pending", "status": "rejected"},
+        {"reservation_id": third, "outcome": "not_found"},
+        {"reservation_id": first, "outcome": "duplicate"},
+        {"reservation_id": "res-missing", "outcome": "not_found"},
+    ]
+    # Only the fresh decision is applied, in one log record
+    assert main.MARKETPLACE_LOG.seq == seq + 1
+    assert main.RESERVATION_STORE.get(first)["status"] == "approved"
+    assert main.RESERVATION_STORE.get(second)["status"] == "rejected"
+    assert [main.MARKETPLACE_STORE.get(i)["status"] for i in ("equip-bulk-1", "equip-bulk-2", "equip-bulk-3")] == \
+        ["sold", "available", "available"]
+
+
+def test_an_approval_wins_over_a_rejection_of_the_same_item(main):
+    add_item(main, "equip-shared")
+    first = main.create_reservation(main.ReservationRequest(equipment_id="equip-shared", user_email=USER_EMAIL)).id
+    # A second pending reservation of the item, as left by an earlier race
+    main.RESERVATION_STORE.add({**main.RESERVATION_STORE.get(first), "id": "res-shared-2"})
+
+    results = main.apply_reservation_decisions([(first, "approved"), ("res-shared-2", "rejected")])
+    assert [r["outcome"] for r in results] == ["approved", "rejected"]
+    assert main.MARKETPLACE_STORE.get("equip-shared")["status"] == "sold"
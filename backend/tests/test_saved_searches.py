@@ -0,0 +1,69 @@
+import random
+
+from saved_searches import IntervalTree, NotificationQueue, SavedSearchIndex
+
+
+def test_interval_tree_stab_matches_a_linear_scan():
+    rng = random.Random(7)
+    intervals = []
+    for i in range(300):
+        low = rng.uniform(0, 1000)
+        intervals.append((low, low + rng.uniform(0, 300), f"s{i}"))
+    intervals.append((float("-inf"), 50.0, "open-low"))
+    intervals.append((900.0, float("inf"), "open-high"))
+    tree = IntervalTree(intervals)
+
+    probes = [rng.uniform(-100, 1400) for _ in range(500)]
+    # Bounds are inclusive
+    probes += [low for low, _, _ in intervals[:50]] + [high for _, high, _ in intervals[:50]]
+    for x in probes:
+        expected = sorted(key for low, high, key in intervals if low <= x <= high)
+        assert sorted(tree.stab(x)) == expected
+
+
+def test_index_matches_type_condition_and_wildcard_buckets():
+    index = SavedSearchIndex([
+        {"id": "a", "user_email": "u", "type": "laptop", "condition": "good", "min_price": 100, "max_price": 300},
+        {"id": "b", "user_email": "u", "type": "laptop", "min_price": 200},
+        {"id": "c", "user_email": "u", "condition": "good", "max_price": 150},
+        {"id": "d", "user_email": "u"},
+        {"id": "e", "user_email": "u", "type": "screen"},
+    ])
+
+    assert sorted(s["id"] for s in index.match("laptop", "good", 120)) == ["a", "c", "d"]
+    assert sorted(s["id"] for s in index.match("laptop", "fair", 250)) == ["b", "d"]
+
+    index.remove("d")
+    index.add({"id": "f", "user_email": "u", "type": "laptop", "condition": "good", "min_price": 120, "max_price": 120})
+    assert sorted(s["id"] for s in index.match("laptop", "good", 120)) == ["a", "c", "f"]
+
+
+def _item(item_id):
+    return {"id": item_id, "type": "laptop", "brand": "B", "model": "M", "condition": "good"}
+
+
+def test_notifications_are_sent_once_per_search_until_forgotten():
+    queue = NotificationQueue()
+    search = {"id": "s1", "user_email": "u", "label": None}
+    other = {"id": "s2", "user_email": "u", "label": None}
+
+    assert queue.push(search, _item("i1"), 100) is not None
+    assert queue.push(search, _item("i1"), 90) is None
+    assert queue.push(other, _item("i1"), 90) is not None
+
+    queue.forget_search("s1")
+    assert queue.push(search, _item("i1"), 80) is not None
+    assert queue.push(other, _item("i1"), 80) is None
+    assert [n["item"]["price"] for n in queue.list("u")] == [80, 90, 100]
+
+
+def test_sent_items_are_capped_per_search():
+    queue = NotificationQueue(max_sent_per_search=2)
+    search = {"id": "s1", "user_email": "u", "label": None}
+    for item_id in ("i1", "i2", "i3"):
+        queue.push(search, _item(item_id), 100)
+
+    # The oldest item was forgotten, the two latest are still remembered
+    assert queue.push(search, _item("i3"), 100) is None
+    assert queue.push(search, _item("i2"), 100) is None
+    assert queue.push(search, _item("i1"), 100) is not None
@@ -156,6 +156,21 @@ export default function AdminDashboard({ user }) {
     }
   }
 
+  const loadMoreOrders = async () => {
+    if (!allOrders?.next_cursor) return
+    try {
+      const response = await axios.get(`${API_URL}/api/orders/all`, {
+        params: { cursor: allOrders.next_cursor }
+      })
+      setAllOrders({
+        ...response.data,
+        orders: [...allOrders.orders, ...response.data.orders]
+      })
+    } catch (error) {
+      console.error('Error loading more orders:', error)
+    }
+  }
+
   const pendingCount = reservations.filter(r => r.status === 'pending').length
 
   return (
@@ -256,6 +271,7 @@ export default function AdminDashboard({ user }) {
           <AllOrdersTab 
             orders={allOrders}
             loading={loadingOrders}
+            onLoadMore={loadMoreOrders}
           />
         ) : null}
       </div>
@@ -489,7 +505,8 @@ function ReservationCard({ reservation, item, onApprove, onReject, showActions =
   const statusStyles = {
     pending: { bg: 'bg-amber-50', text: 'text-amber-700', label: 'En attente' },
     approved: { bg: 'bg-emerald-50', text: 'text-emerald-700', label: 'Approuvé' },
-    rejected: { bg: 'bg-red-50', text: 'text-red-700', label: 'Refusé' }
+    rejected: { bg: 'bg-red-50', text: 'text-red-700', label: 'Refusé' },
+    expired: { bg: 'bg-gray-50', text: 'text-gray-600', label: 'Expiré' }
   }
   const style = statusStyles[reservation.status] || statusStyles.pending
 
@@ -828,7 +845,7 @@ function ScrapedProductsTab({ products, loading, onAddToCatalog }) {
 }
 
 // All Orders Tab
-function AllOrdersTab({ orders, loading }) {
+function AllOrdersTab({ orders, loading, onLoadMore }) {
   if (loading) {
     return (
       <div className="flex items-center justify-center py-20">
@@ -846,7 +863,7 @@ function AllOrdersTab({ orders, loading }) {
     )
   }
 
-  const { orders: orderList, statistics } = orders
+  const { orders: orderList, statistics, next_cursor: nextCursor } = orders
 
   return (
     <div className="space-y-6">
@@ -991,6 +1008,13 @@ function AllOrdersTab({ orders, loading }) {
                 ))}
               </tbody>
             </table>
+            {nextCursor && (
+              <div className="text-center mt-6">
+                <button onClick={onLoadMore} className="btn-outline">
+                  Charger plus de commandes
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -1071,13 +1095,15 @@ function StatusBadge({ status }) {
   const styles = {
     pending: 'bg-amber-100 text-amber-800',
     approved: 'bg-emerald-100 text-emerald-800',
-    rejected: 'bg-red-100 text-red-800'
+    rejected: 'bg-red-100 text-red-800',
+    expired: 'bg-gray-100 text-gray-600'
   }
 
   const labels = {
     pending: 'En attente',
     approved: 'Approuvée',
-    rejected: 'Rejetée'
+    rejected: 'Rejetée',
+    expired: 'Expirée'
   }
 
   return (